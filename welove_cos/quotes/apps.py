@@ -3,3 +3,6 @@ from django.apps import AppConfig
 
 class QuotesConfig(AppConfig):
     name = 'quotes'
+
+    def ready(self):
+        from . import checks, signals  # noqa
@@ -0,0 +1,90 @@
+import json
+
+from django.conf import settings
+from django.core import signing
+
+from .sampling import poll_sampler
+from .store import get_store
+
+BALLOT_SIZE = 4
+POOL_KEY = 'quotes:ballots'
+STATS_KEY = 'quotes:ballots:stats'
+REFILL_BATCH_SIZE = 100
+SIGNING_SALT = 'quotes.ballots'
+
+
+def pop_ballot():
+    store = get_store()
+    ballot = store.lpop(POOL_KEY)
+    if ballot is None:
+        store.hincrby(STATS_KEY, 'misses', 1)
+        return None
+    store.hincrby(STATS_KEY, 'hits', 1)
+    return [tuple(choice) for choice in json.loads(ballot)]
+
+
+def get_ballot():
+    # A pre-built ballot from the pool, or a freshly sampled one if the pool
+    # has run dry
+    ballot = pop_ballot()
+    if ballot is None:
+        ballot = poll_sampler.sample_choices(BALLOT_SIZE)
+    return ballot
+
+
+def refill_pool():
+    store = get_store()
+    pool_size = settings.QUOTES_BALLOT_POOL_SIZE
+    size = store.llen(POOL_KEY)
+    if size >= settings.QUOTES_BALLOT_POOL_LOW_WATERMARK:
+        return 0
+
+    added = 0
+    missing = pool_size - size
+    while added < missing:
+        ballots = poll_sampler.sample_ballots(
+            min(REFILL_BATCH_SIZE, missing - added), BALLOT_SIZE
+        )
+        if not ballots:
+            break
+        store.rpush(POOL_KEY, *[json.dumps(ballot) for ballot in ballots])
+        added += len(ballots)
+
+    # Concurrent refills must not grow the pool past its size
+    store.ltrim(POOL_KEY, 0, pool_size - 1)
+    if added:
+        store.hincrby(STATS_KEY, 'refills', 1)
+    return added
+
+
+def clear_pool():
+    get_store().delete(POOL_KEY)
+
+
+def pool_stats():
+    store = get_store()
+    stats = {'size': store.llen(POOL_KEY)}
+    counters = store.hgetall(STATS_KEY)
+    for name in ('hits', 'misses', 'refills'):
+        stats[name] = int(counters.get(name, 0))
+    return stats
+
+
+def sign_ballot(quote_ids):
+    return signing.dumps(list(quote_ids), salt=SIGNING_SALT)
+
+
+def unsign_ballot(signed_ballot):
+    # The quote ids of a ballot signed by sign_ballot, or None if it was
+    # tampered with or is too old
+    try:
+        quote_ids = signing.loads(
+            signed_ballot,
+            salt=SIGNING_SALT,
+            max_age=settings.QUOTES_BALLOT_MAX_AGE
+        )
+    except signing.BadSignature:
+        return None
+    if not isinstance(quote_ids, list):
+        return None
+    return [quote_id for quote_id in quote_ids if isinstance(quote_id, int)]
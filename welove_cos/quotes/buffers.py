@@ -0,0 +1,106 @@
+import time
+import uuid
+from datetime import timedelta
+
+from django.db import transaction
+from django.utils import timezone
+
+from .models import CounterFlush
+from .store import get_store
+
+BATCH_FIELD = '_batch'
+FLUSH_LOCK_TIMEOUT = 60
+FLUSH_LOG_AGE = timedelta(days=1)
+
+
+class CounterBuffer(object):
+    # Counts increments per quote id in the store, so the request path does
+    # not write to the database, and hands them over in bulk.
+    # A flush first moves the pending counts aside under a batch id. The
+    # batch is only dropped from the store once the database transaction
+    # recording it has committed, so a crash in between is retried on the
+    # next flush without counting the batch twice. Pending counts are only
+    # moved aside once no batch is left there, so a flush that outlives its
+    # lock never has its batch replaced.
+
+    def __init__(self, name):
+        self.name = name
+        self.pending_key = 'quotes:{}:pending'.format(name)
+        self.flushing_key = 'quotes:{}:flushing'.format(name)
+        self.since_key = 'quotes:{}:since'.format(name)
+        self.lock_key = 'quotes:{}:lock'.format(name)
+
+    def add(self, quote_id, amount=1):
+        store = get_store()
+        store.hincrby(self.pending_key, quote_id, amount)
+        store.set(self.since_key, time.time(), nx=True)
+
+    def age(self):
+        # Seconds since the oldest increment not yet flushed
+        since = get_store().get(self.since_key)
+        if since is None:
+            return 0
+        return time.time() - float(since)
+
+    def pending(self):
+        store = get_store()
+        counts = {}
+        for key in (self.flushing_key, self.pending_key):
+            for field, value in store.hgetall(key).items():
+                if field != BATCH_FIELD:
+                    counts[int(field)] = counts.get(int(field), 0) + int(value)
+        return counts
+
+    def flush(self, apply_counts):
+        # Calls apply_counts with a {quote_id: count} dict inside a
+        # transaction, and returns the number of ids flushed
+        store = get_store()
+        lock = uuid.uuid4().hex
+        if not store.set(self.lock_key, lock, ex=FLUSH_LOCK_TIMEOUT, nx=True):
+            return 0
+        try:
+            flushed = 0
+            if store.exists(self.flushing_key):
+                # Left over by a flush that did not finish
+                flushed += self._flush_batch(apply_counts)
+            store.delete(self.since_key)
+            if store.exists(self.pending_key):
+                # Not over a batch still being applied by a flush that
+                # outlived its lock
+                if store.renamenx(self.pending_key, self.flushing_key):
+                    flushed += self._flush_batch(apply_counts)
+                else:
+                    store.set(self.since_key, time.time(), nx=True)
+            return flushed
+        finally:
+            if store.get(self.lock_key) == lock:
+                store.delete(self.lock_key)
+
+    def _flush_batch(self, apply_counts):
+        store = get_store()
+        store.hsetnx(self.flushing_key, BATCH_FIELD, uuid.uuid4().hex)
+        fields = store.hgetall(self.flushing_key)
+        batch = fields.pop(BATCH_FIELD)
+        counts = dict(
+            (int(field), int(value)) for field, value in fields.items()
+            if int(value)
+        )
+
+        with transaction.atomic():
+            already_flushed = CounterFlush.objects.filter(
+                batch=batch
+            ).exists()
+            if not already_flushed:
+                apply_counts(counts)
+                CounterFlush.objects.create(
+                    batch=batch, counter=self.name, rows=len(counts)
+                )
+            CounterFlush.objects.filter(
+                counter=self.name,
+                flushed_at__lt=timezone.now() - FLUSH_LOG_AGE
+            ).delete()
+
+        # Unless another flush finished it and moved a new batch in since
+        if store.hget(self.flushing_key, BATCH_FIELD) == batch:
+            store.delete(self.flushing_key)
+        return 0 if already_flushed else len(counts)
@@ -0,0 +1,16 @@
+from django.conf import settings
+from django.core.checks import Error, register
+
+
+@register()
+def vote_buffer_check(app_configs, **kwargs):
+    # Without Redis each process buffers votes in its own memory, which the
+    # scheduled flush in the Celery worker never sees
+    if settings.QUOTES_VOTE_BUFFER and not settings.QUOTES_REDIS_URL:
+        return [Error(
+            "QUOTES_VOTE_BUFFER requires QUOTES_REDIS_URL.",
+            hint="Set REDIS_URL, or turn QUOTES_VOTE_BUFFER off to count "
+                 "votes in the database as they come.",
+            id='quotes.E001',
+        )]
+    return []
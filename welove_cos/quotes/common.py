@@ -1,5 +1,6 @@
 from django.conf import settings
 from django.core.mail import EmailMessage
+from django.db import connection
 
 
 def warning_email_admin(warning_text="WARNING: Unknown warning"):
@@ -19,3 +20,52 @@ def warning_email_admin(warning_text="WARNING: Unknown warning"):
     )
     email_to_send = EmailMessage(title, body, to=[admin_email])
     email_to_send.send()
+
+
+def bulk_increment(model, fields, rows, batch_size=500):
+    # Adds the values in each row, (id, value, ...), to the fields of the
+    # object with that id using one UPDATE ... FROM (VALUES ...) per batch
+    return _bulk_update(
+        model, fields, rows,
+        "{column} = {table}.{column} + v.column{position}", batch_size
+    )
+
+
+def bulk_assign(model, fields, rows, batch_size=500):
+    # Like bulk_increment, but the values replace those in the fields
+    return _bulk_update(
+        model, fields, rows, "{column} = v.column{position}", batch_size
+    )
+
+
+def _bulk_update(model, fields, rows, assignment, batch_size):
+    quote_name = connection.ops.quote_name
+    table = quote_name(model._meta.db_table)
+    primary_key = quote_name(model._meta.pk.column)
+    assignments = ", ".join(
+        assignment.format(
+            column=quote_name(model._meta.get_field(field).column),
+            table=table,
+            position=position
+        )
+        for position, field in enumerate(fields, start=2)
+    )
+    row_placeholder = "({})".format(", ".join(["%s"] * (len(fields) + 1)))
+
+    updated = 0
+    with connection.cursor() as cursor:
+        for start in range(0, len(rows), batch_size):
+            batch = rows[start:start + batch_size]
+            sql = (
+                "UPDATE {table} SET {assignments} "
+                "FROM (VALUES {values}) AS v "
+                "WHERE {table}.{primary_key} = v.column1"
+            ).format(
+                table=table,
+                assignments=assignments,
+                values=", ".join([row_placeholder] * len(batch)),
+                primary_key=primary_key
+            )
+            cursor.execute(sql, [value for row in batch for value in row])
+            updated += cursor.rowcount
+    return updated
@@ -1,9 +1,48 @@
+import threading
+
+from django.utils.functional import SimpleLazyObject
+
+from . import pagecache
 from .models import Message
 
 COMMON_ORIGIN = "City Of Sound"
 TYPE_OF_SOURCE = 'song'
 
 
+class MessageCache(object):
+    # The displayed message, kept in the memory of this process for as long
+    # as the message version in the shared cache stays the same. Message
+    # saves and deletes change it, so every process fetches the new one.
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._version = None
+        self._message = None
+
+    def get(self):
+        version = pagecache.read_versions(pagecache.MESSAGE)
+        with self._lock:
+            if version == self._version:
+                return self._message
+        try:
+            message = Message.objects.filter(
+                displayed=True)[0].message_text
+        except IndexError:
+            message = None
+        with self._lock:
+            self._version = version
+            self._message = message
+        return message
+
+    def clear(self):
+        with self._lock:
+            self._version = None
+            self._message = None
+
+
+message_cache = MessageCache()
+
+
 def quotes_processor(request):
     quotes_context = {
         'common_origin': COMMON_ORIGIN,
@@ -13,12 +52,7 @@ def quotes_processor(request):
 
 
 def message_processor(request):
-    try:
-        displayed_message = Message.objects.filter(
-            displayed=True)[0].message_text
-    except IndexError:
-        displayed_message = None
-    message_context = {
-        'message': displayed_message
-    }
-    return {'message_context': message_context}
+    # Only looked up by renders that show the message
+    return {'message_context': SimpleLazyObject(
+        lambda: {'message': message_cache.get()}
+    )}
@@ -0,0 +1,12 @@
+from datetime import datetime
+
+
+class DayConverter(object):
+    regex = '[0-9]{4}-[0-9]{2}-[0-9]{2}'
+
+    def to_python(self, value):
+        # A ValueError for days like 2018-02-30 makes the URL not match
+        return datetime.strptime(value, '%Y-%m-%d').date()
+
+    def to_url(self, value):
+        return value.isoformat()
@@ -0,0 +1,58 @@
+from math import sqrt
+
+from django.conf import settings
+
+from .buffers import CounterBuffer
+from .common import bulk_assign, bulk_increment
+from .models import Quote
+
+# Normal quantile of the confidence the ratings are given with
+RATING_CONFIDENCE_Z = 1.96
+
+impression_buffer = CounterBuffer('impressions')
+
+
+def record_impressions(quote_ids):
+    for quote_id in quote_ids:
+        impression_buffer.add(quote_id)
+    # Also flushed here, as without a shared store the scheduled flush runs
+    # in the worker and never sees what web processes counted
+    max_staleness = settings.QUOTES_IMPRESSION_BUFFER_MAX_STALENESS
+    if impression_buffer.age() > max_staleness:
+        flush_impression_buffer()
+
+
+def apply_impression_counts(counts):
+    updated = bulk_increment(
+        Quote, ['impressions'], sorted(counts.items())
+    )
+    update_ratings(counts)
+    return updated
+
+
+def flush_impression_buffer():
+    return impression_buffer.flush(apply_impression_counts)
+
+
+def wilson_lower_bound(votes, impressions, z=RATING_CONFIDENCE_Z):
+    # Lower bound of the Wilson score interval for the share of ballots
+    # showing a quote that were a vote for it
+    if impressions <= 0:
+        return 0.0
+    share = min(votes, impressions) / impressions
+    denominator = 1 + z * z / impressions
+    centre = share + z * z / (2 * impressions)
+    spread = z * sqrt(
+        (share * (1 - share) + z * z / (4 * impressions)) / impressions
+    )
+    return max(0.0, (centre - spread) / denominator)
+
+
+def update_ratings(quote_ids):
+    rows = [
+        (quote_id, wilson_lower_bound(popularity, impressions))
+        for quote_id, popularity, impressions in Quote.objects.filter(
+            pk__in=list(quote_ids)
+        ).values_list('id', 'popularity', 'impressions')
+    ]
+    return bulk_assign(Quote, ['rating'], sorted(rows))
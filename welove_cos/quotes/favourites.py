@@ -0,0 +1,33 @@
+from django.db import transaction
+from django.db.models import F
+
+from .models import Profile, Quote
+
+
+def set_favourite(user, quote_id):
+    # Points the profile of the user at the quote with targeted UPDATEs and
+    # moves one favourite count from the previous favourite to it. Returns
+    # False if the profile or the quote does not exist.
+    with transaction.atomic():
+        previous = Profile.objects.select_for_update().filter(
+            user=user
+        ).values_list('favourite_quote_id', flat=True)
+        if not previous:
+            return False
+        previous_id = previous[0]
+        if previous_id == quote_id:
+            return True
+        if not count_favourite(quote_id, 1):
+            return False
+        Profile.objects.filter(user=user).update(favourite_quote_id=quote_id)
+        count_favourite(previous_id, -1)
+    return True
+
+
+def count_favourite(quote_id, amount):
+    if quote_id is None:
+        return False
+    updated = Quote.objects.filter(pk=quote_id).update(
+        favourites=F('favourites') + amount
+    )
+    return updated == 1
@@ -1,5 +1,6 @@
 from django import forms
 from django.contrib.auth.models import User
+from .ballots import sign_ballot, unsign_ballot
 from .models import Profile
 
 
@@ -37,18 +38,41 @@ class ProfileForm(forms.ModelForm):
     field_order = ['first_name', 'subscribed']
 
 
+DEFAULT_POLL_CHOICES = [
+    (1, 'There is a problem with the poll,'),
+    (2, 'there are no available quotes.'),
+    (3, 'There is nothing to see here.'),
+    (4, 'We are sorry :( ')
+]
+
+
 class PollForm(forms.Form):
     quote_choice = forms.ChoiceField(
-        choices=[
-            (1, 'There is a problem with the poll,'),
-            (2, 'there are no available quotes.'),
-            (3, 'There is nothing to see here.'),
-            (4, 'We are sorry :( ')
-        ],
+        choices=DEFAULT_POLL_CHOICES,
         required=True,
         widget=forms.RadioSelect,
         label='Choose the quote you like the most'
     )
+    ballot = forms.CharField(widget=forms.HiddenInput)
+
+    def __init__(self, data=None, *args, choices=None, **kwargs):
+        # The ids of the choices travel signed with the form, so each
+        # instance validates against its own ballot and not shared state
+        super().__init__(data, *args, **kwargs)
+        quote_choice = self.fields['quote_choice']
+        if choices is not None:
+            quote_choice.choices = choices
+            self.initial['ballot'] = sign_ballot(
+                quote_id for quote_id, quote_text in choices
+            )
+        elif self.is_bound:
+            quote_ids = unsign_ballot(self.data.get('ballot', ''))
+            quote_choice.choices = [
+                (quote_id, quote_id) for quote_id in quote_ids or []
+            ]
+        else:
+            # Placeholder choices cannot be voted for
+            self.initial['ballot'] = sign_ballot([])
 
 
 class FavouriteQuoteForm(forms.Form):
@@ -58,3 +82,4 @@ class FavouriteQuoteForm(forms.Form):
         widget=forms.CheckboxInput(attrs={'onclick': 'this.form.submit();'}),
         label=''
     )
+    quote_id = forms.IntegerField(widget=forms.HiddenInput)
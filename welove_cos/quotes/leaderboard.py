@@ -0,0 +1,51 @@
+from django.conf import settings
+from django.db.models import Q
+
+from .models import Quote
+
+ORDERS = ('popularity', 'trending', 'rating', 'favourites')
+
+
+def leaderboard_page(order='popularity', after=None, size=None):
+    # Quotes ordered by the order field, descending, and then by id, that
+    # come after the cursor of the previous page. Returns the page and
+    # the cursor of the next one, or None if this is the last page.
+    size = size or settings.QUOTES_LEADERBOARD_PAGE_SIZE
+    quotes = leaderboard_quotes(order)
+    position = parse_cursor(order, after)
+    if position is not None:
+        value, quote_id = position
+        # The first condition only repeats the second, in the one form that
+        # bounds the scan of the (-order, id) index
+        quotes = quotes.filter(
+            Q(**{order + '__lte': value}),
+            Q(**{order + '__lt': value}) |
+            Q(**{order: value, 'id__gt': quote_id})
+        )
+    page = list(quotes[:size + 1])
+    if len(page) <= size:
+        return page, None
+    page = page[:size]
+    return page, make_cursor(getattr(page[-1], order), page[-1].id)
+
+
+def leaderboard_quotes(order='popularity'):
+    return Quote.objects.select_related('source').order_by(
+        '-' + order, 'id'
+    )
+
+
+def make_cursor(value, quote_id):
+    return '{!r}_{}'.format(value, quote_id)
+
+
+def parse_cursor(order, cursor):
+    # The (value, id) position in a cursor, or None if it is not valid
+    if not cursor:
+        return None
+    value, separator, quote_id = cursor.rpartition('_')
+    convert = float if order in ('trending', 'rating') else int
+    try:
+        return convert(value), int(quote_id)
+    except ValueError:
+        return None
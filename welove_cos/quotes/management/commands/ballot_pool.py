@@ -0,0 +1,37 @@
+from django.conf import settings
+from django.core.management.base import BaseCommand
+
+from quotes import ballots
+
+
+class Command(BaseCommand):
+    help = "Shows the poll ballot pool counters, optionally refilling it."
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--refill', action='store_true',
+            help="Refill the pool if it is below its low watermark"
+        )
+        parser.add_argument(
+            '--clear', action='store_true',
+            help="Drop every ballot in the pool"
+        )
+
+    def handle(self, *args, **options):
+        if options['clear']:
+            ballots.clear_pool()
+        if options['refill']:
+            added = ballots.refill_pool()
+            self.stdout.write("Added {} ballots".format(added))
+
+        stats = ballots.pool_stats()
+        self.stdout.write(
+            "Ballots in pool: {} (size {}, low watermark {})".format(
+                stats['size'],
+                settings.QUOTES_BALLOT_POOL_SIZE,
+                settings.QUOTES_BALLOT_POOL_LOW_WATERMARK
+            )
+        )
+        self.stdout.write("Hits: {}  Misses: {}  Refills: {}".format(
+            stats['hits'], stats['misses'], stats['refills']
+        ))
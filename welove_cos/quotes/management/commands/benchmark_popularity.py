@@ -0,0 +1,114 @@
+import resource
+import threading
+import time
+
+from django.contrib.auth.models import User
+from django.core.management.base import BaseCommand
+from django.db import transaction
+from django.test import RequestFactory
+
+from quotes.models import Quote
+from quotes.views import popularity
+
+
+class Rollback(Exception):
+    pass
+
+
+def current_rss():
+    # Resident set size in bytes, from /proc where available
+    try:
+        with open('/proc/self/statm') as statm:
+            pages = int(statm.read().split()[1])
+        return pages * resource.getpagesize()
+    except (IOError, OSError):
+        return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss * 1024
+
+
+class PeakRSS(object):
+    # Samples the resident set size in a thread while in the block
+
+    def __init__(self, interval=0.005):
+        self.interval = interval
+        self.peak = 0
+
+    def __enter__(self):
+        self.start = current_rss()
+        self.peak = self.start
+        self.done = threading.Event()
+        self.thread = threading.Thread(target=self.sample)
+        self.thread.start()
+        return self
+
+    def __exit__(self, *args):
+        self.done.set()
+        self.thread.join()
+
+    def sample(self):
+        while not self.done.wait(self.interval):
+            self.peak = max(self.peak, current_rss())
+
+    @property
+    def growth(self):
+        return self.peak - self.start
+
+
+class Command(BaseCommand):
+    help = (
+        "Times the streamed popularity leaderboard for growing catalogues "
+        "and reports its peak memory. Quotes are created inside a "
+        "transaction that is rolled back."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--sizes', type=int, nargs='+', default=[10000, 100000],
+            help="Catalogue sizes to measure"
+        )
+
+    def handle(self, *args, **options):
+        try:
+            with transaction.atomic():
+                self.run(options)
+                raise Rollback()
+        except Rollback:
+            pass
+
+    def run(self, options):
+        user = User.objects.create_user(
+            username="benchmark-{}".format(time.time())
+        )
+        self.stdout.write("{:>10} {:>10} {:>10} {:>10} {:>14}".format(
+            "quotes", "ttfb ms", "total ms", "MB", "peak RSS +MB"
+        ))
+        created = 0
+        for size in sorted(options['sizes']):
+            self.create_quotes(created, size)
+            created = size
+            request = RequestFactory().get('/popularity', {'all': 1})
+            request.user = user
+
+            with PeakRSS() as rss:
+                start = time.perf_counter()
+                response = popularity(request)
+                content = iter(response.streaming_content)
+                streamed = len(next(content))
+                first_byte = time.perf_counter() - start
+                for chunk in content:
+                    streamed += len(chunk)
+                total = time.perf_counter() - start
+
+            self.stdout.write(
+                "{:>10} {:>10.1f} {:>10.1f} {:>10.1f} {:>14.1f}".format(
+                    size, first_byte * 1000, total * 1000,
+                    streamed / 2 ** 20, rss.growth / 2 ** 20
+                )
+            )
+
+    def create_quotes(self, start, stop, batch_size=10000):
+        for batch_start in range(start, stop, batch_size):
+            batch_stop = min(batch_start + batch_size, stop)
+            Quote.objects.bulk_create(
+                Quote(quote_text="Benchmark quote {}".format(number))
+                for number in range(batch_start, batch_stop)
+            )
@@ -0,0 +1,87 @@
+import time
+
+from django.core.management.base import BaseCommand
+from django.db import transaction
+
+from quotes.models import Quote
+from quotes.sampling import QuoteSampler
+
+
+class Rollback(Exception):
+    pass
+
+
+class Command(BaseCommand):
+    help = (
+        "Times random quote picks for growing catalogues. "
+        "Quotes are created inside a transaction that is rolled back."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--sizes', type=int, nargs='+',
+            default=[100, 1000, 10000, 100000, 1000000],
+            help="Catalogue sizes to measure"
+        )
+        parser.add_argument(
+            '--picks', type=int, default=200,
+            help="Random picks timed for each size"
+        )
+        parser.add_argument(
+            '--compare', action='store_true',
+            help="Also time the old ORDER BY RANDOM() query"
+        )
+
+    def handle(self, *args, **options):
+        try:
+            with transaction.atomic():
+                self.run(options)
+                raise Rollback()
+        except Rollback:
+            pass
+
+    def run(self, options):
+        header = "{:>10} {:>12} {:>14}".format(
+            "quotes", "rebuild ms", "sampler us"
+        )
+        if options['compare']:
+            header = "{} {:>16}".format(header, "order_by('?') us")
+        self.stdout.write(header)
+
+        created = 0
+        for size in sorted(options['sizes']):
+            self.create_quotes(created, size)
+            created = size
+            sampler = QuoteSampler(max_age=float('inf'))
+
+            start = time.perf_counter()
+            sampler.rebuild()
+            rebuild_ms = (time.perf_counter() - start) * 1000
+
+            sampler_us = self.time_picks(
+                sampler.random_quote, options['picks']
+            )
+            line = "{:>10} {:>12.1f} {:>14.1f}".format(
+                size, rebuild_ms, sampler_us
+            )
+            if options['compare']:
+                order_by_us = self.time_picks(
+                    lambda: Quote.objects.order_by('?')[0],
+                    max(1, options['picks'] // 20)
+                )
+                line = "{} {:>16.1f}".format(line, order_by_us)
+            self.stdout.write(line)
+
+    def create_quotes(self, start, stop, batch_size=10000):
+        for batch_start in range(start, stop, batch_size):
+            batch_stop = min(batch_start + batch_size, stop)
+            Quote.objects.bulk_create(
+                Quote(quote_text="Benchmark quote {}".format(number))
+                for number in range(batch_start, batch_stop)
+            )
+
+    def time_picks(self, pick, picks):
+        start = time.perf_counter()
+        for i in range(picks):
+            pick()
+        return (time.perf_counter() - start) * 1000000 / picks
@@ -0,0 +1,86 @@
+import gc
+import os
+import resource
+import shutil
+import tempfile
+
+from django.core.management.base import BaseCommand
+from django.db import transaction
+
+from quotes.models import Quote, Source
+from quotes.snapshot import Snapshot, write_snapshot
+
+PAGE_SIZE = resource.getpagesize()
+
+
+def memory():
+    # Private and shared resident bytes of this process
+    with open('/proc/self/statm') as statm:
+        resident, shared = [int(field) for field in statm.read().split()[1:3]]
+    return (resident - shared) * PAGE_SIZE, shared * PAGE_SIZE
+
+
+class Command(BaseCommand):
+    help = (
+        "Compares the memory a process uses to hold all quotes as model "
+        "instances and to read them from a mapped snapshot. Quotes are "
+        "created for it and rolled back after."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--size', type=int, default=100000,
+            help="Quotes created for the benchmark"
+        )
+
+    def handle(self, *args, **options):
+        directory = tempfile.mkdtemp()
+        try:
+            with transaction.atomic():
+                self.create_quotes(options['size'])
+                self.compare(os.path.join(directory, 'quotes.snapshot'))
+                transaction.set_rollback(True)
+        finally:
+            shutil.rmtree(directory)
+
+    def create_quotes(self, size):
+        sources = [
+            Source.objects.create(
+                name="Source {}".format(i), link='https://example.com'
+            ) for i in range(100)
+        ]
+        Quote.objects.bulk_create(
+            (
+                Quote(
+                    quote_text="Benchmark quote number {} ".format(i) * 4,
+                    source=sources[i % len(sources)], popularity=i
+                ) for i in range(size)
+            ), batch_size=500
+        )
+
+    def compare(self, path):
+        write_snapshot(path)
+        self.stdout.write("{:>10} {:>14} {:>14}".format(
+            "", "private KiB", "shared KiB"
+        ))
+
+        # First, so the memory of the instances freed after is not reused
+        gc.collect()
+        before = memory()
+        snapshot = Snapshot(path)
+        for position in range(len(snapshot)):
+            snapshot.quote(position)
+        self.report("snapshot", before, memory())
+        del snapshot
+
+        gc.collect()
+        before = memory()
+        quotes = list(Quote.objects.select_related('source'))
+        self.report("models", before, memory())
+        del quotes
+
+    def report(self, name, before, after):
+        self.stdout.write("{:>10} {:>14} {:>14}".format(
+            name, (after[0] - before[0]) // 1024,
+            (after[1] - before[1]) // 1024
+        ))
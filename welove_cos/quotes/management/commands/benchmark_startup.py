@@ -0,0 +1,76 @@
+import json
+import os
+import subprocess
+import sys
+
+from django.conf import settings
+from django.core.management.base import BaseCommand
+
+# Run in a new interpreter for each measure, so nothing is loaded yet
+STARTUP_SCRIPT = """
+import json
+import sys
+import time
+
+start = time.perf_counter()
+from django.core.wsgi import get_wsgi_application
+get_wsgi_application()
+if sys.argv[1] == 'warm':
+    from quotes.warmup import warm_up
+    warm_up()
+startup = time.perf_counter() - start
+
+from django.test import Client
+client = Client()
+requests = []
+for path in sys.argv[2:]:
+    start = time.perf_counter()
+    client.get(path, secure=True)
+    requests.append(time.perf_counter() - start)
+print(json.dumps({'startup': startup, 'requests': requests}))
+"""
+
+
+class Command(BaseCommand):
+    help = (
+        "Times the start of the WSGI application with and without warm-up, "
+        "and the first and second requests to each path after it."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--paths', nargs='+', default=['/', '/daily', '/daily/archive'],
+            help="Paths requested after startup"
+        )
+        parser.add_argument(
+            '--runs', type=int, default=3,
+            help="New processes started for each measure, best one shown"
+        )
+
+    def handle(self, *args, **options):
+        paths = options['paths']
+        self.stdout.write("{:>8} {:>12} {:>16} {:>12} {:>12}".format(
+            "warm-up", "startup ms", "path", "first ms", "second ms"
+        ))
+        for mode in ('cold', 'warm'):
+            runs = [self.run(mode, paths) for i in range(options['runs'])]
+            startup = min(run['startup'] for run in runs)
+            for index, path in enumerate(paths):
+                first = min(run['requests'][index * 2] for run in runs)
+                second = min(run['requests'][index * 2 + 1] for run in runs)
+                self.stdout.write(
+                    "{:>8} {:>12.1f} {:>16} {:>12.1f} {:>12.1f}".format(
+                        "yes" if mode == 'warm' else "no",
+                        startup * 1000, path, first * 1000, second * 1000
+                    )
+                )
+
+    def run(self, mode, paths):
+        env = dict(os.environ)
+        env.setdefault('DJANGO_SETTINGS_MODULE', 'welove_cos.settings')
+        requested = [path for path in paths for i in range(2)]
+        output = subprocess.check_output(
+            [sys.executable, '-c', STARTUP_SCRIPT, mode] + requested,
+            cwd=settings.BASE_DIR, env=env
+        )
+        return json.loads(output.decode().strip().splitlines()[-1])
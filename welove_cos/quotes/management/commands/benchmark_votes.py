@@ -0,0 +1,83 @@
+import threading
+import time
+
+from django.core.management.base import BaseCommand
+from django.db import connection
+from django.test.utils import override_settings
+
+from quotes.models import Quote
+from quotes.votes import quote_popularity, record_vote
+
+
+class Command(BaseCommand):
+    help = (
+        "Measures vote throughput on a single quote for several numbers of "
+        "popularity shards. It votes in a scratch database, created and "
+        "destroyed like the one of the tests, never in the configured one."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--shards', type=int, nargs='+', default=[1, 2, 4, 8, 16],
+            help="Numbers of shards to measure"
+        )
+        parser.add_argument(
+            '--threads', type=int, default=16,
+            help="Concurrent voters"
+        )
+        parser.add_argument(
+            '--votes', type=int, default=500,
+            help="Votes cast by each voter"
+        )
+
+    def handle(self, *args, **options):
+        # Not in a transaction rolled back after, as the voters have
+        # connections of their own which would not see its rows
+        old_name = connection.creation.create_test_db(
+            verbosity=0, autoclobber=True, serialize=False
+        )
+        try:
+            self.run(options)
+        finally:
+            connection.creation.destroy_test_db(old_name, verbosity=0)
+
+    def run(self, options):
+        self.stdout.write("{:>8} {:>12} {:>10}".format(
+            "shards", "votes/s", "counted"
+        ))
+        for shards in options['shards']:
+            quote = Quote.objects.create(
+                quote_text="Benchmark quote {}".format(shards)
+            )
+            with override_settings(
+                QUOTES_VOTE_BUFFER=False, QUOTES_POPULARITY_SHARDS=shards
+            ):
+                elapsed = self.vote(
+                    quote.id, options['threads'], options['votes']
+                )
+            total_votes = options['threads'] * options['votes']
+            self.stdout.write("{:>8} {:>12.0f} {:>10}".format(
+                shards,
+                total_votes / elapsed,
+                quote_popularity(quote.id)
+            ))
+
+    def vote(self, quote_id, threads, votes):
+        start_voting = threading.Event()
+
+        def voter():
+            start_voting.wait()
+            try:
+                for i in range(votes):
+                    record_vote(quote_id)
+            finally:
+                connection.close()
+
+        voters = [threading.Thread(target=voter) for i in range(threads)]
+        for each in voters:
+            each.start()
+        start = time.perf_counter()
+        start_voting.set()
+        for each in voters:
+            each.join()
+        return time.perf_counter() - start
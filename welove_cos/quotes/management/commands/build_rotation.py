@@ -0,0 +1,40 @@
+import time
+from datetime import datetime, timedelta
+
+from django.core.management.base import BaseCommand, CommandError
+from django.utils import timezone
+
+from quotes import rotation
+
+
+class Command(BaseCommand):
+    help = (
+        "Replaces the daily quote rotation from a day on with a new "
+        "shuffle of all quotes. Past days are kept as history."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--start',
+            help="First day of the new rotation, as YYYY-MM-DD. "
+                 "Defaults to tomorrow, so today's quote does not change."
+        )
+        parser.add_argument(
+            '--batch-size', type=int, default=rotation.BUILD_BATCH_SIZE,
+            help="Slots inserted per query"
+        )
+
+    def handle(self, *args, **options):
+        if options['start']:
+            try:
+                start = datetime.strptime(options['start'], '%Y-%m-%d').date()
+            except ValueError:
+                raise CommandError("--start must be a YYYY-MM-DD date")
+        else:
+            start = timezone.localdate() + timedelta(days=1)
+
+        began = time.perf_counter()
+        slots = rotation.build_rotation(start, options['batch_size'])
+        self.stdout.write("Scheduled {} quotes from {} in {:.2f}s".format(
+            slots, start, time.perf_counter() - began
+        ))
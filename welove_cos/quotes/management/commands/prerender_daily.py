@@ -0,0 +1,17 @@
+from django.core.management.base import BaseCommand, CommandError
+
+from quotes import prerender
+
+
+class Command(BaseCommand):
+    help = (
+        "Stores the daily page for anonymous visitors, plain and "
+        "precompressed, in the shared cache. The prerender_daily_page task "
+        "does it after each rollover, this does it in between, like after "
+        "a deploy."
+    )
+
+    def handle(self, *args, **options):
+        if prerender.prerender_daily_page() is None:
+            raise CommandError("There is no daily quote to prerender")
+        self.stdout.write("Daily page prerendered")
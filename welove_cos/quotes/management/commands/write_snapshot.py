@@ -0,0 +1,30 @@
+import os
+import time
+
+from django.conf import settings
+from django.core.management.base import BaseCommand
+
+from quotes.snapshot import write_snapshot
+
+
+class Command(BaseCommand):
+    help = (
+        "Writes the quote snapshot, which the web processes of this "
+        "machine map in place of the previous one. They write it "
+        "themselves when it is missing or quotes changed, this writes it "
+        "ahead of their first request."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--path',
+            help="Where to write it instead of QUOTES_SNAPSHOT_PATH"
+        )
+
+    def handle(self, *args, **options):
+        path = options['path'] or settings.QUOTES_SNAPSHOT_PATH
+        began = time.perf_counter()
+        quotes = write_snapshot(path)
+        self.stdout.write("Wrote {} quotes, {} bytes, to {} in {:.2f}s".format(
+            quotes, os.path.getsize(path), path, time.perf_counter() - began
+        ))
@@ -0,0 +1,87 @@
+from django.conf import settings
+from django.core.cache import cache
+from django.http import HttpResponse
+from django.urls import reverse
+from django.utils import timezone
+from django.utils.cache import get_conditional_response, patch_vary_headers
+from django.utils.http import http_date
+
+from . import pagecache
+from .prerender import DAILY_KEY, ENCODINGS
+from .views import DAILY_PAGE_DEPENDS
+
+
+class PrerenderedDailyMiddleware(object):
+    # Serves the daily page stored by the prerender_daily_page task to
+    # anonymous visitors, without the view or the database. The daily view
+    # answers while it is missing or stale. Last in MIDDLEWARE, so the
+    # headers of the others are set on its responses too.
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+        self.daily_path = None
+
+    def __call__(self, request):
+        response = self.prerendered_response(request)
+        if response is None:
+            response = self.get_response(request)
+        return response
+
+    def current_page(self):
+        # One trip to the cache for the page and the versions it was built
+        # from
+        version_keys = [
+            pagecache.VERSION_KEY.format(depend)
+            for depend in DAILY_PAGE_DEPENDS
+        ]
+        found = cache.get_many([DAILY_KEY] + version_keys)
+        page = found.pop(DAILY_KEY, None)
+        if page is None:
+            return None
+        # Changed since, by the rollover, an edit or a new site message
+        versions = pagecache.current_versions(DAILY_PAGE_DEPENDS, found)
+        if page['day'] != timezone.localdate().isoformat() or \
+                page['versions'] != versions:
+            return None
+        return page
+
+    def prerendered_response(self, request):
+        if self.daily_path is None:
+            self.daily_path = reverse('daily')
+        if request.path != self.daily_path or \
+                request.method not in ('GET', 'HEAD') or \
+                not settings.QUOTES_PRERENDER_DAILY:
+            return None
+        # Possibly logged in, so with a link to their profile
+        if settings.SESSION_COOKIE_NAME in request.COOKIES:
+            return None
+        page = self.current_page()
+        if page is None:
+            return None
+
+        last_modified = int(page['built'])
+        response = get_conditional_response(
+            request, etag=page['etag'], last_modified=last_modified
+        )
+        if response is None:
+            accepted = [
+                part.split(';')[0].strip() for part in
+                request.META.get('HTTP_ACCEPT_ENCODING', '').split(',')
+            ]
+            encoding = next(
+                (encoding for encoding in ENCODINGS
+                 if encoding in page['compressed'] and encoding in accepted),
+                None
+            )
+            content = page['compressed'][encoding] if encoding \
+                else page['content']
+            response = HttpResponse(
+                content, content_type='text/html; charset=utf-8'
+            )
+            response['Content-Length'] = len(content)
+            if encoding:
+                response['Content-Encoding'] = encoding
+        response['ETag'] = page['etag']
+        response['Last-Modified'] = http_date(last_modified)
+        patch_vary_headers(response, ['Accept-Encoding', 'Cookie'])
+        return response
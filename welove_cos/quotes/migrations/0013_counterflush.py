@@ -0,0 +1,23 @@
+# Generated by Django 2.0.3 on 2026-10-18 10:06
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('quotes', '0012_message'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='CounterFlush',
+            fields=[
+                ('id', models.AutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('batch', models.CharField(max_length=32, unique=True)),
+                ('counter', models.CharField(max_length=30)),
+                ('rows', models.IntegerField(default=0)),
+                ('flushed_at', models.DateTimeField(auto_now_add=True, db_index=True)),
+            ],
+        ),
+    ]
@@ -0,0 +1,36 @@
+# Generated by Django 2.0.3 on 2026-10-18 10:08
+
+from django.db import migrations, models
+import django.db.models.deletion
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('quotes', '0013_counterflush'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='PopularityShard',
+            fields=[
+                ('id', models.AutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('shard', models.PositiveSmallIntegerField()),
+                ('count', models.BigIntegerField(default=0)),
+            ],
+        ),
+        migrations.AlterField(
+            model_name='quote',
+            name='popularity',
+            field=models.BigIntegerField(default=0),
+        ),
+        migrations.AddField(
+            model_name='popularityshard',
+            name='quote',
+            field=models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='popularity_shards', to='quotes.Quote'),
+        ),
+        migrations.AlterUniqueTogether(
+            name='popularityshard',
+            unique_together={('quote', 'shard')},
+        ),
+    ]
@@ -0,0 +1,25 @@
+# Generated by Django 2.0.13 on 2026-10-18 10:13
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('quotes', '0014_auto_20261018_1208'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='TrendingAnchor',
+            fields=[
+                ('id', models.AutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('anchor', models.DateTimeField()),
+            ],
+        ),
+        migrations.AddField(
+            model_name='quote',
+            name='trending',
+            field=models.FloatField(db_index=True, default=0),
+        ),
+    ]
@@ -0,0 +1,23 @@
+# Generated by Django 2.0.13 on 2026-10-18 10:16
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('quotes', '0015_auto_20261018_1213'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='quote',
+            name='impressions',
+            field=models.BigIntegerField(default=0),
+        ),
+        migrations.AddField(
+            model_name='quote',
+            name='rating',
+            field=models.FloatField(db_index=True, default=0),
+        ),
+    ]
@@ -0,0 +1,17 @@
+# Generated by Django 2.0.13 on 2026-10-18 10:20
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('quotes', '0016_auto_20261018_1216'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='quote',
+            index=models.Index(fields=['-popularity', 'id'], name='quotes_quot_popular_72ef09_idx'),
+        ),
+    ]
@@ -0,0 +1,29 @@
+# Generated by Django 2.0.13 on 2026-10-18 10:26
+
+from django.db import migrations, models
+
+
+def count_favourites(apps, schema_editor):
+    Quote = apps.get_model('quotes', 'Quote')
+    Profile = apps.get_model('quotes', 'Profile')
+    favourites = Profile.objects.filter(
+        favourite_quote__isnull=False
+    ).values_list('favourite_quote').annotate(count=models.Count('id'))
+    for quote_id, count in favourites:
+        Quote.objects.filter(pk=quote_id).update(favourites=count)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('quotes', '0017_auto_20261018_1220'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='quote',
+            name='favourites',
+            field=models.IntegerField(db_index=True, default=0),
+        ),
+        migrations.RunPython(count_favourites, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,35 @@
+# Generated by Django 2.0.13 on 2026-10-18 10:30
+
+from django.db import migrations, models
+import django.db.models.deletion
+
+
+def point_at_selected_quote(apps, schema_editor):
+    Quote = apps.get_model('quotes', 'Quote')
+    DailySelection = apps.get_model('quotes', 'DailySelection')
+    selected = Quote.objects.filter(selected=True).order_by('id').first()
+    if selected is not None:
+        DailySelection.objects.create(id=1, quote=selected)
+        Quote.objects.filter(selected=True).exclude(
+            id=selected.id
+        ).update(selected=False)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('quotes', '0018_quote_favourites'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='DailySelection',
+            fields=[
+                ('id', models.PositiveSmallIntegerField(default=1, editable=False, primary_key=True, serialize=False)),
+                ('quote', models.OneToOneField(on_delete=django.db.models.deletion.CASCADE, related_name='daily_selection', to='quotes.Quote')),
+            ],
+        ),
+        migrations.RunPython(
+            point_at_selected_quote, migrations.RunPython.noop
+        ),
+    ]
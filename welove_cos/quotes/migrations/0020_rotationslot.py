@@ -0,0 +1,22 @@
+# Generated by Django 2.0.13 on 2026-10-18 10:34
+
+from django.db import migrations, models
+import django.db.models.deletion
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('quotes', '0019_dailyselection'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='RotationSlot',
+            fields=[
+                ('id', models.AutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('day', models.DateField(unique=True)),
+                ('quote', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='rotation_slots', to='quotes.Quote')),
+            ],
+        ),
+    ]
@@ -0,0 +1,56 @@
+# Generated by Django 2.0.13 on 2026-10-18 10:38
+
+from django.db import migrations, models
+import django.db.models.deletion
+from django.utils import timezone
+
+
+def archive_past_selections(apps, schema_editor):
+    DailyArchive = apps.get_model('quotes', 'DailyArchive')
+    DailySelection = apps.get_model('quotes', 'DailySelection')
+    RotationSlot = apps.get_model('quotes', 'RotationSlot')
+    today = timezone.localdate()
+    days = [
+        (slot.day, slot.quote) for slot in RotationSlot.objects.filter(
+            day__lt=today
+        ).select_related('quote__source')
+    ]
+    selection = DailySelection.objects.select_related(
+        'quote__source'
+    ).first()
+    if selection is not None:
+        days.append((today, selection.quote))
+    DailyArchive.objects.bulk_create(
+        DailyArchive(
+            day=day,
+            quote=quote,
+            quote_text=quote.quote_text,
+            source_name=quote.source.name if quote.source else '',
+            source_link=quote.source.link if quote.source else ''
+        )
+        for day, quote in days
+    )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('quotes', '0020_rotationslot'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='DailyArchive',
+            fields=[
+                ('id', models.AutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('day', models.DateField(unique=True)),
+                ('quote_text', models.CharField(max_length=600)),
+                ('source_name', models.CharField(blank=True, max_length=100)),
+                ('source_link', models.URLField(blank=True, max_length=300)),
+                ('quote', models.ForeignKey(null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='+', to='quotes.Quote')),
+            ],
+        ),
+        migrations.RunPython(
+            archive_past_selections, migrations.RunPython.noop
+        ),
+    ]
@@ -0,0 +1,40 @@
+# Generated by Django 2.0.13 on 2026-10-18 12:40
+
+from django.db import migrations
+
+CONSTRAINT = 'quotes_dailyselection_single_row'
+
+
+# Only on PostgreSQL, as SQLite cannot add a constraint to an existing table
+def add_single_row_check(apps, schema_editor):
+    if schema_editor.connection.vendor != 'postgresql':
+        return
+    DailySelection = apps.get_model('quotes', 'DailySelection')
+    schema_editor.execute(
+        'ALTER TABLE {} ADD CONSTRAINT {} CHECK ({} = 1)'.format(
+            schema_editor.quote_name(DailySelection._meta.db_table),
+            schema_editor.quote_name(CONSTRAINT),
+            schema_editor.quote_name('id'),
+        )
+    )
+
+
+def drop_single_row_check(apps, schema_editor):
+    if schema_editor.connection.vendor != 'postgresql':
+        return
+    DailySelection = apps.get_model('quotes', 'DailySelection')
+    schema_editor.execute('ALTER TABLE {} DROP CONSTRAINT {}'.format(
+        schema_editor.quote_name(DailySelection._meta.db_table),
+        schema_editor.quote_name(CONSTRAINT),
+    ))
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('quotes', '0021_dailyarchive'),
+    ]
+
+    operations = [
+        migrations.RunPython(add_single_row_check, drop_single_row_check),
+    ]
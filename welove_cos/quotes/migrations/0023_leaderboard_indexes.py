@@ -0,0 +1,40 @@
+# Generated by Django 2.0.13 on 2026-10-18 11:56
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('quotes', '0022_dailyselection_single_row'),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name='quote',
+            name='favourites',
+            field=models.IntegerField(default=0),
+        ),
+        migrations.AlterField(
+            model_name='quote',
+            name='rating',
+            field=models.FloatField(default=0),
+        ),
+        migrations.AlterField(
+            model_name='quote',
+            name='trending',
+            field=models.FloatField(default=0),
+        ),
+        migrations.AddIndex(
+            model_name='quote',
+            index=models.Index(fields=['-trending', 'id'], name='quotes_quot_trendin_7f77fe_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='quote',
+            index=models.Index(fields=['-rating', 'id'], name='quotes_quot_rating_bde2f2_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='quote',
+            index=models.Index(fields=['-favourites', 'id'], name='quotes_quot_favouri_8eee39_idx'),
+        ),
+    ]
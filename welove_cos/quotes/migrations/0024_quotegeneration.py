@@ -0,0 +1,20 @@
+# Generated by Django 2.0.13 on 2026-10-18 12:02
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('quotes', '0023_leaderboard_indexes'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='QuoteGeneration',
+            fields=[
+                ('id', models.PositiveSmallIntegerField(default=1, editable=False, primary_key=True, serialize=False)),
+                ('generation', models.BigIntegerField(default=0)),
+            ],
+        ),
+    ]
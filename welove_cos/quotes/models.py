@@ -1,5 +1,6 @@
 from django.contrib.auth.models import User
-from django.db import models
+from django.db import models, transaction
+from django.utils import timezone
 
 # Create your models here.
 
@@ -16,20 +17,188 @@ class Quote(models.Model):
     quote_text = models.CharField(max_length=600, unique=True)
     selected = models.BooleanField(default=False)
     source = models.ForeignKey(Source, on_delete=models.CASCADE, null=True)
-    popularity = models.IntegerField(default=0)
+    popularity = models.BigIntegerField(default=0)
+    trending = models.FloatField(default=0)
+    impressions = models.BigIntegerField(default=0)
+    rating = models.FloatField(default=0)
+    # Profiles with this quote as favourite_quote
+    favourites = models.IntegerField(default=0)
+
+    class Meta:
+        # One per leaderboard order, for its keyset pages
+        indexes = [
+            models.Index(fields=['-popularity', 'id']),
+            models.Index(fields=['-trending', 'id']),
+            models.Index(fields=['-rating', 'id']),
+            models.Index(fields=['-favourites', 'id']),
+        ]
 
     def save(self, *args, **kwargs):
-        # Only one Quote instance can be 'selected'
-        if self.selected:
-            Quote.objects.filter(selected=True).update(selected=False)
+        # Only one Quote instance can be 'selected', the one DailySelection
+        # points at
+        adding = self._state.adding
+        with transaction.atomic():
+            super().save(*args, **kwargs)
 
-        super().save(*args, **kwargs)
+            if self.selected:
+                DailySelection.select(self)
+            elif not adding:
+                DailySelection.objects.filter(quote=self).delete()
 
     def __str__(self):
         returned_str = "A quote from %s" % (self.source.name)
         return returned_str
 
 
+class DailySelection(models.Model):
+    # Single row pointing at the daily quote, so reading it is a primary
+    # key fetch and changing it is a write to this row. On PostgreSQL a
+    # CHECK constraint keeps any other id out.
+    SINGLETON_ID = 1
+
+    id = models.PositiveSmallIntegerField(
+        primary_key=True, default=SINGLETON_ID, editable=False
+    )
+    quote = models.OneToOneField(
+        Quote, on_delete=models.CASCADE, related_name='daily_selection'
+    )
+
+    @classmethod
+    def select(cls, quote):
+        with transaction.atomic():
+            previous_id = cls.objects.select_for_update().filter(
+                pk=cls.SINGLETON_ID
+            ).values_list('quote_id', flat=True).first()
+            if previous_id is None:
+                cls.objects.create(pk=cls.SINGLETON_ID, quote=quote)
+            elif previous_id != quote.id:
+                cls.objects.filter(pk=cls.SINGLETON_ID).update(quote=quote)
+                Quote.objects.filter(pk=previous_id).update(selected=False)
+            # Also when the quote stays the daily one on a new day
+            DailyArchive.record(quote)
+
+    @classmethod
+    def current_quote(cls):
+        try:
+            return cls.objects.select_related('quote__source').get(
+                pk=cls.SINGLETON_ID
+            ).quote
+        except cls.DoesNotExist:
+            return None
+
+    def __str__(self):
+        returned_str = "Daily selection of quote {}".format(self.quote_id)
+        return returned_str
+
+
+class DailyArchive(models.Model):
+    # What the daily quote was on each day, copied so a past day reads the
+    # same even if its quote is later edited or deleted
+    day = models.DateField(unique=True)
+    quote = models.ForeignKey(
+        Quote, on_delete=models.SET_NULL, null=True, related_name='+'
+    )
+    quote_text = models.CharField(max_length=600)
+    source_name = models.CharField(max_length=100, blank=True)
+    source_link = models.URLField(max_length=300, blank=True)
+
+    @classmethod
+    def record(cls, quote, day=None):
+        # Sets the quote of the day, today by default
+        source = quote.source
+        cls.objects.update_or_create(
+            day=day or timezone.localdate(),
+            defaults={
+                'quote': quote,
+                'quote_text': quote.quote_text,
+                'source_name': source.name if source else '',
+                'source_link': source.link if source else '',
+            }
+        )
+
+    @property
+    def source(self):
+        return Source(name=self.source_name, link=self.source_link)
+
+    def __str__(self):
+        returned_str = "Daily quote of {}".format(self.day)
+        return returned_str
+
+
+class RotationSlot(models.Model):
+    # One day of the daily quote rotation, a shuffled permutation of all
+    # quotes. Past slots record which quote was the daily one.
+    day = models.DateField(unique=True)
+    quote = models.ForeignKey(
+        Quote, on_delete=models.CASCADE, related_name='rotation_slots'
+    )
+
+    def __str__(self):
+        returned_str = "Quote {} on {}".format(self.quote_id, self.day)
+        return returned_str
+
+
+class TrendingAnchor(models.Model):
+    # Single row with the time Quote.trending scores are relative to. Votes
+    # weigh 2 ** (hours since the anchor / half-life), so ordering by the
+    # stored score is ordering by the decayed score at any later time.
+    anchor = models.DateTimeField()
+
+    def __str__(self):
+        returned_str = "Trending scores relative to {}".format(self.anchor)
+        return returned_str
+
+
+class QuoteGeneration(models.Model):
+    # Single row counting changes to quotes and sources, bumped in the same
+    # transaction as each of them, so the processes of every machine agree
+    # on whether a quote snapshot is current
+    SINGLETON_ID = 1
+
+    id = models.PositiveSmallIntegerField(
+        primary_key=True, default=SINGLETON_ID, editable=False
+    )
+    generation = models.BigIntegerField(default=0)
+
+    @classmethod
+    def bump(cls):
+        generation, created = cls.objects.get_or_create(
+            pk=cls.SINGLETON_ID, defaults={'generation': 1}
+        )
+        if not created:
+            cls.objects.filter(pk=cls.SINGLETON_ID).update(
+                generation=models.F('generation') + 1
+            )
+
+    @classmethod
+    def current(cls):
+        return cls.objects.filter(pk=cls.SINGLETON_ID).values_list(
+            'generation', flat=True
+        ).first() or 0
+
+    def __str__(self):
+        returned_str = "Quotes generation {}".format(self.generation)
+        return returned_str
+
+
+class PopularityShard(models.Model):
+    # Votes are spread over several rows per quote so they do not all wait
+    # for the same row lock. They are moved into Quote.popularity by
+    # votes.fold_popularity_shards.
+    quote = models.ForeignKey(
+        Quote, on_delete=models.CASCADE, related_name='popularity_shards'
+    )
+    shard = models.PositiveSmallIntegerField()
+    count = models.BigIntegerField(default=0)
+
+    class Meta:
+        unique_together = ('quote', 'shard')
+
+    def __str__(self):
+        returned_str = "Shard {} of quote {}".format(self.shard, self.quote_id)
+        return returned_str
+
+
 class Profile(models.Model):
     user = models.OneToOneField(User, on_delete=models.CASCADE)
     subscribed = models.BooleanField(default=False)
@@ -56,3 +225,16 @@ class Message(models.Model):
     def __str__(self):
         returned_str = "Site message: {}".format(self.message_text)
         return returned_str
+
+
+class CounterFlush(models.Model):
+    # Batches of buffered counters already written, so a batch handed over
+    # again after a crash is not counted twice
+    batch = models.CharField(max_length=32, unique=True)
+    counter = models.CharField(max_length=30)
+    rows = models.IntegerField(default=0)
+    flushed_at = models.DateTimeField(auto_now_add=True, db_index=True)
+
+    def __str__(self):
+        returned_str = "Flush of {} {}".format(self.counter, self.batch)
+        return returned_str
@@ -0,0 +1,164 @@
+import hashlib
+import time
+import uuid
+
+from django.conf import settings
+from django.core.cache import cache
+from django.db import transaction
+
+VERSION_KEY = 'quotes:version:{}'
+PAGE_KEY = 'quotes:page:{}'
+LOCK_KEY = 'quotes:page:{}:lock'
+WAIT_INTERVAL = 0.05
+
+# What cached pages depend on
+DAILY_QUOTE = 'daily-quote'
+MESSAGE = 'message'
+QUOTES = 'quotes'
+
+
+def new_version():
+    return int(time.time() * 1000)
+
+
+def current_versions(depends, found):
+    # Versions of the templates and of what a page depends on, from those
+    # already read in found. Missing ones do not start from 0 again, in case
+    # pages built from a lost version are still cached.
+    versions = [str(settings.QUOTES_TEMPLATE_VERSION)]
+    for depend in depends:
+        key = VERSION_KEY.format(depend)
+        if key not in found:
+            cache.add(key, new_version(), settings.QUOTES_VERSION_TIMEOUT)
+            found[key] = cache.get(key)
+        versions.append(str(found[key]))
+    return '.'.join(versions)
+
+
+def read_versions(*depends):
+    return current_versions(
+        depends,
+        cache.get_many([VERSION_KEY.format(depend) for depend in depends])
+    )
+
+
+def invalidate(*depends):
+    for depend in depends:
+        key = VERSION_KEY.format(depend)
+        try:
+            cache.incr(key)
+        except ValueError:
+            cache.add(key, new_version(), settings.QUOTES_VERSION_TIMEOUT)
+
+
+def invalidate_on_commit(*depends):
+    # Pages rebuilt before the change is committed would be cached with the
+    # old content under the new versions
+    transaction.on_commit(lambda: invalidate(*depends))
+
+
+def is_fresh(page, versions):
+    return (
+        page is not None and page['versions'] == versions and
+        time.time() - page['built'] < settings.QUOTES_PAGE_CACHE_TIMEOUT
+    )
+
+
+def acquire_lock(name, wait=False):
+    # A token to release the lock with, or None if another process holds it
+    # and wait is False
+    key = LOCK_KEY.format(name)
+    token = uuid.uuid4().hex
+    deadline = time.monotonic() + settings.QUOTES_PAGE_REBUILD_TIMEOUT
+    while not cache.add(key, token, settings.QUOTES_PAGE_REBUILD_TIMEOUT):
+        if not wait or time.monotonic() > deadline:
+            return None
+        time.sleep(WAIT_INTERVAL)
+    return token
+
+
+def release_lock(name, token):
+    # Unless it expired and was taken by another process meanwhile
+    key = LOCK_KEY.format(name)
+    if cache.get(key) == token:
+        cache.delete(key)
+
+
+def make_page(versions, content):
+    # What is cached for a page, with a digest of its content to derive
+    # validators from
+    if content is None:
+        return None
+    return {
+        'versions': versions,
+        'content': content,
+        'digest': hashlib.md5(content.encode()).hexdigest(),
+        'built': time.time(),
+    }
+
+
+def store_page(name, versions, content):
+    page = make_page(versions, content)
+    if page is not None:
+        cache.set(PAGE_KEY.format(name), page, None)
+    return page
+
+
+def wait_for_page(name, versions):
+    # The page being rebuilt by another process, or None if it is not done
+    # in time or gave up
+    page_key = PAGE_KEY.format(name)
+    deadline = time.monotonic() + settings.QUOTES_PAGE_REBUILD_TIMEOUT
+    while time.monotonic() < deadline:
+        time.sleep(WAIT_INTERVAL)
+        page = cache.get(page_key)
+        if is_fresh(page, versions):
+            return page
+        if cache.get(LOCK_KEY.format(name)) is None:
+            return None
+    return None
+
+
+def get_page(name, depends, build):
+    # The page cached for name, as made by make_page, if it was built from
+    # the current versions of what it depends on less than
+    # QUOTES_PAGE_CACHE_TIMEOUT seconds ago. Otherwise a single process
+    # rebuilds it with build while the others serve the stale page, or wait
+    # for the new one if there is none. build returns the content, or None
+    # if it must not be cached, and then None is returned.
+    page_key = PAGE_KEY.format(name)
+    found = cache.get_many(
+        [page_key] + [VERSION_KEY.format(depend) for depend in depends]
+    )
+    versions = current_versions(depends, found)
+    page = found.get(page_key)
+    if is_fresh(page, versions):
+        return page
+
+    token = acquire_lock(name)
+    if token is None:
+        if page is None:
+            page = wait_for_page(name, versions)
+        if page is not None:
+            return page
+        return make_page(versions, build())
+    try:
+        # Rebuilt by another process since it was read
+        page = cache.get(page_key)
+        if is_fresh(page, versions):
+            return page
+        return store_page(name, versions, build())
+    finally:
+        release_lock(name, token)
+
+
+def refresh_page(name, depends, build, changed=()):
+    # Invalidates changed and rebuilds the page ahead of requests, which
+    # serve the previous page meanwhile instead of rebuilding it themselves
+    token = acquire_lock(name, wait=True)
+    try:
+        invalidate(*changed)
+        return store_page(name, read_versions(*depends), build())
+    finally:
+        if token is not None:
+            release_lock(name, token)
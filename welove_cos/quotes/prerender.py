@@ -0,0 +1,56 @@
+import gzip
+
+from django.conf import settings
+from django.contrib.auth.models import AnonymousUser
+from django.core.cache import cache
+from django.http import HttpRequest
+from django.utils import timezone
+
+from . import pagecache, views
+
+DAILY_KEY = 'quotes:prerendered:daily'
+
+# Content-Encodings the page is precompressed with, preferred first
+ENCODINGS = ['br', 'gzip']
+
+
+def compress(content):
+    # Precompressed versions of content, brotli only if it is installed
+    compressed = {'gzip': gzip.compress(content, 9)}
+    try:
+        import brotli
+    except ImportError:
+        pass
+    else:
+        compressed['br'] = brotli.compress(content)
+    return compressed
+
+
+def prerender_daily_page():
+    # Stores the daily page as anonymous visitors get it, plain and
+    # precompressed, in the shared cache for PrerenderedDailyMiddleware to
+    # serve. Returns what was stored, or None if there is no daily quote.
+    page = pagecache.get_page(
+        'daily', views.DAILY_PAGE_DEPENDS,
+        lambda: views.build_daily_page(HttpRequest())
+    )
+    if page is None:
+        cache.delete(DAILY_KEY)
+        return None
+
+    request = HttpRequest()
+    request.user = AnonymousUser()
+    user_link = views.render_user_link(request)
+    content = page['content'].replace(
+        views.USER_LINK_MARKER, user_link, 1
+    ).encode()
+    prerendered = {
+        'day': timezone.localdate().isoformat(),
+        'versions': page['versions'],
+        'etag': views.page_etag(page['digest'], user_link),
+        'built': page['built'],
+        'content': content,
+        'compressed': compress(content),
+    }
+    cache.set(DAILY_KEY, prerendered, settings.QUOTES_PAGE_CACHE_TIMEOUT)
+    return prerendered
@@ -0,0 +1,79 @@
+import random
+from array import array
+from datetime import timedelta
+
+from django.db import transaction
+
+from .models import Quote, RotationSlot
+
+BUILD_BATCH_SIZE = 10000
+
+
+def build_rotation(start, batch_size=BUILD_BATCH_SIZE):
+    # Replaces the schedule from start on with a shuffled permutation of
+    # all quotes, one per day. Ids are read through a cursor and the slots
+    # inserted in batches. Returns the number of slots.
+    ids = array('q', Quote.objects.values_list('id', flat=True).iterator())
+    random.shuffle(ids)
+    with transaction.atomic():
+        RotationSlot.objects.filter(day__gte=start).delete()
+        for batch_start in range(0, len(ids), batch_size):
+            RotationSlot.objects.bulk_create(
+                RotationSlot(
+                    day=start + timedelta(days=position),
+                    quote_id=ids[position]
+                )
+                for position in range(
+                    batch_start, min(batch_start + batch_size, len(ids))
+                )
+            )
+    return len(ids)
+
+
+def last_slot_after(day):
+    return RotationSlot.objects.select_for_update().filter(
+        day__gt=day
+    ).order_by('-day').first()
+
+
+def schedule_quote(quote_id, today):
+    # Puts a new quote in a random day of the remaining schedule, moving
+    # the quote of that day to the end, so the rest stays a uniform
+    # shuffle. Returns False if there is no schedule after today.
+    with transaction.atomic():
+        last = last_slot_after(today)
+        if last is None:
+            return False
+        days_left = (last.day - today).days
+        day = today + timedelta(days=random.randint(1, days_left + 1))
+        slot = RotationSlot.objects.select_for_update().filter(
+            day=day
+        ).first()
+        if slot is None:
+            RotationSlot.objects.create(day=day, quote_id=quote_id)
+        else:
+            RotationSlot.objects.filter(pk=slot.pk).update(quote_id=quote_id)
+            RotationSlot.objects.create(
+                day=last.day + timedelta(days=1), quote_id=slot.quote_id
+            )
+    return True
+
+
+def quote_for_day(day):
+    # The quote scheduled for the day. A day left empty by a deleted quote
+    # takes the last scheduled one, and a new rotation starts once the
+    # schedule has run out.
+    try:
+        return RotationSlot.objects.select_related('quote').get(
+            day=day
+        ).quote
+    except RotationSlot.DoesNotExist:
+        pass
+    with transaction.atomic():
+        last = last_slot_after(day)
+        if last is not None:
+            RotationSlot.objects.filter(pk=last.pk).update(day=day)
+            return last.quote
+    if not build_rotation(day):
+        return None
+    return RotationSlot.objects.select_related('quote').get(day=day).quote
@@ -0,0 +1,298 @@
+import random
+import threading
+import time
+from array import array
+
+from django.conf import settings
+
+from . import pagecache
+from .models import Quote
+
+
+class QuoteSampler(object):
+    # Keeps a dense array with the id of every quote, so a random pick is a
+    # random index plus a single primary key fetch, whatever the gaps in the
+    # id sequence look like.
+    # The array is kept current by the Quote signals of this process and
+    # rebuilt periodically to pick up changes made by other processes.
+
+    def __init__(self, max_age=None):
+        self._lock = threading.Lock()
+        self._ids = array('q')
+        self._positions = None
+        self._built_at = None
+        self._max_age = max_age
+
+    @property
+    def max_age(self):
+        if self._max_age is not None:
+            return self._max_age
+        return settings.QUOTES_SAMPLER_MAX_AGE
+
+    def __len__(self):
+        self._rebuild_if_stale()
+        return len(self._ids)
+
+    def rebuild(self):
+        ids = array('q', Quote.objects.values_list('id', flat=True).iterator())
+        with self._lock:
+            self._ids = ids
+            self._positions = None
+            self._built_at = time.monotonic()
+
+    def _rebuild_if_stale(self):
+        built_at = self._built_at
+        if built_at is None or time.monotonic() - built_at > self.max_age:
+            self.rebuild()
+
+    def _get_positions(self):
+        # Position of each id in the array, built on the first change after
+        # a rebuild so processes whose quotes do not change never hold it
+        if self._positions is None:
+            self._positions = dict(
+                (quote_id, position)
+                for position, quote_id in enumerate(self._ids)
+            )
+        return self._positions
+
+    def add(self, quote_id):
+        with self._lock:
+            if self._built_at is None:
+                return
+            positions = self._get_positions()
+            if quote_id not in positions:
+                positions[quote_id] = len(self._ids)
+                self._ids.append(quote_id)
+
+    def discard(self, quote_id):
+        # Swap the last id into the freed position to keep the array dense
+        with self._lock:
+            positions = self._get_positions()
+            position = positions.pop(quote_id, None)
+            if position is None:
+                return
+            last_id = self._ids.pop()
+            if position < len(self._ids):
+                self._ids[position] = last_id
+                positions[last_id] = position
+
+    def random_id(self):
+        self._rebuild_if_stale()
+        # Under the lock, so discard cannot shrink the array between
+        # picking a position and reading it
+        with self._lock:
+            ids = self._ids
+            if not ids:
+                return None
+            return ids[random.randrange(len(ids))]
+
+    def sample_choices(self, number, spare=2):
+        # Distinct quotes without replacement as (id, quote_text) pairs, in a
+        # single query
+        ballots = self.sample_ballots(1, number, spare=spare)
+        return ballots[0] if ballots else []
+
+    def sample_ballots(self, count, number, spare=2):
+        # Several lists of distinct (id, quote_text) pairs, all fetched in a
+        # single query. A few spare ids per list make up for quotes deleted
+        # by other processes since the last rebuild.
+        self._rebuild_if_stale()
+        available = len(self._ids)
+        if count < 1 or available < number:
+            return []
+        sample_size = min(available, number + spare)
+        sampled = [self._sample_ids(sample_size) for i in range(count)]
+        texts = dict(
+            Quote.objects.filter(
+                pk__in=set(
+                    quote_id for ballot_ids in sampled
+                    for quote_id in ballot_ids
+                )
+            ).values_list('id', 'quote_text')
+        )
+        ballots = []
+        for sampled_ids in sampled:
+            ballot = [
+                (quote_id, texts[quote_id])
+                for quote_id in sampled_ids if quote_id in texts
+            ][:number]
+            if len(ballot) == number:
+                ballots.append(ballot)
+            else:
+                self._built_at = None
+        return ballots
+
+    def sample_ids(self, size):
+        # At most size distinct ids drawn from the current index
+        self._rebuild_if_stale()
+        size = min(size, len(self._ids))
+        if size < 1:
+            return []
+        return self._sample_ids(size)
+
+    def _sample_ids(self, size):
+        with self._lock:
+            ids = self._ids
+            return [
+                ids[position] for position in
+                random.sample(range(len(ids)), min(size, len(ids)))
+            ]
+
+    def random_quote(self):
+        for attempt in range(2):
+            quote_id = self.random_id()
+            if quote_id is None:
+                return None
+            try:
+                return Quote.objects.select_related('source').get(pk=quote_id)
+            except Quote.DoesNotExist:
+                # The index pointed at a quote deleted by another process
+                self.rebuild()
+        return None
+
+
+def alias_table(weights):
+    # Vose's alias method: position i is kept with probabilities[i] and
+    # swapped for aliases[i] otherwise, which draws each position with a
+    # chance proportional to its weight in constant time
+    size = len(weights)
+    probabilities = array('d', [1.0] * size)
+    aliases = array('q', range(size))
+    total = sum(weights)
+    if not size or total <= 0:
+        return probabilities, aliases
+    scaled = [weight * size / total for weight in weights]
+    small = [i for i, value in enumerate(scaled) if value < 1]
+    large = [i for i, value in enumerate(scaled) if value >= 1]
+    while small and large:
+        less = small.pop()
+        more = large.pop()
+        probabilities[less] = scaled[less]
+        aliases[less] = more
+        scaled[more] = scaled[more] + scaled[less] - 1
+        if scaled[more] < 1:
+            small.append(more)
+        else:
+            large.append(more)
+    return probabilities, aliases
+
+
+def exposure_weight(impressions):
+    return 1 / (1 + impressions / settings.QUOTES_POLL_EXPOSURE_SCALE)
+
+
+class ExposureSampler(QuoteSampler):
+    # Draws the quotes of poll ballots favouring those shown the least,
+    # from an alias table built with the impression counts. It is rebuilt
+    # when older than max_age, or as soon as quotes are added or removed.
+
+    # Draws tried per id before falling back to uniform picks, for tables
+    # dominated by a few quotes
+    MAX_DRAWS_PER_ID = 10
+
+    def __init__(self, max_age=None):
+        super().__init__(max_age=max_age)
+        self._table = (self._ids, array('d'), array('q'))
+
+    def rebuild(self):
+        ids = array('q')
+        weights = []
+        for quote_id, impressions in Quote.objects.values_list(
+            'id', 'impressions'
+        ).iterator():
+            ids.append(quote_id)
+            weights.append(exposure_weight(impressions))
+        probabilities, aliases = alias_table(weights)
+        with self._lock:
+            self._ids = ids
+            self._table = (ids, probabilities, aliases)
+            self._built_at = time.monotonic()
+
+    def add(self, quote_id):
+        self._built_at = None
+
+    def discard(self, quote_id):
+        self._built_at = None
+
+    def _sample_ids(self, size):
+        ids, probabilities, aliases = self._table
+        size = min(size, len(ids))
+        chosen = []
+        for draw in range(size * self.MAX_DRAWS_PER_ID):
+            if len(chosen) == size:
+                return [ids[position] for position in chosen]
+            position = random.randrange(len(ids))
+            if random.random() >= probabilities[position]:
+                position = aliases[position]
+            if position not in chosen:
+                chosen.append(position)
+        for position in random.sample(range(len(ids)), size):
+            if len(chosen) == size:
+                break
+            if position not in chosen:
+                chosen.append(position)
+        return [ids[position] for position in chosen]
+
+
+class QuoteDeck(object):
+    # Shuffled quotes, with their sources, dealt one by one so most random
+    # picks touch no database. When empty it is refilled in a single query
+    # from a random window of at most QUOTES_RANDOM_DECK_SIZE quotes, which
+    # bounds its memory whatever the size of the catalogue. It is dropped
+    # when the quotes version in the shared cache changes.
+
+    def __init__(self, sampler, size=None):
+        self._lock = threading.Lock()
+        self._sampler = sampler
+        self._cards = []
+        self._version = None
+        self._size = size
+
+    @property
+    def size(self):
+        if self._size is not None:
+            return self._size
+        return settings.QUOTES_RANDOM_DECK_SIZE
+
+    def __len__(self):
+        return len(self._cards)
+
+    def clear(self):
+        with self._lock:
+            self._cards = []
+            self._version = None
+
+    def deal(self):
+        version = pagecache.read_versions(pagecache.QUOTES)
+        with self._lock:
+            if version != self._version:
+                self._cards = []
+            if self._cards:
+                return self._cards.pop()
+        cards = self._draw_cards()
+        with self._lock:
+            self._cards = cards
+            self._version = version
+            if self._cards:
+                return self._cards.pop()
+        return None
+
+    def _draw_cards(self):
+        ids = self._sampler.sample_ids(self.size)
+        if not ids:
+            return []
+        cards = list(
+            Quote.objects.filter(pk__in=ids).select_related('source').only(
+                'id', 'quote_text', 'source__name', 'source__link'
+            )
+        )
+        if len(cards) < len(ids):
+            # Some were deleted by other processes since the last rebuild
+            self._sampler.rebuild()
+        random.shuffle(cards)
+        return cards
+
+
+sampler = QuoteSampler()
+poll_sampler = ExposureSampler()
+deck = QuoteDeck(sampler)
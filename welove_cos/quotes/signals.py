@@ -0,0 +1,72 @@
+from django.db.models.signals import post_delete, post_save, pre_save
+from django.dispatch import receiver
+from django.utils import timezone
+
+from . import ballots, pagecache, rotation
+from .context_processors import message_cache
+from .favourites import count_favourite
+from .models import Message, Profile, Quote, QuoteGeneration, Source
+from .sampling import deck, poll_sampler, sampler
+
+
+@receiver(post_save, sender=Quote)
+def add_quote_to_sampler(sender, instance, created, **kwargs):
+    if created:
+        sampler.add(instance.id)
+        poll_sampler.add(instance.id)
+        rotation.schedule_quote(instance.id, timezone.localdate())
+
+
+@receiver(post_delete, sender=Quote)
+def remove_quote_from_sampler(sender, instance, **kwargs):
+    sampler.discard(instance.id)
+    poll_sampler.discard(instance.id)
+    ballots.clear_pool()
+
+
+@receiver(pre_save, sender=Profile)
+def remember_previous_favourite(sender, instance, **kwargs):
+    if instance.pk is None:
+        instance._previous_favourite_id = None
+        return
+    instance._previous_favourite_id = Profile.objects.filter(
+        pk=instance.pk
+    ).values_list('favourite_quote_id', flat=True).first()
+
+
+@receiver(post_save, sender=Profile)
+def count_changed_favourite(sender, instance, **kwargs):
+    # Keeps Quote.favourites right when a profile is saved elsewhere, such
+    # as in the admin
+    previous_id = getattr(instance, '_previous_favourite_id', None)
+    if previous_id != instance.favourite_quote_id:
+        count_favourite(previous_id, -1)
+        count_favourite(instance.favourite_quote_id, 1)
+    instance._previous_favourite_id = instance.favourite_quote_id
+
+
+@receiver(post_delete, sender=Profile)
+def count_deleted_favourite(sender, instance, **kwargs):
+    count_favourite(instance.favourite_quote_id, -1)
+
+
+@receiver(post_save, sender=Quote)
+@receiver(post_delete, sender=Quote)
+@receiver(post_save, sender=Source)
+@receiver(post_delete, sender=Source)
+def invalidate_quotes(sender, **kwargs):
+    # The daily quote may have changed, or its text or source been edited.
+    # This process deals new cards right away, the others once committed.
+    # Quote snapshots are written again once they find the new generation.
+    deck.clear()
+    pagecache.invalidate_on_commit(pagecache.DAILY_QUOTE, pagecache.QUOTES)
+    QuoteGeneration.bump()
+
+
+@receiver(post_save, sender=Message)
+@receiver(post_delete, sender=Message)
+def invalidate_message_pages(sender, **kwargs):
+    # Other processes fetch the message again once the new version is
+    # committed, this one right away
+    message_cache.clear()
+    pagecache.invalidate_on_commit(pagecache.MESSAGE)
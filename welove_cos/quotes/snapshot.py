@@ -0,0 +1,245 @@
+import bisect
+import fcntl
+import mmap
+import os
+import random
+import struct
+import tempfile
+import threading
+import time
+from array import array
+from collections import namedtuple
+
+from django.conf import settings
+
+from .common import warning_email_admin
+from .models import Quote, QuoteGeneration, Source
+
+MAGIC = b'WLCS'
+FORMAT_VERSION = 3
+# Magic, format version, generation, time written, quotes, sources
+HEADER = struct.Struct('<4sIQQII')
+ALIGNMENT = 8
+
+SnapshotSource = namedtuple('SnapshotSource', ['name', 'link'])
+SnapshotQuote = namedtuple(
+    'SnapshotQuote', ['id', 'quote_text', 'popularity', 'source']
+)
+
+
+def aligned(position):
+    return -(-position // ALIGNMENT) * ALIGNMENT
+
+
+def write_snapshot(path=None):
+    # Writes every quote and source to one file: the header, then arrays of
+    # ids, popularities, source positions, offsets of the texts and offsets
+    # of the source names and links, and last a blob with all the UTF-8
+    # text. Arrays are in the byte order of this machine, for the processes
+    # on it. The file is renamed into place, so readers map either the old
+    # snapshot or the new one. Returns the number of quotes written.
+    path = path or settings.QUOTES_SNAPSHOT_PATH
+    # Read first, so a change committed meanwhile leaves it outdated
+    generation = QuoteGeneration.current()
+    blob = bytearray()
+
+    def add_text(text):
+        blob.extend((text or '').encode())
+        return len(blob)
+
+    source_positions = {}
+    source_offsets = array('I', [0])
+    for position, (source_id, name, link) in enumerate(
+        Source.objects.order_by('id').values_list(
+            'id', 'name', 'link'
+        ).iterator()
+    ):
+        source_positions[source_id] = position
+        source_offsets.append(add_text(name))
+        source_offsets.append(add_text(link))
+
+    ids = array('q')
+    popularities = array('q')
+    sources = array('i')
+    text_offsets = array('I', [len(blob)])
+    for quote_id, popularity, quote_text, source_id in (
+        Quote.objects.order_by('id').values_list(
+            'id', 'popularity', 'quote_text', 'source_id'
+        ).iterator()
+    ):
+        ids.append(quote_id)
+        popularities.append(popularity)
+        sources.append(source_positions.get(source_id, -1))
+        text_offsets.append(add_text(quote_text))
+
+    directory = os.path.dirname(os.path.abspath(path))
+    os.makedirs(directory, exist_ok=True)
+    descriptor, temporary_path = tempfile.mkstemp(
+        dir=directory, prefix='.snapshot'
+    )
+    try:
+        with os.fdopen(descriptor, 'wb') as snapshot_file:
+            snapshot_file.write(HEADER.pack(
+                MAGIC, FORMAT_VERSION, generation, int(time.time() * 1000),
+                len(ids), len(source_positions)
+            ))
+            for section in [
+                ids, popularities, sources, text_offsets, source_offsets
+            ]:
+                snapshot_file.write(section.tobytes())
+                padding = aligned(snapshot_file.tell()) - snapshot_file.tell()
+                snapshot_file.write(b'\0' * padding)
+            snapshot_file.write(blob)
+        os.chmod(temporary_path, 0o644)
+        os.replace(temporary_path, path)
+    except BaseException:
+        os.remove(temporary_path)
+        raise
+    return len(ids)
+
+
+class Snapshot(object):
+    # A snapshot file mapped read-only. Its arrays are views on the mapping,
+    # not copies, so the pages are shared by every process mapping the same
+    # file and only quotes read are decoded.
+
+    def __init__(self, path):
+        with open(path, 'rb') as snapshot_file:
+            self._map = mmap.mmap(
+                snapshot_file.fileno(), 0, access=mmap.ACCESS_READ
+            )
+        (magic, version, self.generation, self.written, count,
+         source_count) = HEADER.unpack_from(self._map)
+        if magic != MAGIC or version != FORMAT_VERSION:
+            raise ValueError("{} is not a quote snapshot".format(path))
+
+        view = memoryview(self._map)
+        position = HEADER.size
+        sections = []
+        for code, length in [
+            ('q', count), ('q', count), ('i', count), ('I', count + 1),
+            ('I', 2 * source_count + 1)
+        ]:
+            end = position + struct.calcsize(code) * length
+            sections.append(view[position:end].cast(code))
+            position = aligned(end)
+        (self.ids, self.popularities, self._sources, self._text_offsets,
+         self._source_offsets) = sections
+        self._blob = view[position:]
+
+    def __len__(self):
+        return len(self.ids)
+
+    def _text(self, offsets, index):
+        return str(self._blob[offsets[index]:offsets[index + 1]], 'utf-8')
+
+    def source(self, position):
+        if position < 0:
+            return None
+        return SnapshotSource(
+            name=self._text(self._source_offsets, 2 * position),
+            link=self._text(self._source_offsets, 2 * position + 1),
+        )
+
+    def quote(self, position):
+        return SnapshotQuote(
+            id=self.ids[position],
+            quote_text=self._text(self._text_offsets, position),
+            popularity=self.popularities[position],
+            source=self.source(self._sources[position]),
+        )
+
+    def get(self, quote_id):
+        # The quote with quote_id, or None, by binary search of the ids
+        position = bisect.bisect_left(self.ids, quote_id)
+        if position < len(self.ids) and self.ids[position] == quote_id:
+            return self.quote(position)
+        return None
+
+
+class SnapshotReader(object):
+    # The snapshot at QUOTES_SNAPSHOT_PATH, mapped again when a new one is
+    # renamed over it, without restarting the process. It is written again
+    # when missing or behind the QuoteGeneration in the database, which is
+    # read at most every QUOTES_SNAPSHOT_CHECK_INTERVAL seconds.
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._snapshot = None
+        self._file_key = None
+        self._generation = None
+        self._checked_at = None
+        # Generation last tried to write for, not to try again on every
+        # request when the file cannot be written
+        self._written_for = None
+
+    def current(self):
+        path = settings.QUOTES_SNAPSHOT_PATH
+        if not path:
+            return None
+        try:
+            stat = os.stat(path)
+        except OSError:
+            return None
+        file_key = (path, stat.st_ino, stat.st_mtime_ns, stat.st_size)
+        if file_key != self._file_key:
+            with self._lock:
+                if file_key != self._file_key:
+                    try:
+                        self._snapshot = Snapshot(path)
+                    except (OSError, ValueError, struct.error):
+                        self._snapshot = None
+                    self._file_key = file_key
+        return self._snapshot
+
+    def generation(self):
+        checked_at = self._checked_at
+        now = time.monotonic()
+        if checked_at is None or \
+                now - checked_at > settings.QUOTES_SNAPSHOT_CHECK_INTERVAL:
+            self._generation = QuoteGeneration.current()
+            self._checked_at = now
+        return self._generation
+
+    def write(self, generation):
+        # Written by one process of the machine at a time, the others deal
+        # from their decks meanwhile
+        if self._written_for == generation:
+            return
+        path = settings.QUOTES_SNAPSHOT_PATH
+        try:
+            os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+            with open(path + '.lock', 'a') as lock_file:
+                try:
+                    fcntl.flock(lock_file, fcntl.LOCK_EX | fcntl.LOCK_NB)
+                except BlockingIOError:
+                    return
+                self._written_for = generation
+                # Unless another process just did
+                snapshot = self.current()
+                if snapshot is None or snapshot.generation < generation:
+                    write_snapshot(path)
+        except OSError as error:
+            self._written_for = generation
+            warning_email_admin(
+                "WARNING: Quote snapshot not written to {}: {}".format(
+                    path, error
+                )
+            )
+
+    def random_quote(self):
+        # None while the snapshot is missing or behind the database. One
+        # ahead was written by a process that checked more recently.
+        if not settings.QUOTES_SNAPSHOT_PATH:
+            return None
+        generation = self.generation()
+        snapshot = self.current()
+        if snapshot is None or snapshot.generation < generation:
+            self.write(generation)
+            snapshot = self.current()
+        if not snapshot or snapshot.generation < generation:
+            return None
+        return snapshot.quote(random.randrange(len(snapshot)))
+
+
+snapshot_reader = SnapshotReader()
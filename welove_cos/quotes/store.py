@@ -0,0 +1,141 @@
+import threading
+import time
+from collections import deque
+
+from django.conf import settings
+
+
+class LocalStore(object):
+    # In-process stand-in for the few Redis commands we use, for development
+    # and tests. Values are kept as strings, like Redis returns them.
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._data = {}
+        self._expires = {}
+
+    def _expire(self, key):
+        expires = self._expires.get(key)
+        if expires is not None and expires <= time.monotonic():
+            self._data.pop(key, None)
+            self._expires.pop(key, None)
+
+    def delete(self, *keys):
+        with self._lock:
+            for key in keys:
+                self._expire(key)
+                self._expires.pop(key, None)
+            removed = [self._data.pop(key, None) for key in keys]
+            return len([value for value in removed if value is not None])
+
+    def exists(self, key):
+        with self._lock:
+            self._expire(key)
+            return key in self._data
+
+    def get(self, key):
+        with self._lock:
+            self._expire(key)
+            return self._data.get(key)
+
+    def set(self, key, value, ex=None, nx=False):
+        with self._lock:
+            self._expire(key)
+            if nx and key in self._data:
+                return None
+            self._data[key] = str(value)
+            self._expires.pop(key, None)
+            if ex is not None:
+                self._expires[key] = time.monotonic() + ex
+            return True
+
+    def rename(self, source, destination):
+        with self._lock:
+            self._expire(source)
+            if source not in self._data:
+                raise KeyError(source)
+            self._data[destination] = self._data.pop(source)
+            self._expires.pop(destination, None)
+            return True
+
+    def renamenx(self, source, destination):
+        with self._lock:
+            self._expire(source)
+            self._expire(destination)
+            if source not in self._data:
+                raise KeyError(source)
+            if destination in self._data:
+                return False
+            self._data[destination] = self._data.pop(source)
+            self._expires.pop(destination, None)
+            return True
+
+    def rpush(self, key, *values):
+        with self._lock:
+            items = self._data.setdefault(key, deque())
+            items.extend(str(value) for value in values)
+            return len(items)
+
+    def lpop(self, key):
+        with self._lock:
+            items = self._data.get(key)
+            if not items:
+                return None
+            value = items.popleft()
+            if not items:
+                del self._data[key]
+            return value
+
+    def llen(self, key):
+        return len(self._data.get(key, ()))
+
+    def ltrim(self, key, start, end):
+        with self._lock:
+            items = self._data.get(key)
+            if items is None:
+                return True
+            end = len(items) if end == -1 else end + 1
+            self._data[key] = deque(list(items)[start:end])
+            return True
+
+    def hincrby(self, key, field, amount=1):
+        with self._lock:
+            fields = self._data.setdefault(key, {})
+            value = int(fields.get(field, 0)) + amount
+            fields[field] = str(value)
+            return value
+
+    def hsetnx(self, key, field, value):
+        with self._lock:
+            fields = self._data.setdefault(key, {})
+            if field in fields:
+                return 0
+            fields[field] = str(value)
+            return 1
+
+    def hget(self, key, field):
+        return self._data.get(key, {}).get(field)
+
+    def hgetall(self, key):
+        return dict(self._data.get(key, {}))
+
+
+_store = None
+_store_lock = threading.Lock()
+
+
+def get_store():
+    # Redis when QUOTES_REDIS_URL is set, so all processes share the data,
+    # otherwise a store local to this process
+    global _store
+    if _store is None:
+        with _store_lock:
+            if _store is None:
+                if settings.QUOTES_REDIS_URL:
+                    import redis
+                    _store = redis.StrictRedis.from_url(
+                        settings.QUOTES_REDIS_URL, decode_responses=True
+                    )
+                else:
+                    _store = LocalStore()
+    return _store
@@ -1,32 +1,40 @@
 from __future__ import absolute_import, unicode_literals
+import time
 from celery import shared_task
 from django.conf import settings
 from django.core.mail import EmailMessage
+from django.db import transaction
 from django.urls import reverse
-from .models import Quote, Profile
+from django.utils import timezone
+from .models import DailySelection, Quote, Profile
+from . import ballots, exposure, prerender, rotation, trending, votes
 from .common import warning_email_admin
 from .context_processors import COMMON_ORIGIN, TYPE_OF_SOURCE
+from .views import refresh_daily_page
 
 
 @shared_task
 def control_popularity():
     most_popular_quote = Quote.objects.order_by('popularity').reverse()[0]
     highest_popularity = most_popular_quote.popularity
-    safe_integerfield_value = 2000000000
+    # Quote.popularity is 64 bit wide, so this is not expected to happen
+    safe_integerfield_value = 2 ** 62
     if highest_popularity >= safe_integerfield_value:
+        start = time.perf_counter()
+        rows = votes.halve_popularities()
+        elapsed = time.perf_counter() - start
         warning_email_admin(
-            "WARNING: All quote popularities are now being divided by half"
+            "WARNING: All quote popularities were divided by half {}".format(
+                "({} quotes updated in {:.2f} seconds)".format(rows, elapsed)
+            )
         )
-        for quote in Quote.objects.all():
-            quote.popularity = quote.popularity/2
-            quote.save()
 
 
 @shared_task
 def send_daily_quote_emails():
     subscribed_profiles = Profile.objects.filter(subscribed=True)
     title = "Your daily quote from {}".format(COMMON_ORIGIN)
-    quote = Quote.objects.filter(selected=True)[0]
+    quote = DailySelection.current_quote()
     body = "Today's quote from {} is:\n\n\"{}\"\n\nfrom the {} {}.".format(
         COMMON_ORIGIN,
         quote.quote_text,
@@ -46,12 +54,47 @@ def send_daily_quote_emails():
 
 @shared_task
 def get_random_quote():
-    selected_quotes = Quote.objects.filter(selected=True)
-    for quote in selected_quotes:
-        quote.selected = False
-        quote.save()
-    random_quote = Quote.objects.order_by('?')[0]
-    random_quote.selected = True
-    random_quote.save()
+    # The flags and the pointer change together in one transaction, so the
+    # daily quote is never missing. Only 'selected' is written, not the
+    # counters of the quote, which may have moved since it was read.
+    random_quote = rotation.quote_for_day(timezone.localdate())
+    if random_quote is None:
+        return
+    with transaction.atomic():
+        Quote.objects.filter(pk=random_quote.pk).update(selected=True)
+        DailySelection.select(random_quote)
+        # Rebuilt before visitors find it stale
+        transaction.on_commit(refresh_daily_page)
+        transaction.on_commit(prerender_daily_page.delay)
 
     print("{} - Selected".format(random_quote.quote_text))
+
+
+@shared_task
+def prerender_daily_page():
+    return prerender.prerender_daily_page() is not None
+
+
+@shared_task
+def refill_ballot_pool():
+    return ballots.refill_pool()
+
+
+@shared_task
+def flush_vote_buffer():
+    return votes.flush_vote_buffer()
+
+
+@shared_task
+def fold_popularity_shards():
+    return votes.fold_popularity_shards()
+
+
+@shared_task
+def rebase_trending():
+    trending.rebase_trending()
+
+
+@shared_task
+def flush_impression_buffer():
+    return exposure.flush_impression_buffer()
@@ -0,0 +1,73 @@
+from mock import patch
+from . import ballots
+from .tasks import refill_ballot_pool
+from .tests import QuoteReadyTestCase
+
+
+class BallotPoolTest(QuoteReadyTestCase):
+
+    def setUp(self):
+        ballots.clear_pool()
+        ballots.get_store().delete(ballots.STATS_KEY)
+        ballots.poll_sampler.rebuild()
+        self.quotes = [
+            self.create_quote(text="Quote number {}".format(i))
+            for i in range(6)
+        ]
+
+    def tearDown(self):
+        ballots.clear_pool()
+
+    def test_refill_up_to_pool_size(self):
+        with self.settings(
+            QUOTES_BALLOT_POOL_SIZE=10, QUOTES_BALLOT_POOL_LOW_WATERMARK=3
+        ):
+            self.assertEqual(refill_ballot_pool(), 10)
+            self.assertEqual(ballots.pool_stats()['size'], 10)
+            self.assertEqual(refill_ballot_pool(), 0)
+            for i in range(8):
+                ballots.pop_ballot()
+            self.assertEqual(refill_ballot_pool(), 8)
+            self.assertEqual(ballots.pool_stats()['size'], 10)
+
+    def test_ballots_hold_distinct_quotes(self):
+        all_choices = [(quote.id, quote.quote_text) for quote in self.quotes]
+        ballots.refill_pool()
+        ballot = ballots.pop_ballot()
+        self.assertEqual(len(ballot), ballots.BALLOT_SIZE)
+        self.assertEqual(len(set(ballot)), ballots.BALLOT_SIZE)
+        for choice in ballot:
+            self.assertIn(choice, all_choices)
+
+    def test_pop_is_one_store_operation_without_queries(self):
+        ballots.refill_pool()
+        with self.assertNumQueries(0):
+            self.assertIsNotNone(ballots.get_ballot())
+
+    def test_live_sampling_when_pool_empty(self):
+        with patch.object(
+            ballots.poll_sampler, 'sample_choices', return_value=['live']
+        ) as mock_sample_choices:
+            self.assertEqual(ballots.get_ballot(), ['live'])
+            mock_sample_choices.assert_called_once_with(ballots.BALLOT_SIZE)
+
+    def test_hits_and_misses_counted(self):
+        ballots.get_ballot()
+        ballots.refill_pool()
+        ballots.get_ballot()
+        ballots.get_ballot()
+        stats = ballots.pool_stats()
+        self.assertEqual(stats['hits'], 2)
+        self.assertEqual(stats['misses'], 1)
+        self.assertEqual(stats['refills'], 1)
+
+    def test_no_ballots_if_not_enough_quotes(self):
+        for quote in self.quotes[3:]:
+            quote.delete()
+        self.assertEqual(ballots.refill_pool(), 0)
+        self.assertEqual(ballots.pool_stats()['size'], 0)
+
+    def test_pool_cleared_when_quote_deleted(self):
+        ballots.refill_pool()
+        self.quotes[0].delete()
+        self.assertEqual(ballots.pool_stats()['size'], 0)
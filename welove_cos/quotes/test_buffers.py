@@ -0,0 +1,93 @@
+from django.test import TestCase
+from mock import patch
+from .buffers import BATCH_FIELD, CounterBuffer
+from .models import CounterFlush
+from .store import get_store
+
+
+class CounterBufferTest(TestCase):
+
+    def setUp(self):
+        self.buffer = CounterBuffer('test')
+        self.store = get_store()
+        self.store.delete(
+            self.buffer.pending_key, self.buffer.flushing_key,
+            self.buffer.since_key, self.buffer.lock_key
+        )
+        self.flushed = []
+
+    def apply_counts(self, counts):
+        self.flushed.append(counts)
+
+    def counts(self, key):
+        return dict(
+            (int(field), int(value))
+            for field, value in self.store.hgetall(key).items()
+        )
+
+    def test_counts_added_up(self):
+        self.buffer.add(1)
+        self.buffer.add(1)
+        self.buffer.add(2, 5)
+        self.assertEqual(self.buffer.pending(), {1: 2, 2: 5})
+
+    def test_flush_hands_over_counts_once(self):
+        self.buffer.add(1)
+        self.buffer.add(2, 3)
+        self.assertEqual(self.buffer.flush(self.apply_counts), 2)
+        self.assertEqual(self.flushed, [{1: 1, 2: 3}])
+        self.assertEqual(self.buffer.pending(), {})
+        self.assertEqual(self.buffer.flush(self.apply_counts), 0)
+        self.assertEqual(len(self.flushed), 1)
+        self.assertEqual(CounterFlush.objects.get().rows, 2)
+
+    def test_age_of_oldest_increment(self):
+        self.assertEqual(self.buffer.age(), 0)
+        with patch('time.time', return_value=1000):
+            self.buffer.add(1)
+        with patch('time.time', return_value=1030):
+            self.buffer.add(1)
+            self.assertEqual(self.buffer.age(), 30)
+        self.buffer.flush(self.apply_counts)
+        self.assertEqual(self.buffer.age(), 0)
+
+    def test_unfinished_flush_retried(self):
+        self.buffer.add(1, 2)
+
+        def crash(counts):
+            raise RuntimeError("Worker lost")
+
+        with self.assertRaises(RuntimeError):
+            self.buffer.flush(crash)
+        self.buffer.add(1, 3)
+        self.assertEqual(self.buffer.pending(), {1: 5})
+        self.assertEqual(self.buffer.flush(self.apply_counts), 2)
+        self.assertEqual(self.flushed, [{1: 2}, {1: 3}])
+        self.assertEqual(self.buffer.pending(), {})
+
+    def test_batch_applied_before_crash_not_counted_twice(self):
+        self.buffer.add(1, 2)
+        self.store.rename(self.buffer.pending_key, self.buffer.flushing_key)
+        self.store.hsetnx(self.buffer.flushing_key, BATCH_FIELD, 'abc')
+        CounterFlush.objects.create(batch='abc', counter='test', rows=1)
+        self.assertEqual(self.buffer.flush(self.apply_counts), 0)
+        self.assertEqual(self.flushed, [])
+        self.assertEqual(self.buffer.pending(), {})
+
+    def test_batch_being_applied_not_replaced(self):
+        # Moved aside by a flush still applying it after its lock expired
+        self.buffer.add(1, 2)
+        self.store.rename(self.buffer.pending_key, self.buffer.flushing_key)
+        self.buffer.add(2, 3)
+        with patch.object(self.buffer, '_flush_batch', return_value=0):
+            self.buffer.flush(self.apply_counts)
+        self.assertEqual(self.counts(self.buffer.flushing_key), {1: 2})
+        self.assertEqual(self.counts(self.buffer.pending_key), {2: 3})
+        self.assertIsNotNone(self.store.get(self.buffer.since_key))
+
+    def test_no_concurrent_flushes(self):
+        self.buffer.add(1)
+        self.store.set(self.buffer.lock_key, 'other', nx=True)
+        self.assertEqual(self.buffer.flush(self.apply_counts), 0)
+        self.assertEqual(self.buffer.pending(), {1: 1})
+        self.store.delete(self.buffer.lock_key)
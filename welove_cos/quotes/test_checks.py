@@ -0,0 +1,20 @@
+from django.test import SimpleTestCase
+from .checks import vote_buffer_check
+
+
+class VoteBufferCheckTest(SimpleTestCase):
+
+    def test_buffer_without_redis(self):
+        with self.settings(QUOTES_VOTE_BUFFER=True, QUOTES_REDIS_URL=None):
+            errors = vote_buffer_check(None)
+        self.assertEqual([error.id for error in errors], ['quotes.E001'])
+
+    def test_buffer_with_redis(self):
+        with self.settings(
+            QUOTES_VOTE_BUFFER=True, QUOTES_REDIS_URL='redis://'
+        ):
+            self.assertEqual(vote_buffer_check(None), [])
+
+    def test_no_buffer(self):
+        with self.settings(QUOTES_VOTE_BUFFER=False, QUOTES_REDIS_URL=None):
+            self.assertEqual(vote_buffer_check(None), [])
@@ -3,6 +3,8 @@ from django.conf import settings
 from django.test import TestCase
 from mock import patch
 from . import common
+from .models import Quote
+from .tests import QuoteReadyTestCase
 
 
 class WarningEmailAdminTest(TestCase):
@@ -33,3 +35,28 @@ class WarningEmailAdminTest(TestCase):
             title, body, to=[settings.EMAIL_HOST_USER]
         )
         mock_email().send.assert_called()
+
+
+class BulkIncrementTest(QuoteReadyTestCase):
+
+    def test_values_added_in_one_query_per_batch(self):
+        quotes = [
+            self.create_quote(text="Quote {}".format(i)) for i in range(5)
+        ]
+        rows = [(quote.id, index) for index, quote in enumerate(quotes)]
+        with self.assertNumQueries(1):
+            updated = common.bulk_increment(Quote, ['popularity'], rows)
+        self.assertEqual(updated, 5)
+        with self.assertNumQueries(3):
+            common.bulk_increment(Quote, ['popularity'], rows, batch_size=2)
+        popularities = dict(Quote.objects.values_list('id', 'popularity'))
+        for quote_id, value in rows:
+            self.assertEqual(popularities[quote_id], value * 2)
+
+    def test_missing_ids_ignored(self):
+        quote = self.create_quote()
+        updated = common.bulk_increment(
+            Quote, ['popularity'], [(quote.id, 3), (quote.id + 100, 1)]
+        )
+        self.assertEqual(updated, 1)
+        self.assertEqual(Quote.objects.get().popularity, 3)
@@ -1,6 +1,11 @@
+import time
+from django.core.cache import cache
 from django.test import TestCase
 import mock
-from .context_processors import quotes_processor, message_processor
+from . import pagecache
+from .context_processors import (
+    quotes_processor, message_processor, message_cache
+)
 from .models import Message
 
 COMMON_ORIGIN = "City Of Sound"
@@ -22,6 +27,9 @@ class QuotesProcessorTest(TestCase):
 
 
 class MessageProcessorTest(TestCase):
+    def setUp(self):
+        message_cache.clear()
+
     def test_message_context_none_if_no_messages(self):
         no_message_context = {
             'message_context': {
@@ -56,3 +64,57 @@ class MessageProcessorTest(TestCase):
         request = mock.Mock()
         context = message_processor(request)
         self.assertEqual(context, displayed_message_context)
+
+    def test_message_lazy(self):
+        Message.objects.create(message_text="hey", displayed=True)
+        request = mock.Mock()
+        with self.assertNumQueries(0):
+            context = message_processor(request)
+        with self.assertNumQueries(1):
+            self.assertEqual(context['message_context']['message'], "hey")
+
+    def test_message_cached(self):
+        Message.objects.create(message_text="hey", displayed=True)
+        request = mock.Mock()
+        message_processor(request)['message_context']['message']
+        with self.assertNumQueries(0):
+            context = message_processor(request)
+            self.assertEqual(context['message_context']['message'], "hey")
+
+    def test_message_fetched_again_for_new_version(self):
+        message = Message.objects.create(message_text="hey", displayed=True)
+        request = mock.Mock()
+        message_processor(request)['message_context']['message']
+
+        # Saved by another process
+        Message.objects.filter(pk=message.pk).update(message_text="Hello")
+        context = message_processor(request)
+        self.assertEqual(context['message_context']['message'], "hey")
+        pagecache.invalidate(pagecache.MESSAGE)
+        context = message_processor(request)
+        self.assertEqual(context['message_context']['message'], "Hello")
+
+    def test_message_fetched_again_when_version_expires(self):
+        message = Message.objects.create(message_text="hey", displayed=True)
+        request = mock.Mock()
+        with self.settings(QUOTES_VERSION_TIMEOUT=60):
+            cache.delete(pagecache.VERSION_KEY.format(pagecache.MESSAGE))
+            message_processor(request)['message_context']['message']
+
+            # Saved by another process, whose invalidation is not shared
+            Message.objects.filter(pk=message.pk).update(message_text="Hello")
+            later = time.time() + 61
+            with mock.patch('time.time', return_value=later):
+                context = message_processor(request)
+                self.assertEqual(
+                    context['message_context']['message'], "Hello"
+                )
+
+    def test_message_fetched_again_after_save(self):
+        message = Message.objects.create(message_text="hey", displayed=True)
+        request = mock.Mock()
+        message_processor(request)['message_context']['message']
+        message.displayed = False
+        message.save()
+        context = message_processor(request)
+        self.assertIsNone(context['message_context']['message'])
@@ -0,0 +1,88 @@
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+from .exposure import (
+    impression_buffer, record_impressions, update_ratings,
+    wilson_lower_bound
+)
+from .models import Quote
+from .tests import QuoteReadyTestCase
+from . import tasks
+
+
+class ImpressionsTest(QuoteReadyTestCase):
+
+    def setUp(self):
+        impression_buffer.flush(lambda counts: None)
+        self.quotes = [
+            self.create_quote(text="Quote {}".format(i)) for i in range(3)
+        ]
+
+    def impressions(self):
+        return dict(Quote.objects.values_list('id', 'impressions'))
+
+    def test_impressions_buffered_without_queries(self):
+        with self.assertNumQueries(0):
+            record_impressions([quote.id for quote in self.quotes])
+            record_impressions([self.quotes[0].id])
+        self.assertEqual(impression_buffer.pending(), {
+            self.quotes[0].id: 2,
+            self.quotes[1].id: 1,
+            self.quotes[2].id: 1
+        })
+        self.assertEqual(self.impressions()[self.quotes[0].id], 0)
+
+    def test_flushed_when_stale(self):
+        record_impressions([self.quotes[0].id])
+        self.assertEqual(self.impressions()[self.quotes[0].id], 0)
+        with self.settings(QUOTES_IMPRESSION_BUFFER_MAX_STALENESS=-1):
+            record_impressions([self.quotes[1].id])
+        self.assertEqual(impression_buffer.pending(), {})
+        self.assertEqual(self.impressions()[self.quotes[0].id], 1)
+        self.assertEqual(self.impressions()[self.quotes[1].id], 1)
+
+    def test_flush_in_bulk(self):
+        record_impressions([quote.id for quote in self.quotes])
+        record_impressions([self.quotes[0].id])
+        with CaptureQueriesContext(connection) as queries:
+            self.assertEqual(tasks.flush_impression_buffer(), 3)
+        impression_updates = [
+            query['sql'] for query in queries.captured_queries
+            if query['sql'].startswith('UPDATE') and
+            'impressions' in query['sql']
+        ]
+        self.assertEqual(len(impression_updates), 1)
+        self.assertEqual(self.impressions(), {
+            self.quotes[0].id: 2,
+            self.quotes[1].id: 1,
+            self.quotes[2].id: 1
+        })
+        self.assertEqual(impression_buffer.pending(), {})
+
+
+class RatingTest(QuoteReadyTestCase):
+
+    def test_wilson_lower_bound(self):
+        self.assertEqual(wilson_lower_bound(0, 0), 0)
+        self.assertEqual(wilson_lower_bound(0, 10), 0)
+        self.assertAlmostEqual(wilson_lower_bound(5, 10), 0.2366, places=4)
+        self.assertLess(wilson_lower_bound(1, 2), wilson_lower_bound(50, 100))
+        self.assertLessEqual(wilson_lower_bound(20, 10), 1)
+
+    def test_ratings_stored(self):
+        quotes = [
+            self.create_quote(text="Quote {}".format(i)) for i in range(2)
+        ]
+        Quote.objects.filter(id=quotes[0].id).update(
+            popularity=1, impressions=2
+        )
+        Quote.objects.filter(id=quotes[1].id).update(
+            popularity=50, impressions=100
+        )
+        update_ratings([quote.id for quote in quotes])
+        self.assertEqual(
+            list(Quote.objects.order_by('-rating')), [quotes[1], quotes[0]]
+        )
+        self.assertAlmostEqual(
+            Quote.objects.get(id=quotes[0].id).rating,
+            wilson_lower_bound(1, 2)
+        )
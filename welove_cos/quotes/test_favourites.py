@@ -0,0 +1,50 @@
+from django.contrib.auth.models import User
+from .favourites import set_favourite
+from .models import Profile, Quote
+from .tests import QuoteReadyTestCase
+
+
+class FavouritesTest(QuoteReadyTestCase):
+
+    def setUp(self):
+        self.user = User.objects.create_user('username', 'email@email.com')
+        self.quotes = [
+            self.create_quote(text="Quote {}".format(i)) for i in range(2)
+        ]
+
+    def favourites(self):
+        return dict(Quote.objects.values_list('id', 'favourites'))
+
+    def test_favourite_moved(self):
+        Profile.objects.create(user=self.user)
+        self.assertTrue(set_favourite(self.user, self.quotes[0].id))
+        self.assertTrue(set_favourite(self.user, self.quotes[0].id))
+        self.assertEqual(self.favourites()[self.quotes[0].id], 1)
+        self.assertTrue(set_favourite(self.user, self.quotes[1].id))
+        self.assertEqual(self.favourites(), {
+            self.quotes[0].id: 0, self.quotes[1].id: 1
+        })
+        self.assertEqual(
+            Profile.objects.get(user=self.user).favourite_quote,
+            self.quotes[1]
+        )
+
+    def test_missing_profile_or_quote(self):
+        self.assertFalse(set_favourite(self.user, self.quotes[0].id))
+        Profile.objects.create(user=self.user)
+        self.assertFalse(set_favourite(self.user, 1234))
+        self.assertEqual(self.favourites()[self.quotes[0].id], 0)
+
+    def test_counted_when_profiles_saved_or_deleted(self):
+        profile = Profile.objects.create(
+            user=self.user, favourite_quote=self.quotes[0]
+        )
+        self.assertEqual(self.favourites()[self.quotes[0].id], 1)
+        profile.favourite_quote = self.quotes[1]
+        profile.save()
+        profile.save()
+        self.assertEqual(self.favourites(), {
+            self.quotes[0].id: 0, self.quotes[1].id: 1
+        })
+        profile.delete()
+        self.assertEqual(self.favourites()[self.quotes[1].id], 0)
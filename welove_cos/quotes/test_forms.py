@@ -1,6 +1,7 @@
 from django import forms
 from django.contrib.auth.models import User
 from django.test import TestCase
+from .ballots import sign_ballot
 from .forms import UserForm, ProfileForm, PollForm, FavouriteQuoteForm
 from .models import Profile
 
@@ -138,11 +139,54 @@ class PollFormTest(TestCase):
         actual_label = PollForm.declared_fields['quote_choice'].label
         self.assertEqual(expected_label, actual_label)
 
+    def test_ballot_signed_into_form(self):
+        choices = [(11, 'One'), (12, 'Two'), (13, 'Three'), (14, 'Four')]
+        form = PollForm(choices=choices)
+        self.assertEqual(form.fields['quote_choice'].choices, choices)
+        self.assertEqual(form.initial['ballot'], sign_ballot([11, 12, 13, 14]))
+        self.assertIn('type="hidden" name="ballot"', form.as_p())
+        self.assertNotEqual(
+            PollForm.base_fields['quote_choice'].choices, choices
+        )
+
+    def test_vote_validated_against_own_ballot(self):
+        form = PollForm(
+            {'quote_choice': '12', 'ballot': sign_ballot([11, 12])}
+        )
+        other_form = PollForm(
+            {'quote_choice': '12', 'ballot': sign_ballot([13, 14])}
+        )
+        self.assertTrue(form.is_valid())
+        self.assertEqual(form.cleaned_data['quote_choice'], '12')
+        self.assertFalse(other_form.is_valid())
+
+    def test_tampered_ballot_rejected(self):
+        ballot = sign_ballot([11, 12])
+        form = PollForm({'quote_choice': '13', 'ballot': ballot + '3'})
+        self.assertFalse(form.is_valid())
+        form = PollForm({'quote_choice': '13', 'ballot': '[13]'})
+        self.assertFalse(form.is_valid())
+
+    def test_expired_ballot_rejected(self):
+        ballot = sign_ballot([11, 12])
+        with self.settings(QUOTES_BALLOT_MAX_AGE=-1):
+            form = PollForm({'quote_choice': '11', 'ballot': ballot})
+            self.assertFalse(form.is_valid())
+
+    def test_placeholder_choices_cannot_be_voted(self):
+        placeholder_form = PollForm()
+        form = PollForm({
+            'quote_choice': '1',
+            'ballot': placeholder_form.initial['ballot']
+        })
+        self.assertFalse(form.is_valid())
+
 
 class FavouriteQuoteFormTest(TestCase):
     def test_fields(self):
         expected_fields = {
             'set_favourite': forms.BooleanField,
+            'quote_id': forms.IntegerField,
         }
         actual_fields = FavouriteQuoteForm.base_fields
         for each_key in expected_fields:
@@ -0,0 +1,42 @@
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+from .leaderboard import leaderboard_page, make_cursor, parse_cursor
+from .models import Quote
+from .tests import QuoteReadyTestCase
+
+
+class LeaderboardTest(QuoteReadyTestCase):
+
+    def test_cursor_round_trip(self):
+        self.assertEqual(
+            parse_cursor('popularity', make_cursor(12, 3)), (12, 3)
+        )
+        self.assertEqual(
+            parse_cursor('trending', make_cursor(0.1 + 0.2, 7)),
+            (0.1 + 0.2, 7)
+        )
+        self.assertIsNone(parse_cursor('popularity', '1.5_3'))
+        self.assertIsNone(parse_cursor('rating', 'abc'))
+        self.assertIsNone(parse_cursor('rating', None))
+
+    def test_pages_by_trending(self):
+        quotes = [
+            self.create_quote(text="Quote number {}".format(i))
+            for i in range(5)
+        ]
+        for trending, quote in zip([0.5, 1.5, 0.5, 2.5, 0.25], quotes):
+            Quote.objects.filter(id=quote.id).update(trending=trending)
+
+        with self.assertNumQueries(1):
+            page, cursor = leaderboard_page('trending', size=2)
+        self.assertEqual(page, [quotes[3], quotes[1]])
+        page, cursor = leaderboard_page('trending', cursor, size=2)
+        self.assertEqual(page, [quotes[0], quotes[2]])
+        page, cursor = leaderboard_page('trending', cursor, size=2)
+        self.assertEqual(page, [quotes[4]])
+        self.assertIsNone(cursor)
+
+    def test_scan_bounded_by_cursor(self):
+        with CaptureQueriesContext(connection) as queries:
+            leaderboard_page('popularity', make_cursor(5, 3))
+        self.assertIn('"popularity" <= 5', queries[0]['sql'])
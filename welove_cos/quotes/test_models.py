@@ -1,8 +1,15 @@
+from datetime import timedelta
+from unittest import skipUnless
 from django.contrib.auth.models import User
-from django.db import models
+from django.db import IntegrityError, connection, models, transaction
 from django.test import TestCase
+from django.test.utils import CaptureQueriesContext
+from django.utils import timezone
 from mock import patch
-from .models import Quote, Source, Profile, Message
+from .models import (
+    DailyArchive, DailySelection, Quote, Source, Profile, Message,
+    PopularityShard, QuoteGeneration
+)
 from .tests import QuoteReadyTestCase
 
 
@@ -12,15 +19,19 @@ class QuoteTest(QuoteReadyTestCase):
             'quote_text': models.CharField,
             'source': models.ForeignKey,
             'selected': models.BooleanField,
-            'popularity': models.IntegerField
+            'popularity': models.BigIntegerField,
+            'trending': models.FloatField,
+            'impressions': models.BigIntegerField,
+            'rating': models.FloatField,
+            'favourites': models.IntegerField
         }
         for name in fields:
             self.assertTrue(hasattr(Quote, name))
             field = Quote._meta.get_field(name)
             self.assertTrue(isinstance(field, fields[name]))
 
-        field_count_plus_id_and_rel_profile = len(Quote._meta.get_fields())
-        self.assertEqual(field_count_plus_id_and_rel_profile, len(fields)+2)
+        field_count_plus_id_and_rels = len(Quote._meta.get_fields())
+        self.assertEqual(field_count_plus_id_and_rels, len(fields)+5)
 
         selected_default = Quote._meta.get_field('selected')._get_default()
         self.assertEqual(selected_default, False)
@@ -39,6 +50,10 @@ class QuoteTest(QuoteReadyTestCase):
         quote_text_unique = Quote._meta.get_field('quote_text').unique
         self.assertEqual(quote_text_unique, True)
 
+        indexed = [index.fields for index in Quote._meta.indexes]
+        for order in ('popularity', 'trending', 'rating', 'favourites'):
+            self.assertIn(['-' + order, 'id'], indexed)
+
         popularity_default = Quote._meta.get_field('popularity')._get_default()
         self.assertEqual(selected_default, 0)
 
@@ -77,6 +92,148 @@ class QuoteTest(QuoteReadyTestCase):
         self.assertEqual(selected_quotes[0], quote_two)
 
 
+class DailySelectionTest(QuoteReadyTestCase):
+    def test_pointer_follows_selected_quote(self):
+        self.assertIsNone(DailySelection.current_quote())
+        quote_one = self.create_quote(text="This band rocks", selected=True)
+        quote_two = self.create_quote(text="A pop band pops")
+        self.assertEqual(DailySelection.current_quote(), quote_one)
+
+        quote_two.selected = True
+        with CaptureQueriesContext(connection) as queries:
+            quote_two.save()
+        updates = [
+            query['sql'] for query in queries.captured_queries
+            if query['sql'].startswith('UPDATE')
+        ]
+        # The quote, the pointer, the previous quote, today's archive and
+        # the generation of quotes, each by id
+        self.assertEqual(len(updates), 5)
+        for update in updates:
+            self.assertRegex(update, r'WHERE "quotes_\w+"\."id" = \d+$')
+        self.assertEqual(DailySelection.objects.count(), 1)
+        self.assertEqual(DailySelection.current_quote(), quote_two)
+        self.assertFalse(Quote.objects.get(id=quote_one.id).selected)
+
+        quote_two.selected = False
+        quote_two.save()
+        self.assertIsNone(DailySelection.current_quote())
+
+    @skipUnless(
+        connection.vendor == 'postgresql', "CHECK added on PostgreSQL only"
+    )
+    def test_single_row_checked(self):
+        quote = self.create_quote()
+        with self.assertRaises(IntegrityError), transaction.atomic():
+            DailySelection.objects.create(id=2, quote=quote)
+
+    def test_current_quote_is_one_query(self):
+        self.create_quote(selected=True)
+        with self.assertNumQueries(1):
+            quote = DailySelection.current_quote()
+            quote.source.name
+
+    def test_pointer_deleted_with_quote(self):
+        quote = self.create_quote(selected=True)
+        quote.delete()
+        self.assertFalse(DailySelection.objects.exists())
+
+    def test_str_method(self):
+        quote = self.create_quote(selected=True)
+        self.assertEqual(
+            DailySelection.objects.get().__str__(),
+            "Daily selection of quote {}".format(quote.id)
+        )
+
+
+class DailyArchiveTest(QuoteReadyTestCase):
+    def test_selection_archived_for_today(self):
+        source = self.create_source(name="Common knowledge", link="a.com")
+        quote = self.create_quote(source=source, selected=True)
+        archived = DailyArchive.objects.get(day=timezone.localdate())
+        self.assertEqual(archived.quote, quote)
+        self.assertEqual(archived.quote_text, quote.quote_text)
+        self.assertEqual(archived.source.name, "Common knowledge")
+        self.assertEqual(archived.source.link, "a.com")
+
+        other_quote = self.create_quote(text="Other quote", selected=True)
+        self.assertEqual(DailyArchive.objects.count(), 1)
+        self.assertEqual(DailyArchive.objects.get().quote, other_quote)
+
+    def test_same_quote_archived_on_new_day(self):
+        quote = self.create_quote(selected=True)
+        yesterday = timezone.localdate() - timedelta(days=1)
+        DailyArchive.objects.update(day=yesterday)
+        DailySelection.select(quote)
+        self.assertEqual(
+            list(DailyArchive.objects.order_by('day').values_list(
+                'day', 'quote'
+            )),
+            [(yesterday, quote.id), (timezone.localdate(), quote.id)]
+        )
+
+    def test_kept_when_quote_deleted(self):
+        quote = self.create_quote(selected=True)
+        quote.delete()
+        archived = DailyArchive.objects.get()
+        self.assertIsNone(archived.quote)
+        self.assertEqual(archived.quote_text, quote.quote_text)
+
+    def test_str_method(self):
+        self.create_quote(selected=True)
+        self.assertEqual(
+            DailyArchive.objects.get().__str__(),
+            "Daily quote of {}".format(timezone.localdate())
+        )
+
+
+class PopularityShardTest(QuoteReadyTestCase):
+    def test_popularity_shard_fields(self):
+        fields = {
+            'quote': models.ForeignKey,
+            'shard': models.PositiveSmallIntegerField,
+            'count': models.BigIntegerField,
+        }
+        for name in fields:
+            field = PopularityShard._meta.get_field(name)
+            self.assertTrue(isinstance(field, fields[name]))
+
+        self.assertEqual(
+            PopularityShard._meta.unique_together, (('quote', 'shard'),)
+        )
+        quote_on_delete = PopularityShard._meta.get_field(
+            'quote'
+        ).remote_field.on_delete
+        self.assertEqual(quote_on_delete, models.CASCADE)
+
+    def test_str_method(self):
+        quote = self.create_quote()
+        shard = PopularityShard.objects.create(quote=quote, shard=3)
+        self.assertEqual(
+            shard.__str__(), "Shard 3 of quote {}".format(quote.id)
+        )
+
+
+class QuoteGenerationTest(QuoteReadyTestCase):
+    def test_bumped_by_quote_and_source_changes(self):
+        self.assertEqual(QuoteGeneration.current(), 0)
+        quote = self.create_quote()
+        generation = QuoteGeneration.current()
+        self.assertGreater(generation, 0)
+        quote.quote_text = "Edited quote"
+        quote.save()
+        self.assertEqual(QuoteGeneration.current(), generation + 1)
+        quote.source.delete()
+        self.assertGreater(QuoteGeneration.current(), generation + 1)
+        self.assertEqual(QuoteGeneration.objects.count(), 1)
+
+    def test_str_method(self):
+        QuoteGeneration.bump()
+        self.assertEqual(
+            QuoteGeneration.objects.get().__str__(), "Quotes generation 1"
+        )
+
+
 class SourceTest(QuoteReadyTestCase):
     def test_source_fields(self):
         fields = {
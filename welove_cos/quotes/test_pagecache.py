@@ -0,0 +1,176 @@
+import threading
+import time
+
+from django.core.cache import cache
+from django.test import TestCase
+from mock import MagicMock, patch
+from . import pagecache
+
+
+class GetPageTest(TestCase):
+
+    def setUp(self):
+        cache.clear()
+
+    def get_page(self, content="Page", depends=('first', 'second')):
+        build = MagicMock(return_value=content)
+        page = pagecache.get_page('page', depends, build)
+        return page and page['content'], build
+
+    def test_cached_until_invalidated(self):
+        content, build = self.get_page()
+        self.assertEqual(content, "Page")
+        build.assert_called_once_with()
+
+        content, build = self.get_page("New page")
+        self.assertEqual(content, "Page")
+        build.assert_not_called()
+
+        pagecache.invalidate('unrelated')
+        content, build = self.get_page("New page")
+        build.assert_not_called()
+
+        pagecache.invalidate('second')
+        content, build = self.get_page("New page")
+        self.assertEqual(content, "New page")
+        build.assert_called_once_with()
+
+    def test_rebuilt_when_old(self):
+        self.get_page()
+        with self.settings(QUOTES_PAGE_CACHE_TIMEOUT=0):
+            content, build = self.get_page("New page")
+        self.assertEqual(content, "New page")
+
+    def test_lost_version_not_reused(self):
+        self.get_page()
+        cache.delete(pagecache.VERSION_KEY.format('first'))
+        with patch.object(pagecache, 'new_version', return_value=0):
+            content, build = self.get_page("New page")
+        self.assertEqual(content, "New page")
+
+    def test_none_not_cached(self):
+        content, build = self.get_page(None)
+        self.assertIsNone(content)
+        content, build = self.get_page()
+        build.assert_called_once_with()
+
+    def test_stale_page_while_rebuilt_elsewhere(self):
+        self.get_page()
+        pagecache.invalidate('first')
+        token = pagecache.acquire_lock('page')
+        content, build = self.get_page("New page")
+        self.assertEqual(content, "Page")
+        build.assert_not_called()
+
+        pagecache.release_lock('page', token)
+        content, build = self.get_page("New page")
+        self.assertEqual(content, "New page")
+
+    def test_built_when_rebuild_elsewhere_too_slow(self):
+        pagecache.acquire_lock('page')
+        with self.settings(QUOTES_PAGE_REBUILD_TIMEOUT=0.1):
+            content, build = self.get_page()
+        self.assertEqual(content, "Page")
+        build.assert_called_once_with()
+
+    def test_digest_of_content(self):
+        page = pagecache.get_page('page', ['first'], lambda: "Page")
+        other_page = pagecache.get_page('other', ['first'], lambda: "Page")
+        self.assertEqual(page['digest'], other_page['digest'])
+        self.assertNotEqual(page['built'], None)
+
+    def test_new_template_version(self):
+        self.get_page()
+        with self.settings(QUOTES_TEMPLATE_VERSION=2):
+            content, build = self.get_page("New page")
+        self.assertEqual(content, "New page")
+
+    def test_invalidated_on_commit(self):
+        self.get_page()
+        with patch.object(
+            pagecache.transaction, 'on_commit'
+        ) as mock_on_commit:
+            pagecache.invalidate_on_commit('first')
+            content, build = self.get_page("New page")
+            self.assertEqual(content, "Page")
+            mock_on_commit.call_args[0][0]()
+        content, build = self.get_page("New page")
+        self.assertEqual(content, "New page")
+
+
+class RefreshPageTest(TestCase):
+
+    def setUp(self):
+        cache.clear()
+
+    def test_rebuilt_ahead_of_requests(self):
+        pagecache.get_page('page', ['first'], lambda: "Page")
+        pagecache.refresh_page(
+            'page', ['first'], lambda: "New page", changed=['first']
+        )
+        build = MagicMock()
+        page = pagecache.get_page('page', ['first'], build)
+        self.assertEqual(page['content'], "New page")
+        build.assert_not_called()
+
+    def test_waits_for_rebuild_elsewhere(self):
+        token = pagecache.acquire_lock('page')
+        timer = threading.Timer(
+            0.1, pagecache.release_lock, args=['page', token]
+        )
+        timer.start()
+        pagecache.refresh_page('page', ['first'], lambda: "Page")
+        timer.join()
+        self.assertEqual(
+            pagecache.get_page('page', ['first'], MagicMock())['content'],
+            "Page"
+        )
+
+
+class ConcurrentRebuildTest(TestCase):
+    # Many requests at once for a page that is stale or missing, like the
+    # daily page at midnight
+
+    requests = 30
+
+    def setUp(self):
+        cache.clear()
+        self.builds = 0
+        self.builds_lock = threading.Lock()
+
+    def build(self):
+        with self.builds_lock:
+            self.builds += 1
+        time.sleep(0.2)
+        return "New page"
+
+    def request_all(self):
+        start = threading.Event()
+        contents = []
+
+        def request():
+            start.wait()
+            page = pagecache.get_page('page', ['first'], self.build)
+            contents.append(page['content'])
+
+        threads = [threading.Thread(target=request)
+                   for i in range(self.requests)]
+        for thread in threads:
+            thread.start()
+        start.set()
+        for thread in threads:
+            thread.join()
+        return contents
+
+    def test_one_rebuild_of_stale_page(self):
+        pagecache.get_page('page', ['first'], lambda: "Page")
+        pagecache.invalidate('first')
+        contents = self.request_all()
+        self.assertEqual(self.builds, 1)
+        self.assertEqual(len(contents), self.requests)
+        self.assertEqual(set(contents) - {"Page", "New page"}, set())
+
+    def test_one_build_of_missing_page(self):
+        contents = self.request_all()
+        self.assertEqual(self.builds, 1)
+        self.assertEqual(contents, ["New page"] * self.requests)
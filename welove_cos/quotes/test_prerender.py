@@ -0,0 +1,140 @@
+import gzip
+
+from django.conf import settings
+from django.core.cache import cache
+from django.urls import reverse
+from mock import patch
+from . import pagecache, prerender, views
+from .tests import QuoteReadyTestCase
+
+
+class PrerenderTestCase(QuoteReadyTestCase):
+
+    def setUp(self):
+        cache.clear()
+        self.addCleanup(cache.clear)
+        prerender_daily = self.settings(QUOTES_PRERENDER_DAILY=True)
+        prerender_daily.enable()
+        self.addCleanup(prerender_daily.disable)
+
+    def stored(self):
+        return cache.get(prerender.DAILY_KEY)
+
+
+class PrerenderDailyPageTest(PrerenderTestCase):
+
+    def test_page_stored(self):
+        self.create_quote(text="Quote of the day", selected=True)
+        prerendered = prerender.prerender_daily_page()
+        self.assertEqual(prerendered, self.stored())
+        content = prerendered['content']
+        self.assertIn(b"Quote of the day", content)
+        self.assertIn(b"Log in and subscribe to daily quote emails.", content)
+        self.assertNotIn(views.USER_LINK_MARKER.encode(), content)
+        self.assertEqual(
+            gzip.decompress(prerendered['compressed']['gzip']), content
+        )
+
+    def test_same_validator_as_view(self):
+        self.create_quote(selected=True)
+        prerendered = prerender.prerender_daily_page()
+        with self.settings(QUOTES_PRERENDER_DAILY=False):
+            response = self.client.get(reverse('daily'))
+        self.assertEqual(prerendered['etag'], response['ETag'])
+
+    def test_no_daily_quote(self):
+        self.create_quote(selected=True)
+        prerender.prerender_daily_page()
+        with patch.object(
+            views.DailySelection, 'current_quote', return_value=None
+        ):
+            pagecache.invalidate(pagecache.DAILY_QUOTE)
+            self.assertIsNone(prerender.prerender_daily_page())
+        self.assertIsNone(self.stored())
+
+    def test_brotli_optional(self):
+        with patch.dict('sys.modules', {'brotli': None}):
+            self.assertEqual(set(prerender.compress(b"Page")), {'gzip'})
+
+
+class PrerenderedDailyMiddlewareTest(PrerenderTestCase):
+
+    def setUp(self):
+        super().setUp()
+        self.create_quote(text="Quote of the day", selected=True)
+        prerender.prerender_daily_page()
+
+    def get_gzip(self, **extra):
+        # The view does not compress, so only the prerendered page comes
+        # with a Content-Encoding
+        return self.client.get(
+            reverse('daily'), HTTP_ACCEPT_ENCODING='gzip, deflate', **extra
+        )
+
+    def test_served_without_view(self):
+        with self.assertNumQueries(0):
+            response = self.get_gzip()
+        self.assertEqual(response['Content-Encoding'], 'gzip')
+        self.assertEqual(
+            gzip.decompress(response.content), self.stored()['content']
+        )
+        self.assertEqual(
+            int(response['Content-Length']), len(response.content)
+        )
+        self.assertIn('Accept-Encoding', response['Vary'])
+
+    def test_plain_without_accept_encoding(self):
+        response = self.client.get(reverse('daily'))
+        self.assertFalse(response.has_header('Content-Encoding'))
+        self.assertEqual(response.content, self.stored()['content'])
+
+    def test_not_modified(self):
+        response = self.client.get(
+            reverse('daily'), HTTP_IF_NONE_MATCH=self.stored()['etag']
+        )
+        self.assertEqual(response.status_code, 304)
+
+    def test_frame_options_set(self):
+        response = self.get_gzip()
+        self.assertEqual(response['Content-Encoding'], 'gzip')
+        self.assertEqual(response['X-Frame-Options'], 'DENY')
+
+    def test_view_when_missing(self):
+        cache.delete(prerender.DAILY_KEY)
+        response = self.get_gzip()
+        self.assertFalse(response.has_header('Content-Encoding'))
+        self.assertContains(response, "Quote of the day")
+
+    def test_view_when_changed(self):
+        pagecache.invalidate(pagecache.MESSAGE)
+        response = self.get_gzip()
+        self.assertFalse(response.has_header('Content-Encoding'))
+        self.assertContains(response, "Quote of the day")
+
+    def test_view_on_another_day(self):
+        prerendered = self.stored()
+        prerendered['day'] = '2018-01-01'
+        cache.set(prerender.DAILY_KEY, prerendered)
+        response = self.get_gzip()
+        self.assertFalse(response.has_header('Content-Encoding'))
+
+    def test_never_stored_by_requests(self):
+        cache.delete(prerender.DAILY_KEY)
+        self.get_gzip()
+        self.assertIsNone(self.stored())
+
+    def test_view_for_sessions(self):
+        self.client.cookies[settings.SESSION_COOKIE_NAME] = 'session'
+        response = self.get_gzip()
+        self.assertFalse(response.has_header('Content-Encoding'))
+
+    def test_view_when_turned_off(self):
+        with self.settings(QUOTES_PRERENDER_DAILY=False):
+            response = self.get_gzip()
+        self.assertFalse(response.has_header('Content-Encoding'))
+
+    def test_view_for_other_pages(self):
+        response = self.client.get(
+            reverse('index'), HTTP_ACCEPT_ENCODING='gzip'
+        )
+        self.assertFalse(response.has_header('Content-Encoding'))
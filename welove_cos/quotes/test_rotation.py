@@ -0,0 +1,89 @@
+from datetime import timedelta
+from django.utils import timezone
+from .models import Quote, RotationSlot
+from .rotation import build_rotation, quote_for_day, schedule_quote
+from .tests import QuoteReadyTestCase
+
+
+class RotationTest(QuoteReadyTestCase):
+
+    def setUp(self):
+        self.today = timezone.localdate()
+        self.quotes = [
+            self.create_quote(text="Quote number {}".format(i))
+            for i in range(10)
+        ]
+
+    def schedule(self):
+        return list(
+            RotationSlot.objects.order_by('day').values_list(
+                'day', 'quote_id'
+            )
+        )
+
+    def test_one_day_per_quote(self):
+        self.assertEqual(build_rotation(self.today, batch_size=3), 10)
+        schedule = self.schedule()
+        self.assertEqual(
+            [day for day, quote_id in schedule],
+            [self.today + timedelta(days=i) for i in range(10)]
+        )
+        self.assertEqual(
+            sorted(quote_id for day, quote_id in schedule),
+            sorted(quote.id for quote in self.quotes)
+        )
+
+    def test_bulk_inserted(self):
+        with self.assertNumQueries(6):
+            # The ids, a savepoint, the delete, two batches and the release
+            build_rotation(self.today, batch_size=5)
+
+    def test_past_days_kept(self):
+        build_rotation(self.today)
+        tomorrow = self.today + timedelta(days=1)
+        todays_quote = quote_for_day(self.today)
+        build_rotation(tomorrow)
+        self.assertEqual(quote_for_day(self.today), todays_quote)
+        self.assertEqual(RotationSlot.objects.count(), 11)
+
+    def test_no_repeats_until_schedule_runs_out(self):
+        picked = [
+            quote_for_day(self.today + timedelta(days=i)) for i in range(10)
+        ]
+        self.assertEqual(len(set(picked)), 10)
+        with self.assertNumQueries(1):
+            quote_for_day(self.today + timedelta(days=3))
+        eleventh_day = self.today + timedelta(days=10)
+        self.assertIn(quote_for_day(eleventh_day), self.quotes)
+        self.assertEqual(
+            RotationSlot.objects.filter(day__gte=eleventh_day).count(), 10
+        )
+
+    def test_new_quotes_join_the_remaining_schedule(self):
+        build_rotation(self.today)
+        todays_quote_id = quote_for_day(self.today).id
+        for i in range(5):
+            # Scheduled by the post_save signal
+            Quote.objects.create(quote_text="New quote {}".format(i))
+        schedule = self.schedule()
+        self.assertEqual(
+            [day for day, quote_id in schedule],
+            [self.today + timedelta(days=i) for i in range(15)]
+        )
+        self.assertEqual(len(set(quote_id for day, quote_id in schedule)), 15)
+        self.assertEqual(schedule[0], (self.today, todays_quote_id))
+
+    def test_no_schedule_to_join(self):
+        self.assertFalse(schedule_quote(self.quotes[0].id, self.today))
+
+    def test_day_of_deleted_quote_filled(self):
+        build_rotation(self.today)
+        todays_quote = quote_for_day(self.today)
+        todays_quote.delete()
+        last_slot = RotationSlot.objects.order_by('-day').first()
+        self.assertEqual(quote_for_day(self.today), last_slot.quote)
+        self.assertEqual(RotationSlot.objects.count(), 9)
+
+    def test_no_quotes(self):
+        Quote.objects.all().delete()
+        self.assertIsNone(quote_for_day(self.today))
@@ -0,0 +1,295 @@
+from django.core.cache import cache
+from mock import patch
+from . import pagecache
+from .models import Quote
+from .sampling import (
+    ExposureSampler, QuoteDeck, QuoteSampler, alias_table, deck,
+    poll_sampler, sampler
+)
+from .tests import QuoteReadyTestCase
+
+
+class QuoteSamplerTest(QuoteReadyTestCase):
+
+    def setUp(self):
+        self.sampler = QuoteSampler(max_age=600)
+
+    def create_quotes(self, number):
+        return [
+            self.create_quote(text="Quote number {}".format(i))
+            for i in range(number)
+        ]
+
+    def test_none_if_no_quotes(self):
+        self.assertIsNone(self.sampler.random_quote())
+        self.assertIsNone(self.sampler.random_id())
+
+    def test_index_built_on_first_pick(self):
+        quotes = self.create_quotes(3)
+        with self.assertNumQueries(1):
+            self.assertEqual(len(self.sampler), 3)
+        self.assertIn(self.sampler.random_quote(), quotes)
+
+    def test_random_quote_is_one_primary_key_fetch(self):
+        quotes = self.create_quotes(5)
+        self.sampler.rebuild()
+        with self.assertNumQueries(1):
+            quote = self.sampler.random_quote()
+            quote.source.name
+        self.assertIn(quote, quotes)
+
+    def test_all_quotes_can_be_picked(self):
+        quotes = self.create_quotes(3)
+        picked = set(self.sampler.random_quote() for i in range(200))
+        self.assertEqual(picked, set(quotes))
+
+    def test_id_gaps_do_not_matter(self):
+        quotes = self.create_quotes(6)
+        for quote in quotes[1:5]:
+            quote.delete()
+        picked = set(self.sampler.random_id() for i in range(100))
+        self.assertEqual(picked, {quotes[0].id, quotes[5].id})
+
+    def test_add_and_discard(self):
+        quotes = self.create_quotes(3)
+        self.sampler.rebuild()
+        self.sampler.discard(quotes[0].id)
+        self.assertEqual(len(self.sampler), 2)
+        self.sampler.discard(quotes[0].id)
+        self.assertEqual(len(self.sampler), 2)
+        self.sampler.add(quotes[0].id)
+        self.sampler.add(quotes[0].id)
+        self.assertEqual(len(self.sampler), 3)
+
+    def test_sample_ids(self):
+        self.assertEqual(self.sampler.sample_ids(2), [])
+        quotes = self.create_quotes(3)
+        self.sampler.rebuild()
+        with self.assertNumQueries(0):
+            ids = self.sampler.sample_ids(2)
+        self.assertEqual(len(set(ids)), 2)
+        self.assertTrue(set(ids) <= set(quote.id for quote in quotes))
+        self.assertEqual(
+            sorted(self.sampler.sample_ids(5)),
+            [quote.id for quote in quotes]
+        )
+
+    def test_picks_under_lock(self):
+        # discard in another thread must wait until the position is read
+        self.create_quotes(3)
+        self.sampler.rebuild()
+        held = []
+
+        def randrange(stop):
+            held.append(self.sampler._lock.locked())
+            return stop - 1
+
+        def sample(population, size):
+            held.append(self.sampler._lock.locked())
+            return list(population)[:size]
+
+        with patch('quotes.sampling.random.randrange', randrange), \
+                patch('quotes.sampling.random.sample', sample):
+            self.sampler.random_id()
+            self.sampler.sample_ids(2)
+            self.sampler.sample_choices(2)
+        self.assertEqual(held, [True, True, True])
+
+    def test_discard_keeps_positions(self):
+        quotes = self.create_quotes(5)
+        self.sampler.rebuild()
+        for quote in quotes[:3]:
+            self.sampler.discard(quote.id)
+        self.sampler.add(quotes[0].id)
+        self.sampler.discard(quotes[4].id)
+        self.assertEqual(
+            sorted(self.sampler.sample_ids(5)), [quotes[0].id, quotes[3].id]
+        )
+        self.sampler.rebuild()
+        self.sampler.discard(quotes[4].id)
+        self.assertEqual(len(self.sampler), 4)
+
+    def test_rebuilt_if_quote_deleted_elsewhere(self):
+        quotes = self.create_quotes(2)
+        self.sampler.rebuild()
+        Quote.objects.filter(pk=quotes[0].pk)._raw_delete('default')
+        with patch.object(
+            self.sampler, 'random_id', side_effect=[quotes[0].id, quotes[1].id]
+        ):
+            self.assertEqual(self.sampler.random_quote(), quotes[1])
+        self.assertEqual(len(self.sampler), 1)
+
+    def test_rebuilt_when_too_old(self):
+        self.create_quotes(2)
+        self.sampler.rebuild()
+        Quote.objects.bulk_create([Quote(quote_text="Bulk created quote")])
+        self.assertEqual(len(self.sampler), 2)
+        with self.settings(QUOTES_SAMPLER_MAX_AGE=-1):
+            self.assertEqual(len(QuoteSampler()), 3)
+
+    def test_sample_choices_in_one_query(self):
+        quotes = self.create_quotes(10)
+        self.sampler.rebuild()
+        with self.assertNumQueries(1):
+            choices = self.sampler.sample_choices(4)
+        self.assertEqual(len(choices), 4)
+        self.assertEqual(len(set(choices)), 4)
+        all_choices = [(quote.id, quote.quote_text) for quote in quotes]
+        for choice in choices:
+            self.assertIn(choice, all_choices)
+
+    def test_sample_choices_of_whole_catalogue(self):
+        quotes = self.create_quotes(4)
+        self.sampler.rebuild()
+        with self.assertNumQueries(1):
+            choices = self.sampler.sample_choices(4)
+        self.assertEqual(
+            sorted(choices),
+            [(quote.id, quote.quote_text) for quote in quotes]
+        )
+
+    def test_no_choices_if_not_enough_quotes(self):
+        self.create_quotes(3)
+        self.sampler.rebuild()
+        with self.assertNumQueries(0):
+            self.assertEqual(self.sampler.sample_choices(4), [])
+
+    def test_sample_choices_skips_quotes_deleted_elsewhere(self):
+        quotes = self.create_quotes(6)
+        self.sampler.rebuild()
+        Quote.objects.filter(pk=quotes[0].pk)._raw_delete('default')
+        for i in range(20):
+            with self.assertNumQueries(1):
+                choices = self.sampler.sample_choices(4)
+            self.assertEqual(len(choices), 4)
+            self.assertNotIn(quotes[0].id, [x[0] for x in choices])
+            self.sampler.add(quotes[0].id)
+
+
+class ExposureSamplerTest(QuoteReadyTestCase):
+
+    def setUp(self):
+        self.sampler = ExposureSampler(max_age=600)
+        self.quotes = [
+            self.create_quote(text="Quote number {}".format(i))
+            for i in range(6)
+        ]
+
+    def test_alias_table_keeps_weights(self):
+        weights = [1, 2, 3, 0, 4]
+        probabilities, aliases = alias_table(weights)
+        chances = [0.0] * len(weights)
+        for position in range(len(weights)):
+            chances[position] += probabilities[position]
+            chances[aliases[position]] += 1 - probabilities[position]
+        for chance, weight in zip(chances, weights):
+            self.assertAlmostEqual(chance / len(weights), weight / 10)
+
+    def test_rarely_shown_quotes_favoured(self):
+        Quote.objects.exclude(id=self.quotes[0].id).update(impressions=1000)
+        with self.settings(QUOTES_POLL_EXPOSURE_SCALE=10):
+            self.sampler.rebuild()
+        drawn = [self.sampler.sample_choices(1)[0][0] for i in range(100)]
+        self.assertGreater(drawn.count(self.quotes[0].id), 80)
+
+    def test_sample_choices_distinct(self):
+        Quote.objects.exclude(id=self.quotes[0].id).update(impressions=10 ** 6)
+        self.sampler.rebuild()
+        for i in range(20):
+            with self.assertNumQueries(0):
+                ids = self.sampler.sample_ids(6)
+            self.assertEqual(
+                sorted(ids), sorted(quote.id for quote in self.quotes)
+            )
+
+    def test_rebuilt_after_changes(self):
+        self.sampler.rebuild()
+        self.sampler.add(1234)
+        with self.assertNumQueries(1):
+            self.assertEqual(len(self.sampler), 6)
+
+
+class QuoteDeckTest(QuoteReadyTestCase):
+
+    def setUp(self):
+        cache.clear()
+        self.sampler = QuoteSampler(max_age=600)
+        self.deck = QuoteDeck(self.sampler, size=4)
+
+    def create_quotes(self, number):
+        source = self.create_source(name="Deck source", link="a.com")
+        return [
+            self.create_quote(text="Quote number {}".format(i), source=source)
+            for i in range(number)
+        ]
+
+    def test_none_if_no_quotes(self):
+        self.assertIsNone(self.deck.deal())
+
+    def test_refilled_in_one_query(self):
+        quotes = self.create_quotes(10)
+        self.sampler.rebuild()
+        with self.assertNumQueries(1):
+            dealt = [self.deck.deal() for i in range(4)]
+        self.assertEqual(len(set(dealt)), 4)
+        for quote in dealt:
+            self.assertIn(quote, quotes)
+            self.assertEqual(quote.source.name, "Deck source")
+        self.assertEqual(len(self.deck), 0)
+        with self.assertNumQueries(1):
+            self.deck.deal()
+
+    def test_bounded_by_size(self):
+        self.create_quotes(10)
+        self.deck.deal()
+        self.assertEqual(len(self.deck), 3)
+
+    def test_small_catalogue(self):
+        quotes = self.create_quotes(2)
+        dealt = [self.deck.deal(), self.deck.deal()]
+        self.assertEqual(set(dealt), set(quotes))
+
+    def test_dropped_for_new_version(self):
+        self.create_quotes(10)
+        self.deck.deal()
+        pagecache.invalidate(pagecache.QUOTES)
+        with self.assertNumQueries(1):
+            self.deck.deal()
+        self.assertEqual(len(self.deck), 3)
+
+    def test_deleted_quotes_rebuild_sampler(self):
+        quotes = self.create_quotes(4)
+        self.sampler.rebuild()
+        # This sampler does not follow the signals, like those of other
+        # processes
+        Quote.objects.filter(pk=quotes[0].pk).delete()
+        self.assertIn(quotes[0].pk, self.sampler._ids)
+        self.deck.deal()
+        self.assertNotIn(quotes[0].pk, self.sampler._ids)
+
+
+class SamplerSignalsTest(QuoteReadyTestCase):
+
+    def test_index_follows_quote_changes(self):
+        sampler.rebuild()
+        quote = self.create_quote()
+        self.assertEqual(len(sampler), 1)
+        quote.delete()
+        self.assertEqual(len(sampler), 0)
+
+    def test_poll_sampler_follows_quote_changes(self):
+        poll_sampler.rebuild()
+        quote = self.create_quote()
+        self.assertEqual(len(poll_sampler), 1)
+        quote.delete()
+        self.assertEqual(len(poll_sampler), 0)
+
+    def test_deck_follows_quote_changes(self):
+        quote = self.create_quote()
+        deck.deal()
+        self.assertEqual(len(deck), 0)
+        other_quote = self.create_quote(text="Other quote")
+        dealt = [deck.deal(), deck.deal()]
+        self.assertEqual(set(dealt), {quote, other_quote})
+        other_quote.delete()
+        self.assertEqual(len(deck), 0)
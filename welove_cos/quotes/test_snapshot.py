@@ -0,0 +1,220 @@
+import os
+import shutil
+import tempfile
+
+from django.core.cache import cache
+from django.core.management import call_command
+from django.urls import reverse
+from django.utils.six import StringIO
+from mock import patch
+from . import snapshot, views
+from .models import Quote, QuoteGeneration
+from .snapshot import Snapshot, SnapshotReader, write_snapshot
+from .tests import QuoteReadyTestCase
+
+
+class SnapshotTestCase(QuoteReadyTestCase):
+
+    def setUp(self):
+        cache.clear()
+        directory = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, directory)
+        self.path = os.path.join(directory, 'quotes.snapshot')
+        snapshot_path = self.settings(QUOTES_SNAPSHOT_PATH=self.path)
+        snapshot_path.enable()
+        self.addCleanup(snapshot_path.disable)
+
+
+class WriteSnapshotTest(SnapshotTestCase):
+
+    def test_quotes_read_back(self):
+        first = self.create_quote(text="Première citation ☕")
+        second = self.create_quote(
+            text="Second", source=self.create_source("Ñame", 'https://a.b')
+        )
+        second.popularity = 7
+        second.save()
+        self.assertEqual(write_snapshot(), 2)
+
+        snapshot = Snapshot(self.path)
+        self.assertEqual(len(snapshot), 2)
+        quote = snapshot.quote(0)
+        self.assertEqual(quote.id, first.id)
+        self.assertEqual(quote.quote_text, "Première citation ☕")
+        self.assertEqual(quote.popularity, 0)
+        self.assertEqual(quote.source.name, self.source_name)
+        self.assertEqual(quote.source.link, '')
+        quote = snapshot.quote(1)
+        self.assertEqual(quote.popularity, 7)
+        self.assertEqual(quote.source.name, "Ñame")
+        self.assertEqual(quote.source.link, 'https://a.b')
+
+    def test_quote_without_source(self):
+        quote = Quote.objects.create(quote_text="No source")
+        write_snapshot()
+        self.assertIsNone(Snapshot(self.path).get(quote.id).source)
+
+    def test_get_by_id(self):
+        quotes = [
+            self.create_quote(text="Quote {}".format(i)) for i in range(5)
+        ]
+        write_snapshot()
+        snapshot = Snapshot(self.path)
+        self.assertEqual(snapshot.get(quotes[3].id).quote_text, "Quote 3")
+        self.assertIsNone(snapshot.get(quotes[-1].id + 1))
+
+    def test_no_quotes(self):
+        self.assertEqual(write_snapshot(), 0)
+        self.assertEqual(len(Snapshot(self.path)), 0)
+
+    def test_generation_recorded(self):
+        self.create_quote()
+        write_snapshot()
+        self.assertEqual(
+            Snapshot(self.path).generation, QuoteGeneration.current()
+        )
+
+    def test_command(self):
+        self.create_quote()
+        out = StringIO()
+        call_command('write_snapshot', stdout=out)
+        self.assertIn("Wrote 1 quotes", out.getvalue())
+        self.assertEqual(len(Snapshot(self.path)), 1)
+
+
+class SnapshotReaderTest(SnapshotTestCase):
+
+    def test_no_snapshot(self):
+        reader = SnapshotReader()
+        self.assertIsNone(reader.current())
+        with self.settings(QUOTES_SNAPSHOT_PATH=None):
+            with self.assertNumQueries(0):
+                self.assertIsNone(reader.random_quote())
+        self.assertFalse(os.path.exists(self.path))
+
+    def test_written_when_missing(self):
+        self.create_quote(text="Snapshot quote")
+        reader = SnapshotReader()
+        self.assertEqual(reader.random_quote().quote_text, "Snapshot quote")
+        self.assertEqual(len(Snapshot(self.path)), 1)
+
+    def test_not_a_snapshot(self):
+        with open(self.path, 'wb') as snapshot_file:
+            snapshot_file.write(b'Not a snapshot at all, but long enough')
+        self.assertIsNone(SnapshotReader().current())
+
+    def test_empty_snapshot(self):
+        write_snapshot()
+        self.assertIsNone(SnapshotReader().random_quote())
+
+    def test_written_again_once_quotes_change(self):
+        quote = self.create_quote(text="Old quote")
+        reader = SnapshotReader()
+        self.assertEqual(reader.random_quote().quote_text, "Old quote")
+        quote.quote_text = "Edited quote"
+        quote.save()
+        with self.settings(QUOTES_SNAPSHOT_CHECK_INTERVAL=0):
+            self.assertEqual(
+                reader.random_quote().quote_text, "Edited quote"
+            )
+        self.assertEqual(
+            Snapshot(self.path).generation, QuoteGeneration.current()
+        )
+
+    def test_generation_checked_every_interval(self):
+        self.create_quote()
+        reader = SnapshotReader()
+        reader.random_quote()
+        with self.assertNumQueries(0):
+            reader.random_quote()
+        with self.settings(QUOTES_SNAPSHOT_CHECK_INTERVAL=0):
+            with self.assertNumQueries(1):
+                reader.random_quote()
+
+    def test_not_written_by_two_processes(self):
+        self.create_quote()
+        with patch.object(
+            snapshot.fcntl, 'flock', side_effect=BlockingIOError
+        ), patch.object(snapshot, 'write_snapshot') as mock_write:
+            self.assertIsNone(SnapshotReader().random_quote())
+            mock_write.assert_not_called()
+
+    def test_warned_once_when_not_written(self):
+        self.create_quote()
+        reader = SnapshotReader()
+        with patch.object(
+            snapshot, 'write_snapshot', side_effect=OSError("Read-only")
+        ) as mock_write, patch.object(
+            snapshot, 'warning_email_admin'
+        ) as mock_warning:
+            self.assertIsNone(reader.random_quote())
+            self.assertIsNone(reader.random_quote())
+            mock_write.assert_called_once_with(self.path)
+            mock_warning.assert_called_once_with(
+                "WARNING: Quote snapshot not written to {}: Read-only".format(
+                    self.path
+                )
+            )
+
+    def test_mapped_once(self):
+        self.create_quote()
+        write_snapshot()
+        reader = SnapshotReader()
+        self.assertIs(reader.current(), reader.current())
+
+    def test_new_generation_picked_up(self):
+        self.create_quote(text="Old quote")
+        write_snapshot()
+        reader = SnapshotReader()
+        old = reader.current()
+        self.assertEqual(reader.random_quote().quote_text, "Old quote")
+
+        Quote.objects.all().delete()
+        self.create_quote(text="New quote")
+        write_snapshot()
+        self.assertIsNot(reader.current(), old)
+        self.assertEqual(reader.random_quote().quote_text, "New quote")
+        # Still readable by requests that got it before
+        self.assertEqual(old.quote(0).quote_text, "Old quote")
+
+
+class RandomViewSnapshotTest(SnapshotTestCase):
+
+    def setUp(self):
+        super(RandomViewSnapshotTest, self).setUp()
+        views.deck.clear()
+        # Not the generation another test checked last
+        reader = patch.object(views, 'snapshot_reader', SnapshotReader())
+        reader.start()
+        self.addCleanup(reader.stop)
+
+    def test_served_from_snapshot(self):
+        self.create_quote(text="Snapshot quote")
+        write_snapshot()
+        self.client.get(reverse('random'))
+        with patch.object(views.deck, 'deal') as mock_deal:
+            with self.assertNumQueries(0):
+                response = self.client.get(reverse('random'))
+            mock_deal.assert_not_called()
+        self.assertContains(response, "Snapshot quote")
+        self.assertContains(response, self.source_name)
+
+    def test_deck_while_not_written(self):
+        quote = self.create_quote(text="New quote")
+        with patch.object(
+            views.deck, 'deal', return_value=quote
+        ) as mock_deal, patch.object(
+            snapshot.fcntl, 'flock', side_effect=BlockingIOError
+        ):
+            response = self.client.get(reverse('random'))
+            mock_deal.assert_called_once_with()
+        self.assertContains(response, "New quote")
+
+    def test_deck_without_snapshot(self):
+        quote = self.create_quote()
+        with patch.object(
+            views.deck, 'deal', return_value=quote
+        ) as mock_deal, self.settings(QUOTES_SNAPSHOT_PATH=None):
+            response = self.client.get(reverse('random'))
+            mock_deal.assert_called_once_with()
+        self.assertEqual(response.context['quote'], quote)
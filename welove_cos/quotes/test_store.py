@@ -0,0 +1,59 @@
+from django.test import SimpleTestCase
+from mock import patch
+from . import store
+from .store import LocalStore, get_store
+
+
+class LocalStoreTest(SimpleTestCase):
+
+    def setUp(self):
+        self.store = LocalStore()
+
+    def test_lists(self):
+        self.assertEqual(self.store.rpush('list', 'a', 'b', 3), 3)
+        self.assertEqual(self.store.llen('list'), 3)
+        self.assertEqual(self.store.lpop('list'), 'a')
+        self.store.ltrim('list', 0, 0)
+        self.assertEqual(self.store.lpop('list'), 'b')
+        self.assertIsNone(self.store.lpop('list'))
+        self.assertEqual(self.store.llen('list'), 0)
+
+    def test_hashes(self):
+        self.assertEqual(self.store.hincrby('hash', 'field'), 1)
+        self.assertEqual(self.store.hincrby('hash', 'field', 4), 5)
+        self.assertEqual(self.store.hgetall('hash'), {'field': '5'})
+        self.assertEqual(self.store.hgetall('missing'), {})
+
+    def test_renamenx(self):
+        self.store.hincrby('source', 'field')
+        self.store.hincrby('taken', 'field')
+        self.assertFalse(self.store.renamenx('source', 'taken'))
+        self.assertTrue(self.store.renamenx('source', 'destination'))
+        self.assertEqual(self.store.hgetall('destination'), {'field': '1'})
+        self.assertEqual(self.store.hgetall('source'), {})
+
+    def test_delete(self):
+        self.store.rpush('list', 'a')
+        self.assertEqual(self.store.delete('list', 'missing'), 1)
+        self.assertEqual(self.store.llen('list'), 0)
+
+
+class GetStoreTest(SimpleTestCase):
+
+    def tearDown(self):
+        store._store = None
+
+    def test_local_store_without_redis(self):
+        store._store = None
+        with self.settings(QUOTES_REDIS_URL=None):
+            self.assertIsInstance(get_store(), LocalStore)
+            self.assertIs(get_store(), get_store())
+
+    def test_redis_store_with_url(self):
+        store._store = None
+        with self.settings(QUOTES_REDIS_URL='redis://localhost:6379/1'):
+            with patch('redis.StrictRedis.from_url') as mock_from_url:
+                self.assertIs(get_store(), mock_from_url.return_value)
+                mock_from_url.assert_called_with(
+                    'redis://localhost:6379/1', decode_responses=True
+                )
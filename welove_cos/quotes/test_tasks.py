@@ -1,6 +1,9 @@
 from django.conf import settings
 from django.contrib.auth.models import User
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
 from django.urls import reverse
+from django.utils import timezone
 from mock import patch, call, MagicMock
 from .context_processors import COMMON_ORIGIN, TYPE_OF_SOURCE
 from .models import Quote, Profile
@@ -13,17 +16,23 @@ from .tests import QuoteReadyTestCase
 
 class RandomQuoteTest(QuoteReadyTestCase):
 
-    def test_filtered_queryset(self):
-        self.create_quote()
-        with patch.object(Quote.objects, 'filter') as mock_quotes_filter:
+    def test_selected_quotes_not_scanned(self):
+        self.create_quote(selected=True)
+        self.create_quote(text="Another quote")
+        with CaptureQueriesContext(connection) as queries:
             get_random_quote()
-            mock_quotes_filter.assert_called_with(selected=True)
+        for query in queries.captured_queries:
+            self.assertNotIn('WHERE "quotes_quote"."selected"', query['sql'])
 
-    def test_random_queryset(self):
-        self.create_quote()
-        with patch.object(Quote.objects, 'order_by') as mock_quotes_order_by:
+    def test_quote_from_rotation(self):
+        quote = self.create_quote()
+        with patch.object(
+            tasks.rotation, 'quote_for_day', return_value=quote
+        ) as mock_quote_for_day:
             get_random_quote()
-            mock_quotes_order_by.assert_called_with("?")
+            mock_quote_for_day.assert_called_once_with(
+                timezone.localdate()
+            )
 
     def test_quote_unselected_and_selected(self):
         previously_selected = self.create_quote(
@@ -35,10 +44,10 @@ class RandomQuoteTest(QuoteReadyTestCase):
         )
 
         with patch.object(
-            Quote.objects,
-            'order_by',
-            return_value=[previously_not_selected]
-        ) as mock_quotes_order_by:
+            tasks.rotation,
+            'quote_for_day',
+            return_value=previously_not_selected
+        ):
             get_random_quote()
 
         currently_selected = Quote.objects.filter(selected=True)[0]
@@ -52,6 +61,68 @@ class RandomQuoteTest(QuoteReadyTestCase):
             currently_selected.quote_text
         )
 
+    def test_rollover_in_one_transaction(self):
+        previously_selected = self.create_quote(
+            text="Pre-selected quote", selected=True
+        )
+        next_quote = self.create_quote(text="Next quote")
+        with patch.object(
+            tasks.rotation, 'quote_for_day', return_value=next_quote
+        ), patch.object(
+            tasks.DailySelection, 'select', side_effect=RuntimeError
+        ):
+            with self.assertRaises(RuntimeError):
+                get_random_quote()
+        self.assertEqual(
+            list(Quote.objects.filter(selected=True)), [previously_selected]
+        )
+        self.assertEqual(
+            tasks.DailySelection.current_quote(), previously_selected
+        )
+
+    def test_counters_not_overwritten(self):
+        self.create_quote(text="Pre-selected quote", selected=True)
+        next_quote = self.create_quote(text="Next quote")
+        Quote.objects.filter(pk=next_quote.pk).update(popularity=7)
+        with patch.object(
+            tasks.rotation, 'quote_for_day', return_value=next_quote
+        ):
+            get_random_quote()
+        next_quote = Quote.objects.get(pk=next_quote.pk)
+        self.assertTrue(next_quote.selected)
+        self.assertEqual(next_quote.popularity, 7)
+
+    def test_no_quotes(self):
+        get_random_quote()
+        self.assertIsNone(tasks.DailySelection.current_quote())
+
+    def test_daily_page_refreshed(self):
+        next_quote = self.create_quote(text="Next quote")
+        with patch.object(
+            tasks.rotation, 'quote_for_day', return_value=next_quote
+        ), patch.object(tasks.transaction, 'on_commit') as mock_on_commit:
+            get_random_quote()
+            self.assertEqual(mock_on_commit.call_args_list, [
+                call(tasks.refresh_daily_page),
+                call(tasks.prerender_daily_page.delay),
+            ])
+
+
+class PrerenderDailyPageTest(QuoteReadyTestCase):
+
+    def test_page_stored(self):
+        with patch.object(
+            tasks.prerender, 'prerender_daily_page', return_value={}
+        ) as mock_prerender:
+            self.assertTrue(tasks.prerender_daily_page())
+            mock_prerender.assert_called_once_with()
+
+    def test_no_daily_quote(self):
+        with patch.object(
+            tasks.prerender, 'prerender_daily_page', return_value=None
+        ):
+            self.assertFalse(tasks.prerender_daily_page())
+
 
 class DailyQuoteEmailsTest(QuoteReadyTestCase):
 
@@ -176,10 +247,53 @@ class ControlPopularityTest(QuoteReadyTestCase):
         mock_warning_email.assert_not_called()
         self.assertEqual(Quote.objects.all()[0].popularity, quote.popularity)
 
-        quote.popularity = 2000000000
+        quote.popularity = 2 ** 62 + 1
         quote.save()
         control_popularity()
-        mock_warning_email.assert_called_with(
-            "WARNING: All quote popularities are now being divided by half"
+        mock_warning_email.assert_called_once()
+        warning_text = mock_warning_email.call_args[0][0]
+        self.assertTrue(warning_text.startswith(
+            "WARNING: All quote popularities were divided by half"
+        ))
+        self.assertIn("(1 quotes updated in ", warning_text)
+        self.assertEqual(Quote.objects.all()[0].popularity, 2 ** 61)
+
+    @patch.object(tasks, 'warning_email_admin')
+    def test_popularities_halved_in_one_update(self, mock_warning_email):
+        popularities = [2 ** 62, 7, 0]
+        for index, popularity in enumerate(popularities):
+            quote = self.create_quote(text="Quote {}".format(index))
+            Quote.objects.filter(id=quote.id).update(popularity=popularity)
+        with patch.object(Quote, 'save') as mock_save:
+            with CaptureQueriesContext(connection) as queries:
+                control_popularity()
+            mock_save.assert_not_called()
+        updates = [
+            query['sql'] for query in queries.captured_queries
+            if query['sql'].startswith('UPDATE "quotes_quote"')
+        ]
+        self.assertEqual(len(updates), 1)
+        self.assertEqual(
+            list(Quote.objects.order_by('id').values_list(
+                'popularity', flat=True
+            )),
+            [2 ** 61, 3, 0]
         )
-        self.assertEqual(Quote.objects.all()[0].popularity, quote.popularity/2)
+
+    @patch.object(tasks, 'warning_email_admin')
+    def test_popularities_halved_in_chunks(self, mock_warning_email):
+        for i in range(5):
+            self.create_quote(text="Quote {}".format(i))
+        Quote.objects.update(popularity=2 ** 62 + 1)
+        with self.settings(QUOTES_RESCALE_CHUNK_SIZE=2):
+            with CaptureQueriesContext(connection) as queries:
+                control_popularity()
+        updates = [
+            query['sql'] for query in queries.captured_queries
+            if query['sql'].startswith('UPDATE "quotes_quote"')
+        ]
+        self.assertEqual(len(updates), 3)
+        warning_text = mock_warning_email.call_args[0][0]
+        self.assertIn("(5 quotes updated in ", warning_text)
+        for quote in Quote.objects.all():
+            self.assertEqual(quote.popularity, 2 ** 61)
@@ -0,0 +1,74 @@
+from datetime import timedelta
+from django.utils import timezone
+from mock import patch
+from .models import Quote, TrendingAnchor
+from .tests import QuoteReadyTestCase
+from .votes import apply_vote_counts
+from . import tasks
+
+
+class TrendingTest(QuoteReadyTestCase):
+
+    def setUp(self):
+        self.quotes = [
+            self.create_quote(text="Quote {}".format(i)) for i in range(2)
+        ]
+        self.now = timezone.now()
+        TrendingAnchor.objects.create(pk=1, anchor=self.now)
+
+    def vote_at(self, hours, counts):
+        when = self.now + timedelta(hours=hours)
+        with patch('quotes.votes.timezone.now', return_value=when):
+            apply_vote_counts(counts)
+
+    def trending(self):
+        return dict(Quote.objects.values_list('id', 'trending'))
+
+    def test_recent_votes_weigh_more(self):
+        with self.settings(QUOTES_TRENDING_HALF_LIFE=24):
+            self.vote_at(0, {self.quotes[0].id: 3})
+            self.vote_at(48, {self.quotes[1].id: 1})
+        trending = self.trending()
+        self.assertAlmostEqual(trending[self.quotes[0].id], 3)
+        self.assertAlmostEqual(trending[self.quotes[1].id], 4)
+        self.assertEqual(
+            list(Quote.objects.order_by('-trending')),
+            [self.quotes[1], self.quotes[0]]
+        )
+        popularities = dict(Quote.objects.values_list('id', 'popularity'))
+        self.assertEqual(popularities[self.quotes[0].id], 3)
+        self.assertEqual(popularities[self.quotes[1].id], 1)
+
+    def test_old_anchor_rebased(self):
+        with self.settings(
+            QUOTES_TRENDING_HALF_LIFE=1, QUOTES_TRENDING_REBASE_AFTER=2
+        ):
+            self.vote_at(0, {self.quotes[0].id: 8})
+            self.vote_at(1, {self.quotes[1].id: 1})
+            self.assertEqual(
+                TrendingAnchor.objects.get().anchor, self.now
+            )
+            self.vote_at(3, {self.quotes[1].id: 1})
+        self.assertEqual(
+            TrendingAnchor.objects.get().anchor, self.now + timedelta(hours=3)
+        )
+        trending = self.trending()
+        self.assertAlmostEqual(trending[self.quotes[0].id], 1)
+        self.assertAlmostEqual(trending[self.quotes[1].id], 1.25)
+
+    def test_rebase_task(self):
+        self.vote_at(0, {self.quotes[0].id: 4})
+        later = self.now + timedelta(hours=10)
+        with self.settings(
+            QUOTES_TRENDING_HALF_LIFE=5, QUOTES_TRENDING_REBASE_AFTER=1
+        ):
+            with patch('quotes.trending.timezone.now', return_value=later):
+                tasks.rebase_trending()
+        self.assertEqual(TrendingAnchor.objects.get().anchor, later)
+        self.assertAlmostEqual(self.trending()[self.quotes[0].id], 1)
+
+    def test_anchor_created_on_first_vote(self):
+        TrendingAnchor.objects.all().delete()
+        self.vote_at(0, {self.quotes[0].id: 2})
+        self.assertEqual(TrendingAnchor.objects.get().anchor, self.now)
+        self.assertAlmostEqual(self.trending()[self.quotes[0].id], 2)
@@ -1,32 +1,47 @@
 import copy
+from datetime import timedelta
 from django.conf import settings
 from django.contrib.auth import login
 from django.contrib.auth.models import User
+from django.core.cache import cache
+from django.db import connection
 from django.http import QueryDict, HttpResponseRedirect
 from django.urls import reverse
+from django.utils import timezone
 from django.template import loader
 from django.test import TestCase, RequestFactory
+from django.test.utils import CaptureQueriesContext
 from mock import patch, call
 from .forms import ProfileForm, FavouriteQuoteForm
-from .models import Quote, Profile, Message
+from .leaderboard import make_cursor
+from .models import DailyArchive, Quote, Profile, Message
+from .sampling import poll_sampler
 from .tests import QuoteReadyTestCase, UserReadyTestCase
+from .votes import quote_popularity
 from . import context_processors
+from . import pagecache
 from . import views
 from . import urls
 
 
 class RandomViewTest(QuoteReadyTestCase):
 
+    def setUp(self):
+        views.deck.clear()
+
     def test_default_message_no_quote(self):
         response = self.client.get(reverse('random'))
         self.assertEqual(response.status_code, 200)
         self.assertContains(response, "There is no random quote available")
 
-    def test_random_queryset(self):
-        self.create_quote()
-        with patch.object(Quote.objects, 'order_by') as mock_quotes_order_by:
+    def test_random_quote_from_deck(self):
+        quote = self.create_quote()
+        with patch.object(
+            views.deck, 'deal', return_value=quote
+        ) as mock_deal:
             response = self.client.get(reverse('random'))
-            mock_quotes_order_by.assert_called_with("?")
+            mock_deal.assert_called_once_with()
+        self.assertEqual(response.context['quote'], quote)
 
     def test_quote_text_and_source_in_response(self):
         self.create_quote()
@@ -35,6 +50,14 @@ class RandomViewTest(QuoteReadyTestCase):
         self.assertContains(response, self.quote_text)
         self.assertContains(response, self.source_name)
 
+    def test_dealt_without_queries(self):
+        for i in range(3):
+            self.create_quote(text="Quote number {}".format(i))
+        self.client.get(reverse('random'))
+        with self.assertNumQueries(0):
+            response = self.client.get(reverse('random'))
+        self.assertContains(response, "Quote number")
+
 
 class ViewContextProcessorTest(QuoteReadyTestCase):
 
@@ -72,7 +95,10 @@ class ViewContextProcessorTest(QuoteReadyTestCase):
             )
 
 
-class DailyViewTest(QuoteReadyTestCase):
+class DailyViewTest(UserReadyTestCase, QuoteReadyTestCase):
+
+    def setUp(self):
+        cache.clear()
 
     def test_default_message_no_quote(self):
         response = self.client.get(reverse('daily'))
@@ -80,10 +106,13 @@ class DailyViewTest(QuoteReadyTestCase):
         self.assertContains(response, "There is no daily quote available")
 
     def test_random_if_no_selected_quote(self):
-        self.create_quote()
-        with patch.object(Quote.objects, 'order_by') as mock_quotes_order_by:
+        quote = self.create_quote()
+        with patch.object(
+            views.deck, 'deal', return_value=quote
+        ) as mock_random_quote:
             response = self.client.get(reverse('daily'))
-            mock_quotes_order_by.assert_called_with("?")
+            mock_random_quote.assert_called_once_with()
+        self.assertEqual(response.context['quote'], quote)
 
     def test_warning_admin_email_sent_if_no_selected_quote(self):
         self.create_quote()
@@ -114,6 +143,120 @@ class DailyViewTest(QuoteReadyTestCase):
         response_daily = self.client.get(reverse('daily'))
         self.assertNotEqual(response_index.content, response_daily.content)
 
+    def test_cached_until_daily_quote_changes(self):
+        self.create_quote(text="First quote", selected=True)
+        response = self.client.get(reverse('daily'))
+        self.assertContains(response, "First quote")
+        with self.assertNumQueries(0):
+            response = self.client.get(reverse('daily'))
+        self.assertContains(response, "First quote")
+
+        # Invalidated once the new selection is committed
+        with patch.object(
+            pagecache.transaction, 'on_commit',
+            side_effect=lambda func: func()
+        ):
+            self.create_quote(text="Second quote", selected=True)
+        response = self.client.get(reverse('daily'))
+        self.assertContains(response, "Second quote")
+        self.assertNotIn("First quote", str(response.content))
+
+    def test_cached_until_message_changes(self):
+        self.create_quote(selected=True)
+        self.client.get(reverse('daily'))
+        with patch.object(
+            pagecache.transaction, 'on_commit',
+            side_effect=lambda func: func()
+        ):
+            Message.objects.create(
+                message_text="Site maintenance", displayed=True
+            )
+        response = self.client.get(reverse('daily'))
+        self.assertContains(response, "Site maintenance")
+
+    def test_cached_page_links_to_each_user(self):
+        self.create_quote(selected=True)
+        response = self.client.get(reverse('daily'))
+        self.assertContains(
+            response, "Log in and subscribe to daily quote emails."
+        )
+
+        self.create_and_login_user()
+        with self.assertNumQueries(2):
+            # Only the session and the user
+            response = self.client.get(reverse('daily'))
+        self.assertContains(
+            response,
+            "Visit your profile, {}".format(self.user.username.capitalize())
+        )
+        self.assertNotIn(views.USER_LINK_MARKER, str(response.content))
+
+    def test_refreshed_ahead_of_requests(self):
+        self.create_quote(text="First quote", selected=True)
+        self.client.get(reverse('daily'))
+        Message.objects.create(message_text="Site news", displayed=True)
+        self.create_quote(text="Second quote", selected=True)
+
+        views.refresh_daily_page()
+        with self.assertNumQueries(0):
+            response = self.client.get(reverse('daily'))
+        self.assertContains(response, "Second quote")
+        self.assertContains(response, "Site news")
+        self.assertContains(response, context_processors.COMMON_ORIGIN)
+        self.assertContains(
+            response, "Log in and subscribe to daily quote emails."
+        )
+
+    def test_not_modified_without_rendering(self):
+        self.create_quote(selected=True)
+        response = self.client.get(reverse('daily'))
+        self.assertTrue(response.has_header('ETag'))
+        self.assertTrue(response.has_header('Last-Modified'))
+
+        with self.assertNumQueries(0):
+            response_etag = self.client.get(
+                reverse('daily'), HTTP_IF_NONE_MATCH=response['ETag']
+            )
+            response_date = self.client.get(
+                reverse('daily'),
+                HTTP_IF_MODIFIED_SINCE=response['Last-Modified']
+            )
+        self.assertEqual(response_etag.status_code, 304)
+        self.assertTemplateNotUsed(response_etag, 'quotes/quotes.html')
+        self.assertEqual(response_date.status_code, 304)
+        self.assertTemplateNotUsed(response_date, 'quotes/quotes.html')
+        self.assertEqual(response_etag['ETag'], response['ETag'])
+
+    def test_validators_change_with_page_and_user(self):
+        self.create_quote(selected=True)
+        etag = self.client.get(reverse('daily'))['ETag']
+
+        # Same content, same validator
+        pagecache.invalidate(pagecache.MESSAGE)
+        response = self.client.get(reverse('daily'), HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, 304)
+
+        Message.objects.create(message_text="Site news", displayed=True)
+        pagecache.invalidate(pagecache.MESSAGE)
+        response = self.client.get(reverse('daily'), HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, 200)
+        self.assertNotEqual(response['ETag'], etag)
+        etag = response['ETag']
+
+        self.create_and_login_user()
+        response = self.client.get(reverse('daily'), HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, 200)
+        self.assertNotEqual(response['ETag'], etag)
+
+    def test_not_cached_without_selected_quote(self):
+        quote = self.create_quote()
+        with patch.object(
+            views.deck, 'deal', return_value=quote
+        ), patch.object(views, 'warning_email_admin') as mock_warning_email:
+            self.client.get(reverse('daily'))
+            self.client.get(reverse('daily'))
+        self.assertEqual(mock_warning_email.call_count, 2)
+
 
 class IndexViewTest(TestCase):
 
@@ -147,6 +290,20 @@ class IndexViewTest(TestCase):
             context['quotes_context']['common_origin']
         )
 
+    def test_not_modified_index(self):
+        response = self.client.get(reverse('index'))
+        revalidated = self.client.get(
+            reverse('index'), HTTP_IF_NONE_MATCH=response['ETag']
+        )
+        self.assertEqual(revalidated.status_code, 304)
+        self.assertTemplateNotUsed(revalidated, 'quotes/index.html')
+
+        pagecache.invalidate(pagecache.MESSAGE)
+        response = self.client.get(
+            reverse('index'), HTTP_IF_NONE_MATCH=response['ETag']
+        )
+        self.assertEqual(response.status_code, 200)
+
 
 class PollViewTest(UserReadyTestCase, QuoteReadyTestCase):
     def test_bottom_links_displayed_correctly(self):
@@ -182,6 +339,29 @@ class PollViewTest(UserReadyTestCase, QuoteReadyTestCase):
         for text in texts:
             self.assertContains(response, text)
 
+    def test_impressions_recorded(self):
+        self.create_and_login_user()
+        texts = ['COS rocks', 'Jordan rocks', 'Lacey rocks', 'Andrew rocks']
+        choices = [(self.create_quote(text=text).id, text) for text in texts]
+        with patch.object(
+            views, 'get_ballot', return_value=choices
+        ), patch.object(views, 'record_impressions') as mock_impressions:
+            self.client.get(reverse('poll'))
+        shown = list(mock_impressions.call_args[0][0])
+        self.assertEqual(shown, [quote_id for quote_id, text in choices])
+
+    def test_choices_sampled_once(self):
+        self.create_and_login_user()
+        texts = ['COS rocks', 'Jordan rocks', 'Lacey rocks', 'Andrew rocks']
+        choices = [(self.create_quote(text=text).id, text) for text in texts]
+        with patch.object(
+            poll_sampler, 'sample_choices', return_value=choices
+        ) as mock_sample_choices:
+            response = self.client.get(reverse('poll'))
+            mock_sample_choices.assert_called_once_with(4)
+        for text in texts:
+            self.assertContains(response, text)
+
     def test_different_header_messages_displayed_correctly(self):
         self.create_and_login_user()
         initial_response = self.client.get(reverse('poll'))
@@ -224,6 +404,26 @@ class PollViewTest(UserReadyTestCase, QuoteReadyTestCase):
             "Try answering one of our polls", response_content
         )
 
+    def test_vote_with_signed_ballot(self):
+        self.create_and_login_user()
+        texts = ['COS rocks', 'Jordan rocks', 'Lacey rocks', 'Andrew rocks']
+        for text in texts:
+            self.create_quote(text=text)
+        response = self.client.get(reverse('poll'))
+        form = response.context['form']
+        quote_id = form.fields['quote_choice'].choices[0][0]
+        post_data = {
+            'quote_choice': quote_id,
+            'ballot': form.initial['ballot']
+        }
+
+        # Rendering other ballots in between does not affect the vote
+        self.client.get(reverse('poll'))
+        response = self.client.post(reverse('poll'), data=post_data)
+        self.assertNotIn('errors', response.context)
+        self.assertTrue(response.context['done'])
+        self.assertEqual(quote_popularity(quote_id), 1)
+
     @patch.object(views, 'PollForm')
     def test_post_method_valid_form(self, mock_poll_form):
         self.create_and_login_user()
@@ -301,6 +501,54 @@ class PopularityViewTest(UserReadyTestCase, QuoteReadyTestCase):
         self.assertContains(response, unpopular_quote.quote_text)
         self.assertTrue(index_popular_quote < index_unpopular_quote)
 
+    def test_quotes_displayed_by_trending(self):
+        self.create_and_login_user()
+        old_favourite = self.create_quote(text="An old favourite")
+        trending_quote = self.create_quote(text="A trending quote")
+        Quote.objects.filter(id=old_favourite.id).update(
+            popularity=10, trending=1
+        )
+        Quote.objects.filter(id=trending_quote.id).update(
+            popularity=2, trending=2
+        )
+
+        response = self.client.get(
+            reverse('popularity'), {'order': 'trending'}
+        )
+        str_response = str(response.content)
+        self.assertTrue(
+            str_response.find(trending_quote.quote_text) <
+            str_response.find(old_favourite.quote_text)
+        )
+        self.assertContains(response, '?order=rating">Best rated')
+
+        response = self.client.get(reverse('popularity'))
+        str_response = str(response.content)
+        self.assertTrue(
+            str_response.find(old_favourite.quote_text) <
+            str_response.find(trending_quote.quote_text)
+        )
+        self.assertContains(response, '?order=trending">Trending now')
+
+    def test_quotes_displayed_by_rating(self):
+        self.create_and_login_user()
+        often_shown = self.create_quote(text="An often shown quote")
+        rarely_shown = self.create_quote(text="A rarely shown quote")
+        Quote.objects.filter(id=often_shown.id).update(
+            popularity=10, impressions=100, rating=0.05
+        )
+        Quote.objects.filter(id=rarely_shown.id).update(
+            popularity=5, impressions=10, rating=0.2
+        )
+
+        response = self.client.get(reverse('popularity'), {'order': 'rating'})
+        str_response = str(response.content)
+        self.assertTrue(
+            str_response.find(rarely_shown.quote_text) <
+            str_response.find(often_shown.quote_text)
+        )
+        self.assertContains(response, 'action="popularity?order=rating"')
+
     def test_all_forms_displayed(self):
         self.create_and_login_user()
         self.create_three_quotes()
@@ -317,7 +565,7 @@ class PopularityViewTest(UserReadyTestCase, QuoteReadyTestCase):
 
             hidden_input = [
                 '<input type="hidden"',
-                'name="quote_text"'
+                'name="quote_id"'
             ]
             for chunk in hidden_input:
                 self.assertIn(chunk, response_form)
@@ -331,8 +579,8 @@ class PopularityViewTest(UserReadyTestCase, QuoteReadyTestCase):
             ]
             for chunk in checkbox_input:
                 self.assertIn(chunk, response_form)
-        self.assertIn('all_forms', response.context)
-        self.assertEqual(len(response.context['all_forms']), no_quotes)
+        self.assertIn('quotes', response.context)
+        self.assertEqual(len(response.context['quotes']), no_quotes)
 
     def test_source_link_displayed_if_available(self):
         self.create_and_login_user()
@@ -352,34 +600,144 @@ class PopularityViewTest(UserReadyTestCase, QuoteReadyTestCase):
         self.assertNotIn('From <a ', str(response.content))
         self.assertNotIn("</span></a>:", str(response.content))
 
-    def test_label_and_help_text_set(self):
-        original_label = FavouriteQuoteForm.declared_fields[
-            'set_favourite'].label
-        original_help_text = FavouriteQuoteForm.declared_fields[
-            'set_favourite'].help_text
-        self.create_and_login_user()
+    def test_form_class_state_untouched(self):
+        field = FavouriteQuoteForm.declared_fields['set_favourite']
+        original = (field.label, field.help_text, field.initial)
+        self.create_user_login_and_profile()
         source = self.create_source(name="Common knowledge")
         quote = self.create_quote(text="Alternative quote", source=source)
-        self.client.get(reverse('popularity'))
-        new_label = FavouriteQuoteForm.declared_fields[
-            'set_favourite'].label
-        new_help_text = FavouriteQuoteForm.declared_fields[
-            'set_favourite'].help_text
-        self.assertEqual(new_label, quote.quote_text)
-        self.assertEqual(new_help_text, quote.source)
-        self.assertNotEqual(original_label, new_label)
-        self.assertNotEqual(original_help_text, new_help_text)
+        response = self.client.get(reverse('popularity'))
+        self.assertContains(response, "Common knowledge")
+        self.assertContains(response, "Alternative quote")
+        self.client.post(reverse('popularity'), data={'quote_id': quote.id})
+        field = FavouriteQuoteForm.declared_fields['set_favourite']
+        self.assertEqual(
+            (field.label, field.help_text, field.initial), original
+        )
+
+    def test_new_favourite_checked(self):
+        self.create_user_login_and_profile()
+        some_quote = self.create_three_quotes()
+        response = self.client.post(
+            reverse('popularity'), data={'quote_id': some_quote.id}
+        )
+        self.assertEqual(response.context['favourite_id'], some_quote.id)
+        self.assertEqual(str(response.content).count(' checked>'), 1)
 
     @patch.object(views, 'FavouriteQuoteForm')
-    def test_FavouriteQuoteForm_called_get(self, mock_fav_quote_form):
+    def test_FavouriteQuoteForm_not_called_get(self, mock_fav_quote_form):
         self.create_and_login_user()
         self.create_three_quotes()
-        response = self.client.get(reverse('popularity'))
-        no_quotes = Quote.objects.count()
-        all_calls = mock_fav_quote_form.mock_calls
-        empty_call = call()
-        calls_without_args = [x for x in all_calls if x == empty_call]
-        self.assertEqual(len(calls_without_args), no_quotes)
+        self.client.get(reverse('popularity'))
+        mock_fav_quote_form.assert_not_called()
+
+    def test_page_in_constant_queries(self):
+        self.create_and_login_user()
+        for i in range(30):
+            self.create_quote(
+                text="Quote number {}".format(i),
+                source=self.create_source(name="Source {}".format(i))
+            )
+        with self.settings(QUOTES_LEADERBOARD_PAGE_SIZE=10):
+            self.client.get(reverse('popularity'))
+            # Session, user, the page with its sources and the votes pending
+            # in shards. The displayed message is cached.
+            with self.assertNumQueries(4):
+                response = self.client.get(reverse('popularity'))
+        self.assertEqual(len(response.context['quotes']), 10)
+        self.assertContains(response, "Source 0<")
+        self.assertNotContains(response, "Source 29")
+        self.assertEqual(str(response.content).count('</form>'), 10)
+
+    def test_deep_page_by_cursor_not_offset(self):
+        self.create_and_login_user()
+        source = self.create_source()
+        Quote.objects.bulk_create(
+            Quote(
+                quote_text="Quote number {}".format(i), source=source,
+                popularity=i
+            ) for i in range(300)
+        )
+        last = Quote.objects.order_by('popularity', '-id')[10]
+        with self.settings(QUOTES_LEADERBOARD_PAGE_SIZE=10):
+            self.client.get(reverse('popularity'))
+            with CaptureQueriesContext(connection) as first_queries:
+                self.client.get(reverse('popularity'))
+            with self.assertNumQueries(len(first_queries)), \
+                    CaptureQueriesContext(connection) as deep_queries:
+                response = self.client.get(reverse('popularity'), {
+                    'after': make_cursor(last.popularity, last.id)
+                })
+        self.assertEqual(
+            [quote.popularity for quote in response.context['quotes']],
+            list(range(9, -1, -1))
+        )
+        page_queries = [
+            query['sql'] for query in deep_queries.captured_queries
+            if '"quotes_quote"."popularity" <=' in query['sql']
+        ]
+        self.assertEqual(len(page_queries), 1)
+        self.assertNotIn('OFFSET', page_queries[0])
+        self.assertIn('"quotes_quote"."id" >', page_queries[0])
+
+    def test_keyset_pagination(self):
+        self.create_and_login_user()
+        quotes = [
+            self.create_quote(text="Quote number {}".format(i))
+            for i in range(7)
+        ]
+        for popularity, quote in zip([3, 1, 3, 0, 2, 1, 3], quotes):
+            Quote.objects.filter(id=quote.id).update(popularity=popularity)
+        expected = list(Quote.objects.order_by('-popularity', 'id'))
+
+        listed = []
+        query = {}
+        with self.settings(QUOTES_LEADERBOARD_PAGE_SIZE=3):
+            for page in range(3):
+                response = self.client.get(reverse('popularity'), query)
+                listed.extend(response.context['quotes'])
+                query = QueryDict(response.context.get('next_page', ''))
+        self.assertEqual(listed, expected)
+        self.assertNotIn('next_page', response.context)
+
+    def test_whole_leaderboard_streamed(self):
+        self.create_and_login_user()
+        quotes = [
+            self.create_quote(text="Quote number {}".format(i))
+            for i in range(7)
+        ]
+        Quote.objects.filter(id=quotes[4].id).update(popularity=5)
+        with self.settings(
+            QUOTES_LEADERBOARD_PAGE_SIZE=2,
+            QUOTES_LEADERBOARD_STREAM_CHUNK_SIZE=3
+        ):
+            response = self.client.get(reverse('popularity'), {'all': 1})
+            chunks = [
+                chunk.decode() for chunk in response.streaming_content
+            ]
+        self.assertTrue(response.streaming)
+        # The page around the rows, and the rows in chunks of three
+        self.assertEqual(len(chunks), 5)
+        self.assertIn("Quotes by order of popularity", chunks[0])
+        self.assertIn("-- Answer one of our polls --", chunks[-1])
+        self.assertEqual(chunks[1].count('</form>'), 3)
+        self.assertEqual(chunks[3].count('</form>'), 1)
+        content = ''.join(chunks)
+        self.assertNotIn(views.STREAM_MARKER, content)
+        self.assertNotIn("Next page", content)
+        self.assertIn("name='csrfmiddlewaretoken'", chunks[1])
+        self.assertIn('action="popularity?all=1"', chunks[1])
+        ordered = [quotes[4]] + quotes[:4] + quotes[5:]
+        positions = [content.find(quote.quote_text) for quote in ordered]
+        self.assertEqual(positions, sorted(positions))
+
+    def test_invalid_cursor_shows_first_page(self):
+        self.create_and_login_user()
+        self.create_three_quotes()
+        response = self.client.get(
+            reverse('popularity'), {'after': 'not_a_cursor'}
+        )
+        self.assertEqual(len(response.context['quotes']), 3)
 
     @patch.object(views, 'FavouriteQuoteForm')
     def test_FavouriteQuoteForm_called_post_errors(self, mock_fav_quote_form):
@@ -395,7 +753,7 @@ class PopularityViewTest(UserReadyTestCase, QuoteReadyTestCase):
 
         mock_fav_quote_form.side_effect = side_effect_of_mock
         post_data = {
-            'quote_text': "Text of the selected quote"
+            'quote_id': "1234"
         }
         response = self.client.post(reverse('popularity'), data=post_data)
         self.assertIn('errors', response.context)
@@ -410,6 +768,8 @@ class PopularityViewTest(UserReadyTestCase, QuoteReadyTestCase):
         some_quote = self.create_three_quotes()
 
         class FakeFavQuoteForm(object):
+            cleaned_data = {'quote_id': some_quote.id}
+
             def is_valid():
                 return True
 
@@ -418,7 +778,7 @@ class PopularityViewTest(UserReadyTestCase, QuoteReadyTestCase):
 
         mock_fav_quote_form.side_effect = side_effect_of_mock
         post_data = {
-            'quote_text': some_quote.quote_text
+            'quote_id': some_quote.id
         }
         response = self.client.post(reverse('popularity'), data=post_data)
         self.assertIn('favourite_set', response.context)
@@ -428,6 +788,47 @@ class PopularityViewTest(UserReadyTestCase, QuoteReadyTestCase):
             some_quote, users_profile.favourite_quote
         )
 
+    def test_favourite_set_by_id_in_targeted_updates(self):
+        self.create_user_login_and_profile()
+        first_choice = self.create_quote(text="First choice")
+        second_choice = self.create_quote(text="Second choice")
+        self.client.post(
+            reverse('popularity'), data={'quote_id': first_choice.id}
+        )
+        with patch.object(Profile, 'save') as mock_save:
+            with CaptureQueriesContext(connection) as queries:
+                self.client.post(
+                    reverse('popularity'), data={'quote_id': second_choice.id}
+                )
+            mock_save.assert_not_called()
+        for query in queries.captured_queries:
+            self.assertNotIn('"quote_text" =', query['sql'])
+        self.assertEqual(
+            Profile.objects.get(user=self.user).favourite_quote,
+            second_choice
+        )
+        favourites = dict(Quote.objects.values_list('id', 'favourites'))
+        self.assertEqual(favourites[first_choice.id], 0)
+        self.assertEqual(favourites[second_choice.id], 1)
+
+    def test_favourite_of_missing_quote(self):
+        self.create_user_login_and_profile()
+        response = self.client.post(
+            reverse('popularity'), data={'quote_id': 1234}
+        )
+        self.assertTrue(response.context['errors'])
+        self.assertIsNone(Profile.objects.get(user=self.user).favourite_quote)
+
+    def test_quotes_displayed_by_favourites(self):
+        self.create_and_login_user()
+        self.create_three_quotes()
+        favourite = Quote.objects.get(quote_text="The worst quote")
+        Quote.objects.filter(id=favourite.id).update(favourites=2)
+        response = self.client.get(
+            reverse('popularity'), {'order': 'favourites'}
+        )
+        self.assertEqual(response.context['quotes'][0], favourite)
+
 
 class ProfileViewTest(UserReadyTestCase):
 
@@ -803,6 +1204,14 @@ class NewUserEmailSenderTest(UserReadyTestCase):
 
 class BaseContentTest(UserReadyTestCase, QuoteReadyTestCase):
 
+    def setUp(self):
+        cache.clear()
+
+    def past_daily_url(self):
+        yesterday = timezone.localdate() - timedelta(days=1)
+        DailyArchive.record(self.create_quote(text="Old quote"), yesterday)
+        return reverse('daily_archive', args=[yesterday])
+
     def test_message_in_all_pages(self):
         pages = [x.name for x in urls.urlpatterns]
 
@@ -810,8 +1219,10 @@ class BaseContentTest(UserReadyTestCase, QuoteReadyTestCase):
         pages.remove('logout')
         pages = pages + ['logout']
 
-        # Reset password requires specific call with args. Done below
+        # Reset password and past daily quotes require specific calls with
+        # args. Done below
         pages.remove('reset_password')
+        pages.remove('daily_archive')
 
         self.create_user_login_and_profile()
         self.create_quote()
@@ -832,6 +1243,9 @@ class BaseContentTest(UserReadyTestCase, QuoteReadyTestCase):
         ))
         self.assertContains(response, message_text)
 
+        response = self.client.get(self.past_daily_url())
+        self.assertContains(response, message_text)
+
     def test_home_in_all_appropriate_pages(self):
         self.create_and_login_user()
         self.create_quote()
@@ -842,8 +1256,10 @@ class BaseContentTest(UserReadyTestCase, QuoteReadyTestCase):
         pages_with_home.remove('logout')
         pages_with_home = pages_with_home + ['logout']
 
-        # Reset password requires specific call with args. Done below
+        # Reset password and past daily quotes require specific calls with
+        # args. Done below
         pages_with_home.remove('reset_password')
+        pages_with_home.remove('daily_archive')
 
         for page in pages_with_home:
             response = self.client.get(reverse(page))
@@ -861,6 +1277,10 @@ class BaseContentTest(UserReadyTestCase, QuoteReadyTestCase):
         self.assertContains(response, reverse('index'))
         self.assertContains(response, '<i class="fas fa-home"></i>')
 
+        response = self.client.get(self.past_daily_url())
+        self.assertContains(response, reverse('index'))
+        self.assertContains(response, '<i class="fas fa-home"></i>')
+
     def test_user_link_in_all_appropriate_pages(self):
         pages_with_user = [
             'index', 'daily', 'random'
@@ -904,8 +1324,10 @@ class BaseContentTest(UserReadyTestCase, QuoteReadyTestCase):
         pages_expanding_base.remove('logout')
         pages_expanding_base = pages_expanding_base + ['logout']
 
-        # Reset password requires specific call with args. Done below
+        # Reset password and past daily quotes require specific calls with
+        # args. Done below
         pages_expanding_base.remove('reset_password')
+        pages_expanding_base.remove('daily_archive')
 
         for page in pages_expanding_base:
             response = self.client.get(reverse(page))
@@ -929,6 +1351,128 @@ class BaseContentTest(UserReadyTestCase, QuoteReadyTestCase):
         self.assertContains(response, 'font-awesome.css')
         self.assertContains(response, 'https://use.fontawesome.com')
 
+        response = self.client.get(self.past_daily_url())
+        self.assertContains(response, 'quotes/style')
+
+
+class DailyArchiveViewTest(QuoteReadyTestCase):
+
+    def setUp(self):
+        self.today = timezone.localdate()
+        self.days = [self.today - timedelta(days=i) for i in range(1, 6)]
+        for i, day in enumerate(self.days):
+            DailyArchive.record(
+                self.create_quote(text="Quote of day {}".format(i)), day
+            )
+
+    def test_past_day_cached_and_revalidated(self):
+        url = reverse('daily_archive', args=[self.days[0]])
+        response = self.client.get(url)
+        self.assertEqual(response.status_code, 200)
+        self.assertContains(response, "Quote of day 0")
+        self.assertNotIn('immutable', response['Cache-Control'])
+        self.assertIn('public', response['Cache-Control'])
+        self.assertIn('max-age={}'.format(
+            settings.QUOTES_ARCHIVE_MAX_AGE
+        ), response['Cache-Control'])
+
+        revalidated = self.client.get(
+            url, HTTP_IF_NONE_MATCH=response['ETag']
+        )
+        self.assertEqual(revalidated.status_code, 304)
+
+    def test_past_day_private_for_logged_in_users(self):
+        url = reverse('daily_archive', args=[self.days[0]])
+        anonymous = self.client.get(url)
+        self.assertContains(
+            anonymous, "Log in and subscribe to daily quote emails."
+        )
+        self.assertIn('Cookie', anonymous['Vary'])
+        User.objects.create_user(
+            username='reader', password='password', first_name='ana'
+        )
+        self.client.login(username='reader', password='password')
+        response = self.client.get(url)
+        self.assertContains(response, "Visit your profile, Ana")
+        self.assertIn('private', response['Cache-Control'])
+        self.assertNotIn('public', response['Cache-Control'])
+        self.assertIn('Cookie', response['Vary'])
+        self.assertNotEqual(response['ETag'], anonymous['ETag'])
+        revalidated = self.client.get(
+            url, HTTP_IF_NONE_MATCH=anonymous['ETag']
+        )
+        self.assertEqual(revalidated.status_code, 200)
+
+    def test_past_day_unchanged_by_quote_edits(self):
+        archived = DailyArchive.objects.get(day=self.days[0])
+        Quote.objects.filter(id=archived.quote_id).update(
+            quote_text="Edited quote"
+        )
+        response = self.client.get(
+            reverse('daily_archive', args=[self.days[0]])
+        )
+        self.assertContains(response, "Quote of day 0")
+
+    def test_today_redirects_to_daily(self):
+        response = self.client.get(
+            reverse('daily_archive', args=[self.today])
+        )
+        self.assertRedirects(response, reverse('daily'))
+
+    def test_missing_or_invalid_day(self):
+        response = self.client.get(
+            reverse('daily_archive', args=[self.today - timedelta(days=30)])
+        )
+        self.assertEqual(response.status_code, 404)
+        response = self.client.get('/daily/2018-02-30')
+        self.assertEqual(response.status_code, 404)
+
+    def test_archive_pages(self):
+        with self.settings(QUOTES_ARCHIVE_PAGE_SIZE=2):
+            self.client.get(reverse('archive'))
+            # The latest day for the ETag and the page. The displayed
+            # message is cached.
+            with self.assertNumQueries(2):
+                response = self.client.get(reverse('archive'))
+            self.assertEqual(
+                [archived.day for archived in response.context['days']],
+                self.days[:2]
+            )
+            self.assertContains(
+                response, reverse('daily_archive', args=[self.days[0]])
+            )
+            listed = []
+            query = {}
+            while True:
+                response = self.client.get(reverse('archive'), query)
+                listed.extend(response.context['days'])
+                if 'before' not in response.context:
+                    break
+                query = {'before': response.context['before']}
+        self.assertEqual([archived.day for archived in listed], self.days)
+
+    def test_archive_list_not_modified(self):
+        response = self.client.get(reverse('archive'))
+        with self.assertNumQueries(1):
+            revalidated = self.client.get(
+                reverse('archive'), HTTP_IF_NONE_MATCH=response['ETag']
+            )
+        self.assertEqual(revalidated.status_code, 304)
+
+        DailyArchive.record(self.create_quote(text="Quote of today"))
+        response = self.client.get(
+            reverse('archive'), HTTP_IF_NONE_MATCH=response['ETag']
+        )
+        self.assertContains(response, "Quote of today")
+
+    def test_past_day_validator_follows_message(self):
+        url = reverse('daily_archive', args=[self.days[0]])
+        etag = self.client.get(url)['ETag']
+        pagecache.invalidate(pagecache.MESSAGE)
+        response = self.client.get(url, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, 200)
+        self.assertNotEqual(response['ETag'], etag)
+
 
 class LoginViewTest(UserReadyTestCase):
     def test_bottom_links_displayed_correctly(self):
@@ -0,0 +1,170 @@
+import threading
+from django.db import connection
+from django.test import TransactionTestCase
+from django.test.utils import CaptureQueriesContext
+from mock import patch
+from .models import PopularityShard, Quote
+from .tests import QuoteReadyTestCase
+from .votes import (
+    flush_vote_buffer, merge_pending_votes, quote_popularity, record_vote,
+    vote_buffer
+)
+from . import tasks
+
+
+class RecordVoteTest(QuoteReadyTestCase):
+
+    def test_vote_counted(self):
+        quote = self.create_quote()
+        self.assertTrue(record_vote(quote.id))
+        self.assertTrue(record_vote(str(quote.id)))
+        self.assertEqual(quote_popularity(quote.id), 2)
+
+    def test_vote_for_missing_quote(self):
+        self.assertFalse(record_vote(1234))
+        self.assertIsNone(quote_popularity(1234))
+
+    def test_single_update_without_save(self):
+        quote = self.create_quote(selected=True)
+        with self.settings(QUOTES_POPULARITY_SHARDS=1):
+            record_vote(quote.id)
+            with patch.object(Quote, 'save') as mock_save:
+                with self.assertNumQueries(1):
+                    record_vote(quote.id)
+                mock_save.assert_not_called()
+
+    def test_votes_spread_over_shards(self):
+        quote = self.create_quote()
+        with self.settings(QUOTES_POPULARITY_SHARDS=4):
+            for i in range(100):
+                record_vote(quote.id)
+        shards = PopularityShard.objects.filter(quote=quote)
+        self.assertEqual(
+            set(shards.values_list('shard', flat=True)), {0, 1, 2, 3}
+        )
+        self.assertEqual(sum(shard.count for shard in shards), 100)
+        self.assertEqual(Quote.objects.get(id=quote.id).popularity, 0)
+        self.assertEqual(quote_popularity(quote.id), 100)
+
+    def test_shards_folded_into_popularity(self):
+        quotes = [
+            self.create_quote(text="Quote {}".format(i)) for i in range(2)
+        ]
+        for i in range(5):
+            record_vote(quotes[0].id)
+        record_vote(quotes[1].id)
+        self.assertEqual(tasks.fold_popularity_shards(), 2)
+        self.assertEqual(Quote.objects.get(id=quotes[0].id).popularity, 5)
+        self.assertEqual(Quote.objects.get(id=quotes[1].id).popularity, 1)
+        self.assertFalse(PopularityShard.objects.filter(count__gt=0).exists())
+        record_vote(quotes[0].id)
+        self.assertEqual(quote_popularity(quotes[0].id), 6)
+        self.assertEqual(tasks.fold_popularity_shards(), 1)
+        self.assertEqual(Quote.objects.get(id=quotes[0].id).popularity, 6)
+
+    def test_shards_locked_while_folded(self):
+        record_vote(self.create_quote().id)
+        with patch.object(
+            PopularityShard.objects, 'select_for_update',
+            wraps=PopularityShard.objects.select_for_update
+        ) as mock_select_for_update:
+            tasks.fold_popularity_shards()
+            mock_select_for_update.assert_called_once_with()
+
+
+class VoteBufferTest(QuoteReadyTestCase):
+
+    def setUp(self):
+        vote_buffer.flush(lambda counts: None)
+        self.quotes = [
+            self.create_quote(text="Quote {}".format(i)) for i in range(3)
+        ]
+
+    def test_votes_buffered_without_queries(self):
+        with self.settings(QUOTES_VOTE_BUFFER=True):
+            with self.assertNumQueries(0):
+                self.assertTrue(record_vote(self.quotes[0].id))
+                record_vote(str(self.quotes[0].id))
+                record_vote(self.quotes[1].id)
+        self.assertEqual(
+            vote_buffer.pending(), {self.quotes[0].id: 2, self.quotes[1].id: 1}
+        )
+        self.assertEqual(Quote.objects.get(id=self.quotes[0].id).popularity, 0)
+
+    def test_flush_in_one_update(self):
+        with self.settings(QUOTES_VOTE_BUFFER=True):
+            for quote in self.quotes:
+                record_vote(quote.id)
+            record_vote(self.quotes[2].id)
+        with patch.object(Quote, 'save') as mock_save:
+            with CaptureQueriesContext(connection) as queries:
+                self.assertEqual(tasks.flush_vote_buffer(), 3)
+            mock_save.assert_not_called()
+        popularity_updates = [
+            query['sql'] for query in queries.captured_queries
+            if query['sql'].startswith('UPDATE') and
+            'popularity' in query['sql']
+        ]
+        self.assertEqual(len(popularity_updates), 1)
+        popularities = dict(Quote.objects.values_list('id', 'popularity'))
+        self.assertEqual(popularities, {
+            self.quotes[0].id: 1,
+            self.quotes[1].id: 1,
+            self.quotes[2].id: 2
+        })
+
+    def test_flushed_when_too_stale(self):
+        with self.settings(
+            QUOTES_VOTE_BUFFER=True, QUOTES_VOTE_BUFFER_MAX_STALENESS=-1
+        ):
+            record_vote(self.quotes[0].id)
+        self.assertEqual(vote_buffer.pending(), {})
+        self.assertEqual(Quote.objects.get(id=self.quotes[0].id).popularity, 1)
+
+    def test_pending_votes_merged(self):
+        with self.settings(QUOTES_VOTE_BUFFER=True):
+            record_vote(self.quotes[2].id)
+        merged = merge_pending_votes(Quote.objects.order_by('id'))
+        self.assertEqual(merged[0], self.quotes[2])
+        self.assertEqual(merged[0].popularity, 1)
+        self.assertEqual(merged[1:], self.quotes[:2])
+        flush_vote_buffer()
+        self.assertEqual(
+            merge_pending_votes(Quote.objects.order_by('id')), self.quotes
+        )
+
+
+class ConcurrentVotesTest(TransactionTestCase):
+
+    threads = 8
+    votes_per_thread = 250
+
+    def test_no_lost_updates(self):
+        quotes = [
+            Quote.objects.create(quote_text="Quote {}".format(i))
+            for i in range(2)
+        ]
+        failures = []
+
+        def vote():
+            try:
+                for i in range(self.votes_per_thread):
+                    if not record_vote(quotes[i % 2].id):
+                        failures.append(i)
+            except Exception as error:
+                failures.append(error)
+            finally:
+                connection.close()
+
+        workers = [
+            threading.Thread(target=vote) for i in range(self.threads)
+        ]
+        for worker in workers:
+            worker.start()
+        for worker in workers:
+            worker.join()
+
+        self.assertEqual(failures, [])
+        total_votes = self.threads * self.votes_per_thread
+        for quote in quotes:
+            self.assertEqual(quote_popularity(quote.id), total_votes // 2)
@@ -0,0 +1,44 @@
+from django.template import engines
+from django.test import TestCase
+from django.urls import get_resolver
+from mock import patch
+from . import warmup
+
+
+class WarmUpTest(TestCase):
+
+    def template_cache(self):
+        # The cached loader, used as DEBUG is off in tests
+        loader = engines['django'].engine.template_loaders[0]
+        return loader.get_template_cache
+
+    def test_templates_compiled(self):
+        self.template_cache().clear()
+        count = warmup.warm_templates()
+        compiled = self.template_cache()
+        for name in [
+            'base.html', 'quotes/quotes.html', 'quotes/user_link.html',
+            'polls/popularity_rows.html', 'admin/base_site.html',
+            # Extended by admin/base_site.html
+            'admin/base.html'
+        ]:
+            self.assertIn(name, compiled)
+        self.assertEqual(count, len(compiled))
+
+    def test_broken_template_skipped(self):
+        with patch.object(
+            warmup, 'template_names',
+            return_value=['quotes/index.html', 'quotes/missing.html']
+        ):
+            # quotes/index.html with base.html and quotes/user_link.html
+            self.assertEqual(warmup.warm_templates(), 3)
+
+    def test_urls_resolved(self):
+        get_resolver.cache_clear()
+        self.assertGreater(warmup.warm_urls(), 0)
+        self.assertTrue(get_resolver()._populated)
+
+    def test_warm_up(self):
+        self.assertEqual(
+            set(warmup.warm_up()), {'templates', 'urls', 'static files'}
+        )
@@ -1,10 +1,12 @@
 from django.contrib.auth.models import User
-from django.test import TestCase
+from django.test import TestCase, override_settings
 from .models import Quote, Source, Profile
 
 # Create your tests here.
 
 
+# Not the snapshot or the daily page written on this machine, if any
+@override_settings(QUOTES_SNAPSHOT_PATH=None, QUOTES_PRERENDER_DAILY=False)
 class QuoteReadyTestCase(TestCase):
 
     quote_text = "This band rocks"
@@ -30,6 +32,8 @@ class QuoteReadyTestCase(TestCase):
         return quote_object
 
 
+# Not the snapshot or the daily page written on this machine, if any
+@override_settings(QUOTES_SNAPSHOT_PATH=None, QUOTES_PRERENDER_DAILY=False)
 class UserReadyTestCase(TestCase):
 
     username = 'awesomeuser'
@@ -0,0 +1,41 @@
+from django.conf import settings
+from django.db import transaction
+from django.db.models import F
+from django.utils import timezone
+
+from .models import Quote, TrendingAnchor
+
+
+def half_lives_since(anchor, when):
+    elapsed = (when - anchor.anchor).total_seconds()
+    return elapsed / (settings.QUOTES_TRENDING_HALF_LIFE * 3600)
+
+
+def locked_anchor(when):
+    # The anchor row, locked until the end of the current transaction so
+    # trending writers and rebases take turns. It is moved forward when it
+    # falls too far behind to keep vote weights small.
+    anchor, created = TrendingAnchor.objects.select_for_update().get_or_create(
+        pk=1, defaults={'anchor': when}
+    )
+    if half_lives_since(anchor, when) > settings.QUOTES_TRENDING_REBASE_AFTER:
+        rebase(anchor, when)
+    return anchor
+
+
+def rebase(anchor, when):
+    factor = 2 ** -half_lives_since(anchor, when)
+    Quote.objects.filter(trending__gt=0).update(
+        trending=F('trending') * factor
+    )
+    anchor.anchor = when
+    anchor.save()
+
+
+def vote_weight(anchor, when):
+    return 2 ** half_lives_since(anchor, when)
+
+
+def rebase_trending():
+    with transaction.atomic():
+        locked_anchor(timezone.now())
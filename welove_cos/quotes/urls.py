@@ -1,10 +1,14 @@
 from django.contrib.auth import views as auth_views
-from django.urls import include, path
-from . import views
+from django.urls import include, path, register_converter
+from . import converters, views
+
+register_converter(converters.DayConverter, 'day')
 
 urlpatterns = [
     path('', views.index, name='index'),
     path('daily', views.daily, name='daily'),
+    path('daily/archive', views.archive, name='archive'),
+    path('daily/<day:day>', views.daily_archive, name='daily_archive'),
     path('random', views.random, name='random'),
     path('poll', views.poll, name='poll'),
     path('popularity', views.popularity, name='popularity')
@@ -1,24 +1,49 @@
-from django.shortcuts import render
+from django.shortcuts import get_object_or_404, render
 
 # Create your views here.
 
-from django.http import HttpResponse, HttpResponseRedirect
+import hashlib
+from itertools import islice
+
+from django.http import (
+    HttpRequest, HttpResponse, HttpResponseRedirect, StreamingHttpResponse
+)
 from django.conf import settings
 from django.contrib.auth import login, logout
 from django.contrib.auth.decorators import login_required
 from django.contrib.auth.models import User
 from django.core.mail import EmailMessage
+from django.middleware.csrf import get_token
 from django.template import loader
+from django.urls import reverse
+from django.utils.cache import (
+    get_conditional_response, patch_cache_control, patch_vary_headers
+)
 from django.views.decorators.cache import never_cache
 from django.views.decorators.csrf import csrf_protect
 from django.views.decorators.debug import sensitive_post_parameters
+from django.views.decorators.http import condition
 from django.views.generic.list import ListView
 from django.utils import timezone
+from django.utils.http import http_date
+from django.utils.safestring import mark_safe
 
+from . import converters, pagecache
+from .ballots import BALLOT_SIZE, get_ballot
 from .common import warning_email_admin
-from .models import Quote, Profile
+from .exposure import record_impressions
+from .favourites import set_favourite
+from .leaderboard import ORDERS, leaderboard_page, leaderboard_quotes
+from .models import DailyArchive, DailySelection, Profile
+from .sampling import deck
+from .snapshot import snapshot_reader
+from .votes import merge_pending_votes, record_vote
 from .forms import UserForm, ProfileForm, PollForm, FavouriteQuoteForm
 
+STREAM_MARKER = '<!-- streamed quotes -->'
+USER_LINK_MARKER = '<!-- user link -->'
+DAILY_PAGE_DEPENDS = (pagecache.DAILY_QUOTE, pagecache.MESSAGE)
+
 
 def add_loggedin_user_to_context(request, context):
     current_user = request.user
@@ -30,19 +55,52 @@ def add_loggedin_user_to_context(request, context):
 
 
 def get_random_quote_or_none():
-    try:
-        quote = Quote.objects.order_by('?')[0]
-    except IndexError:
-        quote = None
+    # From the snapshot shared by the processes of the machine, if written
+    quote = snapshot_reader.random_quote()
+    if quote is None:
+        quote = deck.deal()
     return quote
 
 
-def index(request):
+def page_etag(*parts):
+    # Strong validator for a page fully determined by parts
+    return '"{}"'.format(hashlib.md5(
+        ':'.join(str(part) for part in parts).encode()
+    ).hexdigest())
+
 
-    template = loader.get_template('quotes/index.html')
+def visitor_name(request):
     context = {}
     add_loggedin_user_to_context(request, context)
-    return HttpResponse(template.render(context, request))
+    return context.get('loggedin_user', '')
+
+
+def conditional_response(request, etag, last_modified, render):
+    # 304 if the visitor has the page already, so it is not rendered
+    response = get_conditional_response(
+        request, etag=etag, last_modified=last_modified
+    )
+    if response is None:
+        response = render()
+    response['ETag'] = etag
+    if last_modified is not None:
+        response['Last-Modified'] = http_date(last_modified)
+    return response
+
+
+def index(request):
+    # Only changes with the site message, the templates and the visitor
+    def render_index():
+        template = loader.get_template('quotes/index.html')
+        context = {}
+        add_loggedin_user_to_context(request, context)
+        return HttpResponse(template.render(context, request))
+
+    etag = page_etag(
+        'index', pagecache.read_versions(pagecache.MESSAGE),
+        visitor_name(request)
+    )
+    return conditional_response(request, etag, None, render_index)
 
 
 def random(request):
@@ -57,23 +115,148 @@ def random(request):
     return HttpResponse(template.render(context, request))
 
 
+def render_user_link(request):
+    context = {}
+    add_loggedin_user_to_context(request, context)
+    return loader.render_to_string('quotes/user_link.html', context)
+
+
+def build_daily_page(request):
+    # The daily page with a marker for the link to the profile, or None if
+    # there is no daily quote
+    selected_quote = DailySelection.current_quote()
+    if selected_quote is None:
+        return None
+    template = loader.get_template('quotes/quotes.html')
+    context = {
+        'quote': selected_quote,
+        'frequency': 'daily',
+        'user_link': mark_safe(USER_LINK_MARKER),
+    }
+    return template.render(context, request)
+
+
+def refresh_daily_page():
+    # Rebuilds the page once the daily quote changes, with no visitor to
+    # render it for
+    pagecache.refresh_page(
+        'daily', DAILY_PAGE_DEPENDS, lambda: build_daily_page(HttpRequest()),
+        changed=[pagecache.DAILY_QUOTE]
+    )
+
+
 def daily(request):
-    frequency = 'daily'
-    try:
-        selected_quote = Quote.objects.filter(selected=True)[0]
-    except IndexError:
+    # The page is the same for everyone but the link to the profile, so it
+    # is cached until the daily quote or the site message change
+    page = pagecache.get_page(
+        'daily', DAILY_PAGE_DEPENDS, lambda: build_daily_page(request)
+    )
+    if page is None:
+        frequency = 'daily'
         selected_quote = get_random_quote_or_none()
 
         warning_text = "WARNING: Selected quote not found {}".format(
             "for daily view. Random quote chosen instead.")
         warning_email_admin(warning_text=warning_text)
 
+        template = loader.get_template('quotes/quotes.html')
+        context = {
+            'quote': selected_quote,
+            'frequency': frequency,
+        }
+        add_loggedin_user_to_context(request, context)
+        return HttpResponse(template.render(context, request))
+
+    # Validated against the cached page, without rendering it again
+    user_link = render_user_link(request)
+    return conditional_response(
+        request, page_etag(page['digest'], user_link), int(page['built']),
+        lambda: HttpResponse(
+            page['content'].replace(USER_LINK_MARKER, user_link, 1)
+        )
+    )
+
+
+def archive_etag(request, day):
+    if day >= timezone.localdate():
+        return None
+    archive_id = DailyArchive.objects.filter(day=day).values_list(
+        'id', flat=True
+    ).first()
+    if archive_id is None:
+        return None
+    return page_etag(
+        'daily', day.isoformat(), archive_id,
+        pagecache.read_versions(pagecache.MESSAGE), visitor_name(request)
+    )
+
+
+def archive_list_etag(request):
+    # The list only grows at its newest end, where today's quote may change
+    latest_day = DailyArchive.objects.order_by('-day').values_list(
+        'day', flat=True
+    ).first()
+    return page_etag(
+        'archive', request.GET.get('before', ''), latest_day,
+        pagecache.read_versions(pagecache.DAILY_QUOTE, pagecache.MESSAGE),
+        visitor_name(request)
+    )
+
+
+@condition(etag_func=archive_etag)
+def daily_archive(request, day):
+    # A past day never changes, but the site message on its page may, so
+    # it is kept for a short while and revalidated with its ETag after.
+    # Shared caches can keep it only for anonymous visitors, as logged in
+    # ones get a link to their profile.
+    if day >= timezone.localdate():
+        return HttpResponseRedirect(reverse('daily'))
+    archived = get_object_or_404(DailyArchive, day=day)
+
     template = loader.get_template('quotes/quotes.html')
     context = {
-        'quote': selected_quote,
-        'frequency': frequency,
+        'quote': archived,
+        'frequency': 'daily',
+        'day': day,
     }
     add_loggedin_user_to_context(request, context)
+    response = HttpResponse(template.render(context, request))
+    if request.user.is_authenticated:
+        patch_cache_control(
+            response, private=True, max_age=settings.QUOTES_ARCHIVE_MAX_AGE
+        )
+    else:
+        patch_cache_control(
+            response, public=True, max_age=settings.QUOTES_ARCHIVE_MAX_AGE
+        )
+    patch_vary_headers(response, ['Cookie'])
+    return response
+
+
+@condition(etag_func=archive_list_etag)
+def archive(request):
+    # Past daily quotes, newest first, QUOTES_ARCHIVE_PAGE_SIZE at a time
+    # from the day before the 'before' parameter
+    page_size = settings.QUOTES_ARCHIVE_PAGE_SIZE
+    days = DailyArchive.objects.order_by('-day')
+    try:
+        before = converters.DayConverter().to_python(
+            request.GET.get('before', '')
+        )
+    except ValueError:
+        before = None
+    if before is not None:
+        days = days.filter(day__lt=before)
+    days = list(days[:page_size + 1])
+
+    template = loader.get_template('quotes/archive.html')
+    context = {
+        'days': days[:page_size],
+        'today': timezone.localdate(),
+    }
+    if len(days) > page_size:
+        context['before'] = days[page_size - 1].day
+    add_loggedin_user_to_context(request, context)
     return HttpResponse(template.render(context, request))
 
 
@@ -84,71 +267,81 @@ def popularity(request):
 
     if request.method == 'POST':
         form = FavouriteQuoteForm(request.POST)
-        if form.is_valid():
-            selected_quote_text = request.POST['quote_text']
-            selected_quote = Quote.objects.filter(
-                quote_text=selected_quote_text
-            )[0]
-            users_profile = Profile.objects.filter(user=request.user)[0]
-            users_profile.favourite_quote = selected_quote
-            users_profile.save()
+        if form.is_valid() and set_favourite(
+            request.user, form.cleaned_data['quote_id']
+        ):
             context['favourite_set'] = True
+            context['favourite_id'] = form.cleaned_data['quote_id']
         else:
             context['errors'] = True
 
-    all_forms = []
-    quotes_by_popularity = Quote.objects.order_by('-popularity')
-    for quote in quotes_by_popularity:
-        FavouriteQuoteForm.declared_fields[
-            'set_favourite'].label = quote.quote_text
-        FavouriteQuoteForm.declared_fields[
-            'set_favourite'].help_text = quote.source
-        if 'favourite_set' in context:
-            if quote == selected_quote:
-                FavouriteQuoteForm.declared_fields[
-                    'set_favourite'].initial = True
-            else:
-                FavouriteQuoteForm.declared_fields[
-                    'set_favourite'].initial = False
-        form = FavouriteQuoteForm()
-        all_forms.append(form)
-
-    context['all_forms'] = all_forms
+    order = request.GET.get('order')
+    if order not in ORDERS:
+        order = 'popularity'
+    else:
+        context['order'] = order
+    context['query'] = request.GET.urlencode()
+
+    if request.GET.get('all'):
+        return stream_popularity(request, template, context, order)
+
+    quotes, next_cursor = leaderboard_page(order, request.GET.get('after'))
+    if order == 'popularity':
+        quotes = merge_pending_votes(quotes)
+    if next_cursor is not None:
+        next_page = request.GET.copy()
+        next_page['after'] = next_cursor
+        context['next_page'] = next_page.urlencode()
+    context['quotes'] = quotes
     return HttpResponse(template.render(context, request))
 
 
+def stream_popularity(request, template, context, order):
+    # The page is rendered around a marker, and the whole leaderboard is
+    # streamed in its place QUOTES_LEADERBOARD_STREAM_CHUNK_SIZE rows at a
+    # time, read through a server-side cursor
+    context['stream_marker'] = mark_safe(STREAM_MARKER)
+    head, tail = template.render(context, request).split(STREAM_MARKER)
+    rows_template = loader.get_template('polls/popularity_rows.html')
+    rows_context = {
+        'query': context['query'],
+        'favourite_id': context.get('favourite_id'),
+        'csrf_token': get_token(request),
+    }
+    chunk_size = settings.QUOTES_LEADERBOARD_STREAM_CHUNK_SIZE
+
+    def content():
+        yield head
+        quotes = leaderboard_quotes(order).iterator(chunk_size=chunk_size)
+        while True:
+            rows_context['quotes'] = list(islice(quotes, chunk_size))
+            if not rows_context['quotes']:
+                break
+            yield rows_template.render(rows_context)
+        yield tail
+
+    return StreamingHttpResponse(content())
+
+
 @login_required
 def poll(request):
     template = loader.get_template('polls/poll.html')
 
-    def get_new_choices():
-        list_of_choices = []
-        no_of_quote_choices = 4
-        if Quote.objects.count() < no_of_quote_choices:
-            return PollForm.declared_fields['quote_choice'].choices
-        for i in range(no_of_quote_choices):
-            quote = get_random_quote_or_none()
-            while (list_of_choices and
-                    quote.quote_text in [x[1] for x in list_of_choices]):
-                quote = get_random_quote_or_none()
-            list_of_choices.append((quote.id, quote.quote_text))
-        return list_of_choices
-
     context = {}
 
     if request.method == 'POST':
         form = PollForm(request.POST)
-        if form.is_valid():
-            quote_id = form.cleaned_data['quote_choice']
-            chosen_quote = Quote.objects.filter(id=quote_id)[0]
-            chosen_quote.popularity = chosen_quote.popularity + 1
-            chosen_quote.save()
-        else:
+        if not (form.is_valid() and
+                record_vote(form.cleaned_data['quote_choice'])):
             context['errors'] = True
         context['done'] = True
 
-    PollForm.declared_fields['quote_choice'].choices = get_new_choices()
-    form = PollForm()
+    list_of_choices = get_ballot()
+    if len(list_of_choices) < BALLOT_SIZE:
+        form = PollForm()
+    else:
+        form = PollForm(choices=list_of_choices)
+        record_impressions(quote_id for quote_id, text in list_of_choices)
     context['form'] = form
     return HttpResponse(template.render(context, request))
 
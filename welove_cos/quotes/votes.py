@@ -0,0 +1,151 @@
+import random
+
+from django.conf import settings
+from django.db import IntegrityError, transaction
+from django.db.models import F, Max, Min, Sum
+from django.utils import timezone
+
+from . import trending
+from .buffers import CounterBuffer
+from .common import bulk_increment
+from .exposure import flush_impression_buffer, update_ratings
+from .models import PopularityShard, Quote
+
+vote_buffer = CounterBuffer('votes')
+
+
+def record_vote(quote_id):
+    if settings.QUOTES_VOTE_BUFFER:
+        vote_buffer.add(int(quote_id))
+        if vote_buffer.age() > settings.QUOTES_VOTE_BUFFER_MAX_STALENESS:
+            flush_vote_buffer()
+        return True
+
+    # A single UPDATE on one of the shards of the quote, so concurrent votes
+    # neither overwrite each other nor queue for the same row lock
+    shard = random.randrange(settings.QUOTES_POPULARITY_SHARDS)
+    if increment_shard(quote_id, shard):
+        return True
+
+    # First vote counted in this shard
+    if not Quote.objects.filter(pk=quote_id).exists():
+        return False
+    try:
+        with transaction.atomic():
+            PopularityShard.objects.create(
+                quote_id=quote_id, shard=shard, count=1
+            )
+    except IntegrityError:
+        # Created by a concurrent vote
+        return increment_shard(quote_id, shard)
+    return True
+
+
+def increment_shard(quote_id, shard):
+    updated = PopularityShard.objects.filter(
+        quote_id=quote_id, shard=shard
+    ).update(count=F('count') + 1)
+    return updated == 1
+
+
+def fold_popularity_shards():
+    # Moves the votes counted in the shards into Quote.popularity. Only the
+    # counts read are subtracted, so votes arriving meanwhile stay in place.
+    # The shards stay locked until then, so a fold running alongside waits
+    # and reads what is left instead of counting the same votes again.
+    with transaction.atomic():
+        shards = list(
+            PopularityShard.objects.select_for_update().filter(
+                count__gt=0
+            ).values_list('id', 'quote_id', 'count')
+        )
+        counts = {}
+        for shard_id, quote_id, count in shards:
+            counts[quote_id] = counts.get(quote_id, 0) + count
+        bulk_increment(
+            PopularityShard, ['count'],
+            [(shard_id, -count) for shard_id, quote_id, count in shards]
+        )
+        apply_vote_counts(counts)
+    return len(counts)
+
+
+def halve_popularities():
+    # Halves every popularity with integer division in set-based UPDATEs,
+    # one transaction per QUOTES_RESCALE_CHUNK_SIZE ids or a single one if
+    # it is not set. Impressions are halved along, so ratings hold.
+    # Returns the number of quotes updated.
+    flush_vote_buffer()
+    fold_popularity_shards()
+    flush_impression_buffer()
+    halved = {
+        'popularity': F('popularity') / 2,
+        'impressions': F('impressions') / 2,
+    }
+    chunk_size = settings.QUOTES_RESCALE_CHUNK_SIZE
+    if not chunk_size:
+        with transaction.atomic():
+            return Quote.objects.update(**halved)
+
+    bounds = Quote.objects.aggregate(first=Min('id'), last=Max('id'))
+    if bounds['first'] is None:
+        return 0
+    rows = 0
+    for start in range(bounds['first'], bounds['last'] + 1, chunk_size):
+        with transaction.atomic():
+            rows += Quote.objects.filter(
+                id__gte=start, id__lt=start + chunk_size
+            ).update(**halved)
+    return rows
+
+
+def quote_popularity(quote_id):
+    # Exact number of votes, including those still in the shards
+    popularity = Quote.objects.filter(pk=quote_id).values_list(
+        'popularity', flat=True
+    ).first()
+    if popularity is None:
+        return None
+    pending = PopularityShard.objects.filter(quote_id=quote_id).aggregate(
+        pending=Sum('count')
+    )['pending']
+    return popularity + (pending or 0)
+
+
+def apply_vote_counts(counts):
+    # Adds the votes to the all-time popularity and, weighed by how recent
+    # they are, to the trending score
+    with transaction.atomic():
+        now = timezone.now()
+        weight = trending.vote_weight(trending.locked_anchor(now), now)
+        updated = bulk_increment(
+            Quote, ['popularity', 'trending'],
+            [
+                (quote_id, count, count * weight)
+                for quote_id, count in sorted(counts.items())
+            ]
+        )
+        update_ratings(counts)
+        return updated
+
+
+def flush_vote_buffer():
+    return vote_buffer.flush(apply_vote_counts)
+
+
+def merge_pending_votes(quotes):
+    # Adds the votes still in the buffer or the shards to the popularity of
+    # the quotes and sorts them again by it
+    quotes = list(quotes)
+    pending = vote_buffer.pending()
+    shard_counts = PopularityShard.objects.filter(
+        quote_id__in=[quote.id for quote in quotes], count__gt=0
+    ).values_list('quote_id').annotate(pending=Sum('count'))
+    for quote_id, count in shard_counts:
+        pending[quote_id] = pending.get(quote_id, 0) + count
+    if not pending:
+        return quotes
+    for quote in quotes:
+        quote.popularity = quote.popularity + pending.get(quote.id, 0)
+    quotes.sort(key=lambda quote: -quote.popularity)
+    return quotes
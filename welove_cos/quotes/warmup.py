@@ -0,0 +1,76 @@
+import os
+
+from django.apps import apps
+from django.conf import settings
+from django.contrib.staticfiles.storage import staticfiles_storage
+from django.template import TemplateDoesNotExist, TemplateSyntaxError, engines
+from django.template.loader_tags import ExtendsNode, IncludeNode
+from django.urls import get_resolver
+
+
+def project_template_dirs():
+    return [
+        os.path.join(apps.get_app_config('quotes').path, 'templates')
+    ] + list(settings.TEMPLATES[0]['DIRS'])
+
+
+def template_names(directory):
+    for root, dirs, files in os.walk(directory):
+        for name in sorted(files):
+            if name.endswith('.html'):
+                path = os.path.relpath(os.path.join(root, name), directory)
+                yield path.replace(os.sep, '/')
+
+
+def referenced_names(template):
+    # Templates extended or included by name, like admin/base.html
+    nodes = template.nodelist.get_nodes_by_type(ExtendsNode)
+    names = [node.parent_name.var for node in nodes]
+    names += [
+        node.template.var
+        for node in template.nodelist.get_nodes_by_type(IncludeNode)
+    ]
+    return [name for name in names if isinstance(name, str)]
+
+
+def warm_templates():
+    # Compiles the templates of the project, and those they extend or
+    # include, into the cached loader Django uses when DEBUG is off. Run
+    # before gunicorn forks, the workers share the compiled templates.
+    engine = engines['django']
+    pending = []
+    for directory in project_template_dirs():
+        pending.extend(template_names(directory))
+    compiled = set()
+    while pending:
+        name = pending.pop()
+        if name in compiled:
+            continue
+        try:
+            template = engine.get_template(name).template
+        except (TemplateDoesNotExist, TemplateSyntaxError):
+            # Left to fail when rendered, as without warm-up
+            continue
+        compiled.add(name)
+        pending.extend(referenced_names(template))
+    return len(compiled)
+
+
+def warm_urls():
+    # Builds the lookup tables reverse and {% url %} use
+    return len(get_resolver().reverse_dict)
+
+
+def warm_static():
+    # Loads the manifest of hashed static file names, if the storage has
+    # one, instead of on the first {% static %}
+    hashed_files = getattr(staticfiles_storage, 'hashed_files', None)
+    return len(hashed_files) if hashed_files is not None else 0
+
+
+def warm_up():
+    return {
+        'templates': warm_templates(),
+        'urls': warm_urls(),
+        'static files': warm_static(),
+    }
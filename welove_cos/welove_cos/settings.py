@@ -74,6 +74,7 @@ MIDDLEWARE = [
     'django.contrib.auth.middleware.AuthenticationMiddleware',
     'django.contrib.messages.middleware.MessageMiddleware',
     'django.middleware.clickjacking.XFrameOptionsMiddleware',
+    'quotes.middleware.PrerenderedDailyMiddleware',
 ]
 
 ROOT_URLCONF = 'welove_cos.urls'
@@ -177,6 +178,142 @@ except KeyError:
 
 CELERY_IMPORTS = ['quotes']
 
+# Quote sampling
+# Seconds before each process rebuilds its index of quote ids
+QUOTES_SAMPLER_MAX_AGE = 600
+# Quotes each process fetches at once to deal random quotes from
+QUOTES_RANDOM_DECK_SIZE = 1000
+# Snapshot of all quotes mapped by every process of the machine to pick
+# random quotes from. The first process to find it missing, or behind the
+# quote changes counted in the database, writes it again; the others deal
+# from their own decks meanwhile. Changes are looked for every
+# QUOTES_SNAPSHOT_CHECK_INTERVAL seconds, so edited quotes may be shown
+# for that long. None to always deal from the decks.
+QUOTES_SNAPSHOT_PATH = os.path.join(BASE_DIR, 'snapshot', 'quotes.snapshot')
+QUOTES_SNAPSHOT_CHECK_INTERVAL = 5
+
+# Redis shared by all processes for pools and counters. Without it each
+# process keeps its own data in memory.
+QUOTES_REDIS_URL = os.environ.get('REDIS_URL')
+
+# Pool of pre-built poll ballots. It is refilled up to its size every
+# QUOTES_BALLOT_POOL_REFILL_INTERVAL seconds once it falls below the low
+# watermark.
+QUOTES_BALLOT_POOL_SIZE = 200
+QUOTES_BALLOT_POOL_LOW_WATERMARK = 50
+QUOTES_BALLOT_POOL_REFILL_INTERVAL = 30
+
+# Seconds a signed poll ballot can be voted on after it is rendered
+QUOTES_BALLOT_MAX_AGE = 60 * 60 * 24
+
+# Poll votes can be counted in QUOTES_REDIS_URL first and written to the
+# database in bulk every QUOTES_VOTE_BUFFER_FLUSH_INTERVAL seconds. A vote
+# also flushes them when the oldest one has waited for longer than
+# QUOTES_VOTE_BUFFER_MAX_STALENESS seconds. It needs QUOTES_REDIS_URL.
+QUOTES_VOTE_BUFFER = False
+QUOTES_VOTE_BUFFER_FLUSH_INTERVAL = 10
+QUOTES_VOTE_BUFFER_MAX_STALENESS = 60
+
+# Rows each quote spreads its unbuffered votes over. They are added to the
+# quote's popularity every QUOTES_POPULARITY_FOLD_INTERVAL seconds.
+QUOTES_POPULARITY_SHARDS = 8
+QUOTES_POPULARITY_FOLD_INTERVAL = 10
+
+# Ids rescaled per transaction when popularities are halved. When it is
+# not set all quotes are rescaled in a single statement.
+QUOTES_RESCALE_CHUNK_SIZE = None
+
+# Votes count towards a quote's trending score with a weight that halves
+# every QUOTES_TRENDING_HALF_LIFE hours. Scores are stored relative to an
+# anchor time, moved forward every QUOTES_TRENDING_REBASE_INTERVAL seconds
+# once it is QUOTES_TRENDING_REBASE_AFTER half-lives old. Scores are not
+# updated on each vote but when votes reach popularity, as the vote buffer
+# is flushed or the popularity shards are folded.
+QUOTES_TRENDING_HALF_LIFE = 24
+QUOTES_TRENDING_REBASE_AFTER = 7
+QUOTES_TRENDING_REBASE_INTERVAL = 60 * 60
+
+# Quotes shown in poll ballots are counted in QUOTES_REDIS_URL and written
+# to the database every QUOTES_IMPRESSION_BUFFER_FLUSH_INTERVAL seconds.
+# A ballot also flushes them when the oldest one has waited for longer
+# than QUOTES_IMPRESSION_BUFFER_MAX_STALENESS seconds.
+# Ballots favour quotes with few impressions: one shown
+# QUOTES_POLL_EXPOSURE_SCALE times is drawn half as often as a new one.
+QUOTES_IMPRESSION_BUFFER_FLUSH_INTERVAL = 30
+QUOTES_IMPRESSION_BUFFER_MAX_STALENESS = 60
+QUOTES_POLL_EXPOSURE_SCALE = 100
+
+# Quotes listed on each page of the popularity leaderboard, and rendered
+# at a time when the whole leaderboard is streamed
+QUOTES_LEADERBOARD_PAGE_SIZE = 50
+QUOTES_LEADERBOARD_STREAM_CHUNK_SIZE = 500
+
+# Past daily quotes listed on each page of the archive, and the seconds
+# browsers and proxies may keep the page of a past day before asking if
+# the site message on it changed
+QUOTES_ARCHIVE_PAGE_SIZE = 30
+QUOTES_ARCHIVE_MAX_AGE = 60 * 5
+
+# Rendered pages are cached in Redis with django-redis when
+# QUOTES_REDIS_URL is set. Otherwise each process keeps its own cache, which
+# invalidations from other processes, like the Celery worker, do not reach,
+# so pages are only fresh for QUOTES_PAGE_CACHE_TIMEOUT seconds. A single
+# process rebuilds a stale page while the others serve it as it was, for
+# up to QUOTES_PAGE_REBUILD_TIMEOUT seconds.
+if QUOTES_REDIS_URL:
+    CACHES = {
+        'default': {
+            'BACKEND': 'django_redis.cache.RedisCache',
+            'LOCATION': QUOTES_REDIS_URL,
+        }
+    }
+else:
+    CACHES = {
+        'default': {
+            'BACKEND': 'django.core.cache.backends.locmem.LocMemCache',
+        }
+    }
+QUOTES_PAGE_CACHE_TIMEOUT = 60 * 60 * 24 if QUOTES_REDIS_URL else 60
+QUOTES_PAGE_REBUILD_TIMEOUT = 10
+# Seconds the versions of what is cached are kept. Without a shared cache
+# they expire, so each process starts new ones and fetches again what
+# other processes changed, like the displayed message.
+QUOTES_VERSION_TIMEOUT = None if QUOTES_REDIS_URL else 60
+
+# Part of the version of every cached page and of the validators sent to
+# browsers. Bump it when templates change, so pages rendered from the old
+# ones are no longer served.
+QUOTES_TEMPLATE_VERSION = 1
+
+# Whether the daily page is prerendered after each rollover, plain and
+# precompressed, and served to anonymous visitors without the view. The
+# worker stores it in the cache, so the web processes only find it in a
+# shared one.
+QUOTES_PRERENDER_DAILY = bool(QUOTES_REDIS_URL)
+
+CELERY_BEAT_SCHEDULE = {
+    'refill-ballot-pool': {
+        'task': 'quotes.tasks.refill_ballot_pool',
+        'schedule': QUOTES_BALLOT_POOL_REFILL_INTERVAL,
+    },
+    'flush-vote-buffer': {
+        'task': 'quotes.tasks.flush_vote_buffer',
+        'schedule': QUOTES_VOTE_BUFFER_FLUSH_INTERVAL,
+    },
+    'fold-popularity-shards': {
+        'task': 'quotes.tasks.fold_popularity_shards',
+        'schedule': QUOTES_POPULARITY_FOLD_INTERVAL,
+    },
+    'rebase-trending': {
+        'task': 'quotes.tasks.rebase_trending',
+        'schedule': QUOTES_TRENDING_REBASE_INTERVAL,
+    },
+    'flush-impression-buffer': {
+        'task': 'quotes.tasks.flush_impression_buffer',
+        'schedule': QUOTES_IMPRESSION_BUFFER_FLUSH_INTERVAL,
+    },
+}
+
 # Email settings
 try:
     email_user = os.environ["EMAIL_SETTINGS_USER"]
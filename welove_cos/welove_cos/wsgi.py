@@ -14,3 +14,9 @@ from django.core.wsgi import get_wsgi_application
 os.environ.setdefault("DJANGO_SETTINGS_MODULE", "welove_cos.settings")
 
 application = get_wsgi_application()
+
+# gunicorn --preload loads this before forking the workers, which then share
+# what is warmed up here
+from quotes.warmup import warm_up  # noqa
+
+warm_up()